@@ -0,0 +1,99 @@
+"""
+Autocomplete index benchmark on synthetic hotels (no database needed).
+
+Reports build time, memory held by the index (tracemalloc) and prefix
+query latency percentiles.
+
+Usage::
+
+    python benchmarks/autocomplete.py --hotels 1000000 --queries 10000
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import string
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from hotel_review_service.autocomplete import PrefixIndex  # noqa: E402
+from hotel_review_service.search_cache import normalize_term  # noqa: E402
+
+
+WORDS = [
+    "grand", "hotel", "palace", "inn", "resort", "plaza", "royal", "park",
+    "garden", "river", "city", "central", "boutique", "house", "lodge",
+    "suites", "tower", "bay", "harbour", "old", "town", "sun", "star",
+]
+
+
+def synthetic_hotels(amount: int, seed: int = 1):
+    rng = random.Random(seed)
+    cities = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        .capitalize()
+        for _ in range(max(amount // 50, 1))
+    ]
+    for hotel_id in range(1, amount + 1):
+        city = rng.choice(cities)
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        name = " ".join(word.capitalize() for word in [*words, city])
+        yield hotel_id, f"{name} {hotel_id}", city
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hotels", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    options = parser.parse_args()
+
+    hotels = list(synthetic_hotels(options.hotels))
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = PrefixIndex(hotels)
+    build_seconds = time.perf_counter() - started
+    gc.collect()
+    _, peak = tracemalloc.get_traced_memory()
+    del hotels
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rng = random.Random(2)
+    names = [name for name, _ in index.hotels.values()]
+    terms = []
+    for _ in range(options.queries):
+        word = rng.choice(normalize_term(rng.choice(names)).split())
+        terms.append(word[:rng.randint(2, len(word))])
+
+    latencies = []
+    for term in terms:
+        started = time.perf_counter()
+        index.search(term, 10)
+        latencies.append(time.perf_counter() - started)
+    quantiles = statistics.quantiles(latencies, n=100)
+
+    print(f"hotels:        {len(index):,}")
+    print(f"index keys:    {len(index.name_keys) + len(index.token_keys):,}")
+    print(f"build:         {build_seconds:.2f}s (peak {peak / 2**20:.0f} MiB)")
+    print(f"memory held:   {held / 2**20:.0f} MiB")
+    print(
+        f"query p50/p99: {quantiles[49] * 1e6:.0f}us / "
+        f"{quantiles[98] * 1e6:.0f}us"
+    )
+
+
+if __name__ == "__main__":
+    main()
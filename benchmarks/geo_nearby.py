@@ -0,0 +1,154 @@
+"""
+Latency of the nearby hotel search over a large number of hotels.
+
+Fills a throwaway in-memory database with hotels at random points, dense
+around a few cities and sparse everywhere else, then times
+``nearby_hotels`` for k-nearest and radius searches at random points in
+those cities, and, for comparison, one scan of every placement ranked by
+exact distance (what the search would be without the geohash index).
+
+Usage::
+
+    python benchmarks/geo_nearby.py --hotels 1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ["REVIEW_SHARDS"] = "0"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment
+)
+
+from hotel_review_service import geohash  # noqa: E402
+from hotel_review_service.models import (  # noqa: E402
+    Hotel,
+    HotelClass,
+    Placement
+)
+from hotel_review_service.nearby import nearby_hotels  # noqa: E402
+
+
+CITIES = [
+    (50.45, 30.52), (48.86, 2.35), (40.71, -74.01), (35.68, 139.69),
+    (-33.87, 151.21), (51.51, -0.13), (-22.91, -43.17), (1.35, 103.82),
+]
+BATCH_SIZE = 50_000
+
+
+def random_point(rng: random.Random) -> tuple[float, float]:
+    if rng.random() < 0.8:
+        lat, lon = rng.choice(CITIES)
+        return lat + rng.gauss(0, 0.3), lon + rng.gauss(0, 0.3)
+    return rng.uniform(-70, 70), rng.uniform(-180, 180)
+
+
+def fill(hotels: int) -> None:
+    """Raw inserts: a million model saves would take longer than the run."""
+    rng = random.Random(1)
+    hotel_class = HotelClass.objects.create(name="Benchmark")
+    placement_sql = (
+        f"INSERT INTO {Placement._meta.db_table} "
+        "(id, country, city, address, latitude, longitude, geohash) "
+        "VALUES (%s, '', '', '', %s, %s, %s)"
+    )
+    hotel_sql = (
+        f"INSERT INTO {Hotel._meta.db_table} "
+        "(id, name, hotel_class_id, placement_id, archived_rating_sum, "
+        "archived_reviews_amount) VALUES (%s, %s, %s, %s, 0, 0)"
+    )
+    with connection.cursor() as cursor:
+        for start in range(1, hotels + 1, BATCH_SIZE):
+            ids = range(start, min(start + BATCH_SIZE, hotels + 1))
+            points = [random_point(rng) for _ in ids]
+            cursor.executemany(placement_sql, [
+                (i, lat, lon, geohash.encode(lat, lon))
+                for i, (lat, lon) in zip(ids, points)
+            ])
+            cursor.executemany(hotel_sql, [
+                (i, f"Hotel {i}", hotel_class.id, i) for i in ids
+            ])
+        cursor.execute("ANALYZE")
+
+
+def time_queries(search, points) -> tuple[float, float]:
+    timings = []
+    for lat, lon in points:
+        started = time.perf_counter()
+        search(lat, lon)
+        timings.append(time.perf_counter() - started)
+    quantiles = statistics.quantiles(timings, n=100)
+    return quantiles[49] * 1000, quantiles[98] * 1000
+
+
+def full_scan(lat: float, lon: float, limit: int = 10) -> list:
+    rows = Placement.objects.values_list("id", "latitude", "longitude")
+    return sorted(
+        (geohash.distance_km(lat, lon, other_lat, other_lon), placement_id)
+        for placement_id, other_lat, other_lon
+        in rows.iterator(chunk_size=10_000)
+    )[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hotels", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scans", type=int, default=3,
+                        help="full scan queries to compare against")
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        fill(options.hotels)
+        print(f"hotels:            {options.hotels:,} "
+              f"(filled in {time.perf_counter() - started:.0f} s)")
+        rng = random.Random(2)
+        points = [
+            (lat + rng.gauss(0, 0.3), lon + rng.gauss(0, 0.3))
+            for lat, lon in rng.choices(CITIES, k=options.queries)
+        ]
+        print(f"{'search':<18}{'p50 ms':>9}{'p99 ms':>9}")
+        for name, search in (
+            ("10 nearest", lambda lat, lon: nearby_hotels(lat, lon)),
+            ("100 nearest", lambda lat, lon: nearby_hotels(
+                lat, lon, limit=100
+            )),
+            ("within 1 km", lambda lat, lon: nearby_hotels(
+                lat, lon, radius_km=1, limit=100
+            )),
+            ("within 10 km", lambda lat, lon: nearby_hotels(
+                lat, lon, radius_km=10, limit=100
+            )),
+        ):
+            p50, p99 = time_queries(search, points)
+            print(f"{name:<18}{p50:>9.1f}{p99:>9.1f}")
+        timings = []
+        for lat, lon in points[:options.scans]:
+            started = time.perf_counter()
+            full_scan(lat, lon)
+            timings.append(time.perf_counter() - started)
+        print(f"{'full scan':<18}{statistics.median(timings) * 1000:>9.0f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Deleting a hotel with many reviews: Django's cascade versus the batched
+purge (mark_hotel_deleted + purge_hotel).
+
+Fills a throwaway in-memory database with one hotel, its reviews and their
+reactions, deletes it one way, refills and deletes it the other, and
+reports the total time, the longest single transaction (how long the
+tables stay locked) and the peak Python memory.
+
+Usage::
+
+    python benchmarks/hotel_purge.py --reviews 5000 --reactions 2
+    python benchmarks/hotel_purge.py --reviews 100000 --method batched
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ["REVIEW_SHARDS"] = "0"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment
+)
+
+from hotel_review_service import purge, reputation, rollups  # noqa: E402
+from hotel_review_service.models import (  # noqa: E402
+    Hotel,
+    HotelClass,
+    Placement,
+    Review,
+    UserReviewReaction,
+    make_excerpt
+)
+
+
+def fill(reviews: int, reactions: int) -> Hotel:
+    rng = random.Random(1)
+    hotel = Hotel.objects.create(
+        name="Benchmark",
+        hotel_class=HotelClass.objects.get_or_create(name="Benchmark")[0],
+        placement=Placement.objects.create(
+            country="Ukraine", city="Kyiv", address="1"
+        ),
+    )
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f"purge-{hotel.id}-{i}", password="!")
+        for i in range(max(50, reactions))
+    )
+    comment = "clean room friendly staff great view " * 30
+    rows = Review.objects.bulk_create(
+        (
+            Review(
+                author=rng.choice(users), hotel=hotel, caption=str(i),
+                comment=comment, excerpt=make_excerpt(comment),
+                word_count=len(comment.split()),
+                hotel_rating=rng.randint(0, 10),
+            )
+            for i in range(reviews)
+        ),
+        batch_size=5000,
+    )
+    UserReviewReaction.objects.bulk_create(
+        (
+            UserReviewReaction(user=user, review=review,
+                               reaction=rng.choice("LD"))
+            for review in rows
+            for user in rng.sample(users, reactions)
+        ),
+        batch_size=5000,
+    )
+    # bulk_create skips the signals that keep the counters.
+    reputation.rebuild()
+    rollups.rebuild()
+    rollups.rebuild_monthly_ratings()
+    return hotel
+
+
+def measure(delete) -> tuple[float, float, float]:
+    """Total seconds, longest step in seconds, peak memory in MiB."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    longest = delete()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, longest or elapsed, peak / 2 ** 20
+
+
+def cascade(hotel: Hotel):
+    return lambda: hotel.delete() and None
+
+
+def batched(hotel: Hotel, batch_size: int):
+    def delete() -> float:
+        purge.mark_hotel_deleted(hotel)
+        longest = 0.0
+        batches = purge.purge_hotel(hotel, batch_size)
+        while True:
+            started = time.perf_counter()
+            if next(batches, None) is None:
+                return longest
+            longest = max(longest, time.perf_counter() - started)
+    return delete
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--reactions", type=int, default=2,
+                        help="reactions per review")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--method", choices=["cascade", "batched"],
+                        action="append", help="run only these methods")
+    options = parser.parse_args()
+    methods = {
+        "cascade": cascade,
+        "batched": lambda hotel: batched(hotel, options.batch_size),
+    }
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = {
+            name: measure(methods[name](
+                fill(options.reviews, options.reactions)
+            ))
+            for name in options.method or methods
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    print(f"{options.reviews:,} reviews, {options.reactions} reactions each, "
+          f"batches of {options.batch_size}")
+    print(f"{'delete':<10}{'total s':>9}{'longest s':>11}{'peak MiB':>10}")
+    for name, (total, longest, peak) in results.items():
+        print(f"{name:<10}{total:>9.2f}{longest:>11.3f}{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Cost of turning 1,000 reviews into a response: the HTML list page, model
+instances through json.dumps, and the JSON API (values_list() rows through
+orjson).
+
+Fills a throwaway in-memory database with reviews and reactions, then for
+each path times fetching the rows (with like and dislike counts) and
+serializing them separately, and reports the median of several rounds and
+the size of the output.
+
+Usage::
+
+    python benchmarks/json_api.py --reviews 1000 --rounds 20
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ["REVIEW_SHARDS"] = "0"
+
+import django  # noqa: E402
+
+django.setup()
+
+import orjson  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.serializers.json import DjangoJSONEncoder  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.template.loader import render_to_string  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment
+)
+
+from hotel_review_service import api  # noqa: E402
+from hotel_review_service.forms import ReviewSearchForm  # noqa: E402
+from hotel_review_service.models import (  # noqa: E402
+    Hotel,
+    HotelClass,
+    Placement,
+    Review,
+    UserReviewReaction,
+    make_excerpt
+)
+from hotel_review_service.utils import get_review_previews  # noqa: E402
+
+
+WORDS = [
+    "room", "clean", "staff", "friendly", "breakfast", "view", "noisy",
+    "location", "pool", "bed", "comfortable", "small", "price", "great",
+]
+
+
+def fill(reviews: int, words: int, reactions: int) -> None:
+    rng = random.Random(1)
+    hotel_class = HotelClass.objects.create(name="Benchmark")
+    hotels = [
+        Hotel.objects.create(
+            name=f"Hotel {i}",
+            hotel_class=hotel_class,
+            placement=Placement.objects.create(
+                country="Ukraine", city="Kyiv", address=str(i)
+            ),
+        )
+        for i in range(20)
+    ]
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f"reviewer{i}", password="!")
+        for i in range(max(20, reactions))
+    )
+    comments = [
+        " ".join(rng.choices(WORDS, k=words)) for _ in range(reviews)
+    ]
+    rows = Review.objects.bulk_create(
+        Review(
+            author=rng.choice(users), hotel=rng.choice(hotels),
+            caption=f"Review {i}", comment=comment,
+            excerpt=make_excerpt(comment), word_count=words,
+            hotel_rating=rng.randint(0, 10),
+        )
+        for i, comment in enumerate(comments)
+    )
+    UserReviewReaction.objects.bulk_create(
+        UserReviewReaction(user=user, review=review,
+                           reaction=rng.choice("LD"))
+        for review in rows
+        for user in rng.sample(users, reactions)
+    )
+
+
+def template_path(viewer, reviews: int):
+    request = RequestFactory().get("/reviews/")
+    request.user = viewer
+
+    def fetch() -> list:
+        return list(get_review_previews(Review.objects, viewer)[:reviews])
+
+    def serialize(rows: list) -> bytes:
+        return render_to_string(
+            "hotel_review_service/review_list.html",
+            {"review_list": rows, "search_form": ReviewSearchForm()},
+            request=request,
+        ).encode()
+
+    return fetch, serialize
+
+
+def instance_path(viewer, reviews: int):
+    """What a JsonResponse over the list queryset would do."""
+
+    def fetch() -> list:
+        return list(get_review_previews(Review.objects, viewer)[:reviews])
+
+    def serialize(rows: list) -> bytes:
+        return json.dumps([
+            {
+                "id": review.id,
+                "hotel": review.hotel_id,
+                "author": review.author_id,
+                "caption": review.caption,
+                "excerpt": review.excerpt,
+                "word_count": review.word_count,
+                "hotel_rating": review.hotel_rating,
+                "created_at": review.created_at,
+                "likes": review.like_amount,
+                "dislikes": review.dislike_amount,
+            }
+            for review in rows
+        ], cls=DjangoJSONEncoder).encode()
+
+    return fetch, serialize
+
+
+def api_path(viewer, reviews: int):
+    resource = api.RESOURCES["review"]
+    fields = list(resource.list_fields)
+
+    def fetch() -> list:
+        return list(
+            api.select(resource.queryset, resource, fields)[:reviews]
+        )
+
+    def serialize(rows: list) -> bytes:
+        return orjson.dumps({"fields": fields, "results": rows})
+
+    return fetch, serialize
+
+
+def measure(path, rounds: int) -> tuple[float, float, int]:
+    """Median fetch and serialize milliseconds, and output bytes."""
+    fetch, serialize = path
+    fetched, serialized = [], []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        rows = fetch()
+        fetched.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        output = serialize(rows)
+        serialized.append(time.perf_counter() - started)
+    return (
+        statistics.median(fetched) * 1000,
+        statistics.median(serialized) * 1000,
+        len(output),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=100)
+    parser.add_argument("--reactions", type=int, default=3,
+                        help="reactions per review")
+    parser.add_argument("--rounds", type=int, default=20)
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        fill(options.reviews, options.words, options.reactions)
+        viewer = get_user_model().objects.first()
+        results = {
+            name: measure(path(viewer, options.reviews), options.rounds)
+            for name, path in (
+                ("HTML template", template_path),
+                ("json.dumps", instance_path),
+                ("JSON API", api_path),
+            )
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    print(f"{options.reviews:,} reviews, about {options.words} words and "
+          f"{options.reactions} reactions each")
+    print(f"{'path':<15}{'fetch ms':>10}{'serialize ms':>14}{'KiB':>8}")
+    for name, (fetch_ms, serialize_ms, size) in results.items():
+        print(f"{name:<15}{fetch_ms:>10.1f}{serialize_ms:>14.1f}"
+              f"{size / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
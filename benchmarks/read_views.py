@@ -0,0 +1,362 @@
+"""
+Requests per second on the read pages under WSGI, ASGI with the
+class-based views and ASGI with the async views (ASYNC_READ_VIEWS).
+
+Every mode runs in a fresh interpreter with the production settings
+(run ``collectstatic`` first) against the same generated SQLite database.
+Requests go straight to the WSGI or ASGI application, without a server,
+so the numbers compare the handlers and views rather than the HTTP stack.
+WSGI gets a fixed pool of worker threads like a threaded
+server; ASGI runs every request on one event loop. ``--latency-ms`` adds a
+sleep to every query to stand in for the round trip to a database server,
+which is what makes worker threads sit idle.
+
+Usage::
+
+    python benchmarks/read_views.py --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+MODES = {
+    "wsgi": {"ASYNC_READ_VIEWS": "False"},
+    "asgi-sync": {"ASYNC_READ_VIEWS": "False"},
+    "asgi-async": {"ASYNC_READ_VIEWS": "True"},
+}
+
+
+def mode_env(database: Path) -> dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "DJANGO_SETTINGS_MODULE": "core.settings_production",
+        "DATABASE_URL": f"sqlite:///{database}",
+        "DJANGO_ALLOWED_HOSTS": "testserver",
+        "REVIEW_SHARDS": "0",
+        # Queue waits count as query time at high concurrency: don't log
+        # (and write) half the queries as slow.
+        "SLOW_QUERY_THRESHOLD_MS": "0",
+    })
+    env.setdefault("DJANGO_SECRET_KEY", "read-views-benchmark")
+    return env
+
+
+def setup_django() -> None:
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+
+    django.setup()
+
+
+def fill(hotels: int) -> None:
+    """Migrate and fill the database, print a session key to log in with."""
+    setup_django()
+    from django.contrib.auth import (
+        BACKEND_SESSION_KEY,
+        HASH_SESSION_KEY,
+        SESSION_KEY,
+        get_user_model
+    )
+    from django.conf import settings
+    from django.core.management import call_command
+
+    from hotel_review_service.models import (
+        Hotel,
+        HotelClass,
+        Placement,
+        Review,
+        UserReviewReaction,
+        make_excerpt
+    )
+
+    call_command("migrate", verbosity=0)
+    rng = random.Random(1)
+    hotel_class = HotelClass.objects.create(name="Benchmark")
+    placements = Placement.objects.bulk_create(
+        Placement(country="Ukraine", city=f"City {i % 20}",
+                  address=f"Street {i}")
+        for i in range(hotels)
+    )
+    hotel_rows = Hotel.objects.bulk_create(
+        Hotel(name=f"Hotel {i:05}", placement=placement,
+              hotel_class=hotel_class)
+        for i, placement in enumerate(placements)
+    )
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f"reviewer{i}", first_name="Reviewer",
+                         last_name=str(i), password="!")
+        for i in range(hotels)
+    )
+    reviews = []
+    for i in range(hotels * 10):
+        comment = " ".join(rng.choices(
+            ["clean", "room", "staff", "view", "noisy", "great", "stay"],
+            k=rng.randint(20, 200),
+        ))
+        reviews.append(Review(
+            author=rng.choice(users), hotel=rng.choice(hotel_rows),
+            caption=f"Review {i}", comment=comment,
+            excerpt=make_excerpt(comment), word_count=len(comment.split()),
+            hotel_rating=rng.randint(0, 10),
+        ))
+    reviews = Review.objects.bulk_create(reviews)
+    UserReviewReaction.objects.bulk_create(
+        UserReviewReaction(user=user, review=review,
+                           reaction=rng.choice("LD"))
+        for user in users[:20]
+        for review in rng.sample(reviews, 50)
+    )
+
+    viewer = users[0]
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(viewer.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = viewer.get_session_auth_hash()
+    session.create()
+    print(json.dumps({
+        "session": session.session_key,
+        "hotels": [hotel.id for hotel in hotel_rows[:50]],
+        "users": [user.id for user in users[:50]],
+    }))
+
+
+def add_latency(seconds: float) -> None:
+    from django.db.backends.signals import connection_created
+
+    def wait(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(wait)
+
+    connection_created.connect(install, weak=False)
+
+
+def urls(fixture: dict, amount: int) -> list[str]:
+    rng = random.Random(2)
+    choices = [
+        lambda: f"/hotels/?page={rng.randint(1, 10)}",
+        lambda: f"/hotels/{rng.choice(fixture['hotels'])}/",
+        lambda: f"/reviews/?page={rng.randint(1, 10)}",
+        lambda: f"/users/{rng.choice(fixture['users'])}/",
+    ]
+    return [choices[i % len(choices)]() for i in range(amount)]
+
+
+def split(url: str) -> tuple[str, str]:
+    path, _, query = url.partition("?")
+    return path, query
+
+
+def run_wsgi(targets: list[str], cookie: str, options) -> list[float]:
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+
+    def request(url: str) -> float:
+        path, query = split(url)
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SCRIPT_NAME": "",
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": "testserver",
+            "HTTP_COOKIE": cookie,
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+            "wsgi.url_scheme": "http",
+            "wsgi.version": (1, 0),
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        statuses = []
+        started = time.perf_counter()
+        body = application(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        try:
+            b"".join(body)
+        finally:
+            getattr(body, "close", lambda: None)()
+        assert statuses[0].startswith("200"), (url, statuses[0])
+        return time.perf_counter() - started
+
+    workers = min(options.threads, options.concurrency)
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(request, targets))
+
+
+def run_asgi(targets: list[str], cookie: str, options) -> list[float]:
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def request(url: str) -> float:
+        path, query = split(url)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"cookie", cookie.encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        done = asyncio.Event()
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        statuses = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+            elif not message.get("more_body"):
+                done.set()
+
+        started = time.perf_counter()
+        await application(scope, receive, send)
+        assert statuses[0] == 200, (url, statuses[0])
+        return time.perf_counter() - started
+
+    async def main() -> list[float]:
+        semaphore = asyncio.Semaphore(options.concurrency)
+
+        async def limited(url: str) -> float:
+            async with semaphore:
+                return await request(url)
+
+        return await asyncio.gather(*(limited(url) for url in targets))
+
+    return asyncio.run(main())
+
+
+def serve(mode: str, fixture: dict, options) -> None:
+    """Runs in the mode's own interpreter, prints the measurements."""
+    setup_django()
+    add_latency(options.latency_ms / 1000)
+    run = run_wsgi if mode == "wsgi" else run_asgi
+    cookie = f"sessionid={fixture['session']}"
+    # Warm up templates, url resolvers and connections.
+    run(urls(fixture, 20), cookie, options)
+
+    targets = urls(fixture, options.requests)
+    baseline = threading.active_count()
+    peak = baseline
+    running = True
+
+    def sample_threads() -> None:
+        nonlocal peak
+        while running:
+            peak = max(peak, threading.active_count())
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample_threads)
+    sampler.start()
+    started = time.perf_counter()
+    latencies = run(targets, cookie, options)
+    elapsed = time.perf_counter() - started
+    running = False
+    sampler.join()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(json.dumps({
+        "rps": len(targets) / elapsed,
+        "p50": quantiles[49] * 1000,
+        "p99": quantiles[98] * 1000,
+        # Besides the sampler.
+        "threads": peak - baseline - 1,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8,
+                        help="WSGI worker threads")
+    parser.add_argument("--latency-ms", type=float, default=2.0,
+                        help="simulated database round trip per query")
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--mode", choices=MODES, action="append",
+                        help="run only these modes")
+    parser.add_argument("--serve", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--fixture", help=argparse.SUPPRESS)
+    parser.add_argument("--fill", type=int, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.fill:
+        fill(options.fill)
+        return
+    if options.serve:
+        serve(options.serve, json.loads(options.fixture), options)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(directory) / "benchmark.sqlite3"
+        fixture = subprocess.run(
+            [sys.executable, __file__, "--fill", str(options.hotels)],
+            env=mode_env(database), cwd=BASE_DIR,
+            check=True, capture_output=True, text=True,
+        ).stdout.splitlines()[-1]
+
+        print(
+            f"{options.requests} requests, concurrency "
+            f"{options.concurrency}, {options.latency_ms:g} ms per query, "
+            f"{options.threads} WSGI threads"
+        )
+        print(f"{'mode':<12}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}"
+              f"{'peak threads':>14}")
+        for mode in options.mode or MODES:
+            result = subprocess.run(
+                [
+                    sys.executable, __file__, "--serve", mode,
+                    "--fixture", fixture,
+                    "--concurrency", str(options.concurrency),
+                    "--requests", str(options.requests),
+                    "--threads", str(options.threads),
+                    "--latency-ms", str(options.latency_ms),
+                ],
+                env={**mode_env(database), **MODES[mode]}, cwd=BASE_DIR,
+                check=True, capture_output=True, text=True,
+            )
+            stats = json.loads(result.stdout.splitlines()[-1])
+            print(
+                f"{mode:<12}{stats['rps']:>8.0f}{stats['p50']:>9.1f}"
+                f"{stats['p99']:>9.1f}{stats['threads']:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
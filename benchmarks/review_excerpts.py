@@ -0,0 +1,149 @@
+"""
+Bytes fetched per review list page with and without the full comment.
+
+Fills a throwaway in-memory database with synthetic reviews, then runs the
+review list queryset as it was (every column) and as list pages run it now
+(``get_review_previews``: excerpt instead of comment and minhash), and
+reports the bytes the database hands back per page and the query time.
+
+Usage::
+
+    python benchmarks/review_excerpts.py --reviews 2000 --words 300
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ["REVIEW_SHARDS"] = "0"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment
+)
+
+from hotel_review_service.models import (  # noqa: E402
+    Hotel,
+    HotelClass,
+    Placement,
+    Review
+)
+from hotel_review_service.utils import (  # noqa: E402
+    get_review_previews,
+    get_reviews_with_calculated_fields
+)
+from hotel_review_service.views import ReviewListView  # noqa: E402
+
+
+WORDS = [
+    "room", "clean", "staff", "friendly", "breakfast", "view", "noisy",
+    "location", "pool", "bed", "comfortable", "small", "price", "great",
+    "the", "and", "was", "very", "a", "we", "would", "stay", "again",
+]
+
+
+def fill(reviews: int, words: int) -> None:
+    rng = random.Random(1)
+    hotel_class = HotelClass.objects.create(name="Benchmark")
+    hotels = [
+        Hotel.objects.create(
+            name=f"Hotel {i}",
+            hotel_class=hotel_class,
+            placement=Placement.objects.create(
+                country="Ukraine", city="Kyiv", address=str(i)
+            ),
+        )
+        for i in range(20)
+    ]
+    authors = [
+        get_user_model().objects.create_user(username=f"reviewer{i}")
+        for i in range(20)
+    ]
+    for i in range(reviews):
+        # save() fills the excerpt, word count and minhash.
+        Review.objects.create(
+            author=rng.choice(authors),
+            hotel=rng.choice(hotels),
+            caption=f"Review {i}",
+            comment=" ".join(
+                rng.choices(WORDS, k=rng.randint(words // 2, words * 3 // 2))
+            ),
+            hotel_rating=rng.randint(0, 10),
+        )
+
+
+def row_bytes(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    return 8
+
+
+def measure(queryset, page_size: int, pages: int) -> tuple[float, float]:
+    """Mean bytes and milliseconds per page over the first ``pages``."""
+    sizes, timings = [], []
+    for page in range(pages):
+        sql, params = queryset[
+            page * page_size:(page + 1) * page_size
+        ].query.sql_with_params()
+        with connection.cursor() as cursor:
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            timings.append(time.perf_counter() - started)
+        sizes.append(sum(row_bytes(value) for row in rows for value in row))
+    return statistics.mean(sizes), statistics.mean(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument(
+        "--page-size", type=int, default=ReviewListView.paginate_by
+    )
+    parser.add_argument("--pages", type=int, default=50)
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        fill(options.reviews, options.words)
+        full_bytes, full_ms = measure(
+            get_reviews_with_calculated_fields(Review.objects),
+            options.page_size, options.pages,
+        )
+        preview_bytes, preview_ms = measure(
+            get_review_previews(Review.objects),
+            options.page_size, options.pages,
+        )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    print(f"reviews:       {options.reviews:,} "
+          f"(about {options.words} words each)")
+    print(f"page size:     {options.page_size}")
+    print(f"full rows:     {full_bytes / 1024:.1f} KiB/page, {full_ms:.2f} ms")
+    print(f"preview rows:  {preview_bytes / 1024:.1f} KiB/page, "
+          f"{preview_ms:.2f} ms")
+    print(f"saved:         {1 - preview_bytes / full_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
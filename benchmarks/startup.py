@@ -0,0 +1,104 @@
+"""
+Startup-time benchmark for the settings profiles.
+
+For each profile it measures, in fresh interpreter processes:
+
+* wall time of ``manage.py check``;
+* time to build the WSGI application and serve the first request
+  (login page, so no database rows are needed).
+
+Usage::
+
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    "development": "core.settings",
+    "production": "core.settings_production",
+}
+
+FIRST_REQUEST_SCRIPT = """
+import time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+application = get_wsgi_application()
+loaded = time.perf_counter()
+response = Client().get("/accounts/login/")
+assert response.status_code == 200, response.status_code
+finished = time.perf_counter()
+print(loaded - started, finished - loaded)
+"""
+
+
+def profile_env(settings_module: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env["DJANGO_SETTINGS_MODULE"] = settings_module
+    env.setdefault("DJANGO_SECRET_KEY", "startup-benchmark")
+    env.setdefault("DJANGO_ALLOWED_HOSTS", "testserver")
+    return env
+
+
+def time_check(env: dict[str, str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "manage.py", "check"],
+        cwd=BASE_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    return time.perf_counter() - started
+
+
+def time_first_request(env: dict[str, str]) -> tuple[float, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_SCRIPT],
+        cwd=BASE_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    setup, first_request = map(float, result.stdout.split())
+    return setup, first_request
+
+
+def summary(values: list[float]) -> str:
+    return (
+        f"median {statistics.median(values) * 1000:8.1f} ms  "
+        f"min {min(values) * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--profile", choices=PROFILES, action="append", dest="profiles"
+    )
+    args = parser.parse_args()
+
+    for name in args.profiles or PROFILES:
+        env = profile_env(PROFILES[name])
+        checks = [time_check(env) for _ in range(args.runs)]
+        requests = [time_first_request(env) for _ in range(args.runs)]
+
+        print(f"[{name}] {PROFILES[name]}")
+        print(f"  manage.py check     {summary(checks)}")
+        print(f"  django.setup + WSGI {summary([r[0] for r in requests])}")
+        print(f"  first request       {summary([r[1] for r in requests])}")
+
+
+if __name__ == "__main__":
+    main()
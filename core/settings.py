@@ -10,17 +10,24 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 import os
-import dj_database_url
 from pathlib import Path
 
-from dotenv import load_dotenv
-
-
-load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / "subdir".
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+if (BASE_DIR / ".env").exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
+
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
@@ -29,11 +36,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "django-insecure-!n(@68hbrbr7ee&f$zj+_t$o4q=u%uy)-9@@nc+o)@ans#nn86")
 
 # SECURITY WARNING: don"t run with debug turned on in production!
-DEBUG = os.environ.get("DJANGO_DEBUG", "") != "False"
+DEBUG = env_flag("DJANGO_DEBUG", True)
 
-ALLOWED_HOSTS = [
-    "127.0.0.1",
-]
+ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "127.0.0.1").split(",")
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -48,7 +53,6 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
     "crispy_forms",
     "crispy_bootstrap4",
     "hotel_review_service",
@@ -60,16 +64,26 @@ CRISPY_TEMPLATE_PACK = "bootstrap4"
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "hotel_review_service.middleware.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "hotel_review_service.middleware.ProfilingMiddleware",
+    "hotel_review_service.middleware.SlowQueryMiddleware",
 ]
 
+if DEBUG and env_flag("DJANGO_DEBUG_TOOLBAR", True):
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index(
+            "hotel_review_service.middleware.StaticFilesMiddleware"
+        ) + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 ROOT_URLCONF = "core.urls"
 
 TEMPLATES = [
@@ -101,10 +115,37 @@ DATABASES = {
     }
 }
 
-db_from_env = dj_database_url.config(conn_max_age=500)
-DATABASES["default"].update(db_from_env)
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+if DATABASE_URL:
+    import dj_database_url
 
-DATABASE_URL = os.environ["DATABASE_URL"]
+    DATABASES["default"].update(
+        dj_database_url.parse(DATABASE_URL, conn_max_age=500)
+    )
+
+# Reviews and reactions split over REVIEW_SHARDS databases by hotel, see
+# hotel_review_service/sharding.py. 0 keeps everything in "default".
+# REVIEW_SHARD_DATABASE_URL is formatted with {shard}; without it every
+# shard is an SQLite file next to db.sqlite3.
+REVIEW_SHARDS = int(os.environ.get("REVIEW_SHARDS", 0))
+REVIEW_SHARD_DATABASE_URL = os.environ.get("REVIEW_SHARD_DATABASE_URL")
+
+for shard in range(REVIEW_SHARDS):
+    if REVIEW_SHARD_DATABASE_URL:
+        import dj_database_url
+
+        DATABASES[f"shard_{shard}"] = dj_database_url.parse(
+            REVIEW_SHARD_DATABASE_URL.format(shard=shard), conn_max_age=500
+        )
+    else:
+        DATABASES[f"shard_{shard}"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / f"db_shard_{shard}.sqlite3",
+        }
+
+if REVIEW_SHARDS:
+    DATABASE_ROUTERS = ["hotel_review_service.sharding.ReviewShardRouter"]
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -126,8 +167,88 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "hotel_review_service.User"
 
+# Set DJANGO_CACHED_AUTH to resolve the logged-in user from the cache
+# instead of the database on every request.
+if env_flag("DJANGO_CACHED_AUTH", False):
+    AUTHENTICATION_BACKENDS = [
+        "hotel_review_service.backends.CachedModelBackend",
+    ]
+
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 300))
+
+SESSION_ENGINE = os.environ.get(
+    "DJANGO_SESSION_ENGINE", "django.contrib.sessions.backends.db"
+)
+
+# Per-process LRU of search result ids, see hotel_review_service/search_cache.py
+SEARCH_CACHE_MAX_BYTES = int(
+    os.environ.get("SEARCH_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+)
+SEARCH_CACHE_MAX_IDS = int(os.environ.get("SEARCH_CACHE_MAX_IDS", 100_000))
+# Seconds a worker may serve cached ids after another worker's write when
+# the cache is not shared between workers.
+SEARCH_CACHE_TIMEOUT = int(os.environ.get("SEARCH_CACHE_TIMEOUT", 60))
+
+# In-process hotel autocomplete index, see hotel_review_service/autocomplete.py
+AUTOCOMPLETE_WARM_ON_STARTUP = env_flag("AUTOCOMPLETE_WARM_ON_STARTUP", False)
+AUTOCOMPLETE_REFRESH_SECONDS = int(
+    os.environ.get("AUTOCOMPLETE_REFRESH_SECONDS", 30)
+)
+# Rebuild an older index even if no write was seen, for caches that are
+# not shared between workers.
+AUTOCOMPLETE_MAX_AGE_SECONDS = int(
+    os.environ.get("AUTOCOMPLETE_MAX_AGE_SECONDS", 300)
+)
+
+# Request profiling, see hotel_review_service/middleware.py. Disabled
+# unless PROFILING_DIR is set.
+PROFILING_DIR = os.environ.get("PROFILING_DIR") or None
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+
+# Queries slower than this are logged with their EXPLAIN and counted per
+# fingerprint, see hotel_review_service/slow_queries.py. 0 disables.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 500))
+
+# Reputation (likes minus dislikes received) that earns a "Top reviewer" badge
+TOP_REVIEWER_REPUTATION = int(os.environ.get("TOP_REVIEWER_REPUTATION", 10))
+
+# Above this many rows list views and the admin paginate with an estimated
+# count, see hotel_review_service/pagination.py
+PAGINATOR_ESTIMATE_THRESHOLD = int(
+    os.environ.get("PAGINATOR_ESTIMATE_THRESHOLD", 100_000)
+)
+
+# Server-Sent Events for hotel pages, see hotel_review_service/events.py.
+# The stream endpoint needs an ASGI server (core/asgi.py).
+LIVE_EVENTS_BROADCAST = os.environ.get(
+    "LIVE_EVENTS_BROADCAST", "hotel_review_service.events.LocalBroadcast"
+)
+LIVE_EVENTS_HEARTBEAT_SECONDS = int(
+    os.environ.get("LIVE_EVENTS_HEARTBEAT_SECONDS", 15)
+)
+LIVE_EVENTS_MAX_QUEUED = int(os.environ.get("LIVE_EVENTS_MAX_QUEUED", 100))
+
+# Serve the hotel list and detail, review list and user detail pages with
+# async views (hotel_review_service/urls.py). Only worth it under ASGI:
+# under WSGI every async view call starts an event loop.
+ASYNC_READ_VIEWS = env_flag("ASYNC_READ_VIEWS", False)
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "DJANGO_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+
 LOGIN_REDIRECT_URL = "/"
 
+REVIEW_ARCHIVE_AFTER_DAYS = int(
+    os.environ.get("REVIEW_ARCHIVE_AFTER_DAYS", 365 * 2)
+)
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
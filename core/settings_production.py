@@ -0,0 +1,99 @@
+"""
+Production settings for core project.
+
+Use with DJANGO_SETTINGS_MODULE=core.settings_production. Debug tooling is
+never loaded, templates are compiled once per worker and database
+connections are kept open between requests.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from core.settings import *  # noqa: F401, F403
+from core.settings import (
+    CACHES,
+    DATABASES,
+    INSTALLED_APPS,
+    MIDDLEWARE,
+    TEMPLATES,
+    env_flag
+)
+
+
+DEBUG = env_flag("DJANGO_DEBUG", False)
+
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if not middleware.startswith("debug_toolbar.")
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "context_processors": [
+                processor
+                for processor in TEMPLATES[0]["OPTIONS"]["context_processors"]
+                if processor != "django.template.context_processors.debug"
+            ],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]
+
+DATABASES["default"]["CONN_MAX_AGE"] = int(
+    os.environ.get("DJANGO_CONN_MAX_AGE", 600)
+)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+SESSION_COOKIE_SECURE = env_flag("DJANGO_SECURE_COOKIES", True)
+CSRF_COOKIE_SECURE = env_flag("DJANGO_SECURE_COOKIES", True)
+
+# Cached users and sessions are invalidated through the cache. A
+# per-process cache would only drop them in the worker that served the
+# logout or password change, so both need a shared DJANGO_CACHE_BACKEND
+# and are on by default only with one.
+PROCESS_LOCAL_CACHES = {"django.core.cache.backends.locmem.LocMemCache"}
+SHARED_CACHE = CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES
+CACHED_SESSION_ENGINES = {
+    "django.contrib.sessions.backends.cache",
+    "django.contrib.sessions.backends.cached_db",
+}
+
+if env_flag("DJANGO_CACHED_AUTH", SHARED_CACHE):
+    if not SHARED_CACHE:
+        raise ImproperlyConfigured(
+            "DJANGO_CACHED_AUTH needs a cache shared by every worker: set "
+            "DJANGO_CACHE_BACKEND, e.g. to Redis or Memcached"
+        )
+    AUTHENTICATION_BACKENDS = [
+        "hotel_review_service.backends.CachedModelBackend",
+    ]
+
+SESSION_ENGINE = os.environ.get(
+    "DJANGO_SESSION_ENGINE",
+    "django.contrib.sessions.backends.cached_db" if SHARED_CACHE
+    else "django.contrib.sessions.backends.db",
+)
+if SESSION_ENGINE in CACHED_SESSION_ENGINES and not SHARED_CACHE:
+    raise ImproperlyConfigured(
+        f"{SESSION_ENGINE} needs a cache shared by every worker: set "
+        f"DJANGO_CACHE_BACKEND, e.g. to Redis or Memcached"
+    )
+
+AUTOCOMPLETE_WARM_ON_STARTUP = env_flag("AUTOCOMPLETE_WARM_ON_STARTUP", True)
@@ -0,0 +1,14 @@
+"""
+Test settings for core project with reviews split over two shards.
+
+Runs the whole suite the way a sharded deployment stores reviews:
+
+    python manage.py test --settings=core.settings_test_shards
+
+REVIEW_SHARDS from the environment still wins, e.g. REVIEW_SHARDS=3.
+"""
+import os
+
+os.environ.setdefault("REVIEW_SHARDS", "2")
+
+from core.settings import *  # noqa: E402, F401, F403
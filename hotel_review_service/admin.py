@@ -1,17 +1,84 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from .forms import UserChangeForm, UserCreationForm
 from .models import (
     HotelClass,
     Hotel,
     Placement,
     User,
-    Review
+    Review,
+    SlowQuery,
+    UserReviewReaction
 )
+from .pagination import EstimatedCountPaginator
+from .purge import mark_hotel_deleted, mark_user_deleted
 
 
-admin.site.register(Hotel)
+class EstimatedCountAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered COUNT(*) behind "N total".
+    show_full_result_count = False
+
+
+class PurgedLaterAdmin(admin.ModelAdmin):
+    """
+    Deletes by marking: the purge_deleted command removes the rows in
+    batches. The confirmation page lists only the selected objects instead
+    of collecting every related row.
+    """
+
+    mark_deleted = None
+
+    def get_deleted_objects(self, objs, request):
+        return (
+            [str(obj) for obj in objs],
+            {self.model._meta.verbose_name_plural: len(objs)},
+            set(),
+            [],
+        )
+
+    def delete_model(self, request, obj) -> None:
+        self.mark_deleted(obj)
+
+    def delete_queryset(self, request, queryset) -> None:
+        for obj in queryset:
+            self.mark_deleted(obj)
+
+
+class HotelAdmin(PurgedLaterAdmin, EstimatedCountAdmin):
+    mark_deleted = staticmethod(mark_hotel_deleted)
+
+
+class EstimatedCountUserAdmin(
+    PurgedLaterAdmin, EstimatedCountAdmin, UserAdmin
+):
+    mark_deleted = staticmethod(mark_user_deleted)
+    form = UserChangeForm
+    add_form = UserCreationForm
+
+
+class ReviewAdmin(EstimatedCountAdmin):
+    list_select_related = ("hotel", "author")
+    raw_id_fields = ("author", "hotel", "duplicate_of")
+
+
+class UserReviewReactionAdmin(EstimatedCountAdmin):
+    list_display = ("user", "review", "reaction")
+    list_select_related = ("user", "review")
+    raw_id_fields = ("user", "review")
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("view", "calls", "total_time", "max_time", "last_seen")
+    list_filter = ("view",)
+    readonly_fields = ("fingerprint", "sql", "plan", "first_seen")
+
+
+admin.site.register(Hotel, HotelAdmin)
 admin.site.register(HotelClass)
 admin.site.register(Placement)
-admin.site.register(Review)
-admin.site.register(User, UserAdmin)
+admin.site.register(Review, ReviewAdmin)
+admin.site.register(UserReviewReaction, UserReviewReactionAdmin)
+admin.site.register(User, EstimatedCountUserAdmin)
+admin.site.register(SlowQuery, SlowQueryAdmin)
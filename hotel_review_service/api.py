@@ -0,0 +1,228 @@
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any
+
+import orjson
+from django.db.models import (
+    Count,
+    Expression,
+    Model,
+    OuterRef,
+    QuerySet,
+    Subquery
+)
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
+
+from hotel_review_service import sharding
+from hotel_review_service.models import (
+    Hotel,
+    Review,
+    User,
+    UserReviewReaction
+)
+from hotel_review_service.pagination import EstimatedCountPaginator
+from hotel_review_service.utils import exclude_deleted
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def reaction_count(reaction: str) -> Coalesce:
+    """Reactions of one kind on the outer review, without a join."""
+    return Coalesce(
+        Subquery(
+            UserReviewReaction.objects.filter(
+                review=OuterRef("id"), reaction=reaction
+            )
+            .order_by()
+            .values("review")
+            .annotate(amount=Count("id"))
+            .values("amount")
+        ),
+        0,
+    )
+
+
+@dataclass(frozen=True)
+class Resource:
+    model: type[Model]
+    # Public name: a values_list() lookup, or an expression computed only
+    # when the field is asked for.
+    fields: dict[str, str | Expression]
+    list_fields: tuple[str, ...]
+    detail_fields: tuple[str, ...]
+    # Query parameter: lookup, for the list.
+    filters: dict[str, str] = field(default_factory=dict)
+    ordering: tuple[str, ...] = ("id",)
+    # The filter that names the shard, for sharded models.
+    shard_by: str | None = None
+
+    @property
+    def queryset(self) -> QuerySet:
+        if self.model is Review:
+            return exclude_deleted(Review.objects).order_by(*self.ordering)
+        return self.model.objects.order_by(*self.ordering)
+
+
+HOTEL_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "hotel_class": "hotel_class__name",
+    "country": "placement__country",
+    "city": "placement__city",
+    "address": "placement__address",
+    "latitude": "placement__latitude",
+    "longitude": "placement__longitude",
+}
+
+# Only the review's own columns: hotels and users may be in another
+# database, see sharding.py.
+REVIEW_FIELDS = {
+    "id": "id",
+    "hotel": "hotel_id",
+    "author": "author_id",
+    "caption": "caption",
+    "excerpt": "excerpt",
+    "comment": "comment",
+    "word_count": "word_count",
+    "hotel_rating": "hotel_rating",
+    "created_at": "created_at",
+    "likes": reaction_count("L"),
+    "dislikes": reaction_count("D"),
+}
+
+USER_FIELDS = {
+    "id": "id",
+    "username": "username",
+    "first_name": "first_name",
+    "last_name": "last_name",
+    "reviews_amount": "reviews_amount",
+    "reputation": "reputation",
+}
+
+RESOURCES = {
+    "hotel": Resource(
+        model=Hotel,
+        fields=HOTEL_FIELDS,
+        list_fields=tuple(HOTEL_FIELDS),
+        detail_fields=tuple(HOTEL_FIELDS),
+        filters={
+            "hotel_class": "hotel_class_id",
+            "country": "placement__country__iexact",
+            "city": "placement__city__iexact",
+        },
+    ),
+    "review": Resource(
+        model=Review,
+        fields=REVIEW_FIELDS,
+        # The comment can run to pages: lists send the excerpt unless
+        # ?fields= asks for it.
+        list_fields=tuple(
+            name for name in REVIEW_FIELDS if name != "comment"
+        ),
+        detail_fields=tuple(REVIEW_FIELDS),
+        filters={"hotel": "hotel_id", "author": "author_id"},
+        ordering=("-created_at", "-id"),
+        shard_by="hotel",
+    ),
+    "user": Resource(
+        model=User,
+        fields=USER_FIELDS,
+        list_fields=tuple(USER_FIELDS),
+        detail_fields=tuple(USER_FIELDS),
+    ),
+}
+
+
+def select(
+    queryset: QuerySet, resource: Resource, fields: list[str]
+) -> QuerySet:
+    """Plain tuples of ``fields``: no model instances to build."""
+    expressions = {
+        name: resource.fields[name]
+        for name in fields
+        if not isinstance(resource.fields[name], str)
+    }
+    return queryset.annotate(**expressions).values_list(*(
+        name if name in expressions else resource.fields[name]
+        for name in fields
+    ))
+
+
+def filter_list(resource: Resource, filters: dict[str, Any]) -> QuerySet:
+    queryset = resource.queryset.filter(**{
+        resource.filters[name]: value
+        for name, value in filters.items()
+        if value not in (None, "")
+    })
+    if resource.shard_by and filters.get(resource.shard_by) is not None:
+        queryset = queryset.using(
+            sharding.shard_for_hotel(filters[resource.shard_by])
+        )
+    return queryset
+
+
+def list_page(
+    resource: Resource,
+    queryset: QuerySet,
+    fields: list[str],
+    number: int,
+    page_size: int,
+) -> dict[str, Any]:
+    """
+    One page as ``{"fields": [...], "results": [[...], ...]}``: each row is
+    an array in the order of ``fields`` rather than an object repeating
+    every key. Raises InvalidPage.
+    """
+    columns = list(fields)
+    scattered = (
+        resource.shard_by and sharding.is_enabled() and queryset._db is None
+    )
+    if scattered:
+        # Merge the shards on (created_at, id), asked for or not.
+        columns += [
+            name for name in ("created_at", "id") if name not in columns
+        ]
+    rows = select(queryset, resource, columns)
+    if scattered:
+        rows = sharding.scatter(
+            rows,
+            key=itemgetter(columns.index("created_at"), columns.index("id")),
+        )
+    paginator = EstimatedCountPaginator(rows, page_size)
+    page = paginator.page(number)
+    results = list(page.object_list)
+    if len(columns) > len(fields):
+        results = [row[:len(fields)] for row in results]
+    return {
+        "fields": fields,
+        "count": paginator.count,
+        "count_is_estimated": paginator.is_estimated,
+        "page": page.number,
+        "num_pages": paginator.num_pages,
+        "results": results,
+    }
+
+
+def detail(
+    resource: Resource, pk: int, fields: list[str]
+) -> dict[str, Any] | None:
+    queryset = resource.queryset.filter(pk=pk)
+    if resource.shard_by and sharding.is_enabled():
+        queryset = queryset.using(sharding.shard_for_review(pk))
+    row = select(queryset, resource, fields).first()
+    if row is None:
+        return None
+    return dict(zip(fields, row))
+
+
+def json_response(payload: Any, status: int = 200) -> HttpResponse:
+    """
+    orjson writes datetimes and tuples natively and is several times
+    faster than the json module JsonResponse uses.
+    """
+    return HttpResponse(
+        orjson.dumps(payload), content_type="application/json", status=status
+    )
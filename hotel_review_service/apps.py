@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class HotelReviewServiceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "hotel_review_service"
+
+    def ready(self) -> None:
+        from django.conf import settings
+
+        from hotel_review_service import signals  # noqa: F401
+
+        if settings.AUTOCOMPLETE_WARM_ON_STARTUP:
+            from django.core.signals import request_started
+
+            from hotel_review_service.autocomplete import WARM_UP_UID, warm_up
+
+            request_started.connect(warm_up, dispatch_uid=WARM_UP_UID)
@@ -0,0 +1,81 @@
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, Sum, F
+from django.utils import timezone
+
+from hotel_review_service import pagination, rollups
+from hotel_review_service.models import (
+    ArchivedReview,
+    ArchivedUserReviewReaction,
+    Hotel,
+    Review,
+    ReviewBucket,
+    UserReviewReaction
+)
+
+
+def get_archive_cutoff(days: int) -> datetime.date:
+    return timezone.localdate() - datetime.timedelta(days=days)
+
+
+@transaction.atomic
+def archive_reviews_batch(cutoff: datetime.date, batch_size: int) -> int:
+    review_ids = list(
+        Review.objects.filter(created_at__lt=cutoff)
+        .order_by("id")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not review_ids:
+        return 0
+
+    ArchivedReview.objects.bulk_create([
+        ArchivedReview(**values)
+        for values in Review.objects.filter(id__in=review_ids).values(
+            "id",
+            "author_id",
+            "hotel_id",
+            "caption",
+            "comment",
+            "created_at",
+            "hotel_rating",
+        )
+    ])
+    ArchivedUserReviewReaction.objects.bulk_create([
+        ArchivedUserReviewReaction(**values)
+        for values in UserReviewReaction.objects.filter(
+            review_id__in=review_ids
+        ).values("user_id", "review_id", "reaction")
+    ])
+
+    per_hotel = (
+        Review.objects.filter(id__in=review_ids)
+        .order_by()
+        .values("hotel_id")
+        .annotate(amount=Count("id"), rating_sum=Sum("hotel_rating"))
+    )
+    for stats in per_hotel:
+        Hotel.all_objects.filter(id=stats["hotel_id"]).update(
+            archived_reviews_amount=(
+                F("archived_reviews_amount") + stats["amount"]
+            ),
+            archived_rating_sum=(
+                F("archived_rating_sum") + stats["rating_sum"]
+            ),
+        )
+
+    ReviewBucket.objects.filter(review_id__in=review_ids).delete()
+    # The reviews still count towards the hotel rollups as archived reviews.
+    with rollups.paused():
+        _, reactions = UserReviewReaction.objects.filter(
+            review_id__in=review_ids
+        ).delete()
+        _, reviews = Review.objects.filter(id__in=review_ids).delete()
+    pagination.record_deleted(reactions)
+    pagination.record_deleted(reviews)
+    return len(review_ids)
+
+
+def archive_reviews(cutoff: datetime.date, batch_size: int = 1000):
+    while archived := archive_reviews_batch(cutoff, batch_size):
+        yield archived
@@ -0,0 +1,172 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import DatabaseError, connections
+
+from hotel_review_service.models import Hotel
+from hotel_review_service.search_cache import (
+    increment_version,
+    normalize_term
+)
+
+
+VERSION_KEY = "hotel_review_service:autocomplete-version"
+WARM_UP_UID = "hotel_review_service:autocomplete-warm-up"
+
+
+class PrefixIndex:
+    """
+    Immutable sorted-array prefix index over hotel names and cities.
+
+    ``name_keys`` holds one key per hotel (the full normalized name) and
+    ``token_keys`` one key per later name word and per city, so "kyiv"
+    finds both "Kyiv Palace" and "Hotel Kyiv". Keys are parallel to arrays
+    of hotel ids; display data is kept once per hotel.
+    """
+
+    def __init__(self, hotels: Iterable[tuple[int, str, str]]) -> None:
+        names = []
+        tokens = []
+        self.hotels: dict[int, tuple[str, str]] = {}
+        for hotel_id, name, city in hotels:
+            self.hotels[hotel_id] = (name, city)
+            normalized = normalize_term(name)
+            names.append((normalized, hotel_id))
+            words = normalized.split(" ")
+            for position in range(1, len(words)):
+                tokens.append((" ".join(words[position:]), hotel_id))
+            normalized_city = normalize_term(city)
+            if normalized_city and not normalized.startswith(normalized_city):
+                tokens.append((normalized_city, hotel_id))
+
+        names.sort()
+        tokens.sort()
+        self.name_keys = [key for key, _ in names]
+        self.name_ids = array("q", (hotel_id for _, hotel_id in names))
+        self.token_keys = [key for key, _ in tokens]
+        self.token_ids = array("q", (hotel_id for _, hotel_id in tokens))
+
+    def __len__(self) -> int:
+        return len(self.hotels)
+
+    @staticmethod
+    def _scan(keys: list[str], ids: array, prefix: str):
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix):
+            yield ids[position]
+            position += 1
+
+    def search(self, term: str, limit: int = 10) -> list[dict]:
+        prefix = normalize_term(term)
+        if not prefix:
+            return []
+        found = {}
+        for keys, ids in (
+            (self.name_keys, self.name_ids),
+            (self.token_keys, self.token_ids),
+        ):
+            for hotel_id in self._scan(keys, ids, prefix):
+                if len(found) >= limit:
+                    break
+                found.setdefault(hotel_id, None)
+        results = []
+        for hotel_id in found:
+            name, city = self.hotels[hotel_id]
+            results.append({"id": hotel_id, "name": name, "city": city})
+        return results
+
+
+class AutocompleteIndex:
+    """
+    Per-process holder of the current PrefixIndex.
+
+    Writes bump a version in Django's cache; a worker that sees a newer
+    version rebuilds in a background thread (at most once per
+    AUTOCOMPLETE_REFRESH_SECONDS) and keeps serving the old index
+    meanwhile. Without a shared cache other workers never see the bump,
+    so an index older than AUTOCOMPLETE_MAX_AGE_SECONDS is rebuilt too.
+    """
+
+    def __init__(self) -> None:
+        self.index: PrefixIndex | None = None
+        self.version = None
+        self.built_at = 0.0
+        self._lock = threading.Lock()
+        self._building = False
+        # Held for the whole of a build started by get() or a background
+        # refresh, so that the two never build at once.
+        self._build_lock = threading.Lock()
+
+    def build(self) -> PrefixIndex:
+        version = cache.get(VERSION_KEY, 0)
+        index = PrefixIndex(
+            Hotel.objects.order_by()
+            .values_list("id", "name", "placement__city")
+            .iterator(chunk_size=10000)
+        )
+        self.index, self.version, self.built_at = (
+            index, version, time.monotonic()
+        )
+        return index
+
+    def _build_in_background(self) -> None:
+        try:
+            with self._build_lock:
+                self.build()
+        except DatabaseError:
+            # E.g. warming up before migrations ran; the next request
+            # builds the index synchronously instead.
+            pass
+        finally:
+            connections.close_all()
+            self._building = False
+
+    def refresh_in_background(self) -> None:
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._build_in_background, daemon=True).start()
+
+    def get(self) -> PrefixIndex:
+        if self.index is None:
+            # Wait for the warm-up build, if one is running, rather than
+            # starting a second one; build here only if it failed.
+            with self._build_lock:
+                if self.index is None:
+                    return self.build()
+        age = time.monotonic() - self.built_at
+        stale = (
+            cache.get(VERSION_KEY, 0) != self.version
+            or age >= settings.AUTOCOMPLETE_MAX_AGE_SECONDS
+        )
+        if stale and age >= settings.AUTOCOMPLETE_REFRESH_SECONDS:
+            self.refresh_in_background()
+        return self.index
+
+    def search(self, term: str, limit: int = 10) -> list[dict]:
+        return self.get().search(term, limit)
+
+
+def invalidate() -> None:
+    increment_version(VERSION_KEY)
+
+
+def warm_up(sender, **kwargs) -> None:
+    """
+    request_started receiver: build the index in the background once the
+    process serves its first request, so that management commands such
+    as migrate, which load the app as well, never do.
+    """
+    request_started.disconnect(dispatch_uid=WARM_UP_UID)
+    if autocomplete_index.index is None:
+        autocomplete_index.refresh_in_background()
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def get_user_cache_key(user_id) -> str:
+    return f"hotel_review_service:auth-user:{user_id}"
+
+
+def invalidate_cached_user(user_id) -> None:
+    cache.delete(get_user_cache_key(user_id))
+
+
+def invalidate_cached_users(user_ids) -> None:
+    cache.delete_many([get_user_cache_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that resolves the session user from the cache."""
+
+    def get_user(self, user_id):
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+from typing import AsyncIterator, Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.module_loading import import_string
+
+from hotel_review_service import sharding
+from hotel_review_service.models import Review
+
+
+def hotel_channel(hotel_id: int) -> str:
+    return f"hotel:{hotel_id}"
+
+
+class Subscription:
+    """
+    One connected client: a bounded queue owned by the event loop that
+    serves it. A client that falls ``max_queued`` events behind is dropped
+    and reconnects, instead of letting its queue grow without bound.
+    """
+
+    def __init__(self, channel: str, max_queued: int) -> None:
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(max_queued)
+
+    def put(self, message: str) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    def deliver(self, message: str) -> None:
+        # Publishers run in request threads, queues belong to the loop.
+        self.loop.call_soon_threadsafe(self.put, message)
+
+
+class Broker:
+    """In-process pub/sub from channel name to the connected subscriptions."""
+
+    def __init__(self) -> None:
+        self._subscriptions: dict[str, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._transport = None
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = import_string(
+                settings.LIVE_EVENTS_BROADCAST
+            )(self)
+        return self._transport
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel, settings.LIVE_EVENTS_MAX_QUEUED)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def subscriber_count(self, channel: str | None = None) -> int:
+        with self._lock:
+            if channel is not None:
+                return len(self._subscriptions.get(channel, ()))
+            return sum(map(len, self._subscriptions.values()))
+
+    def has_listeners(self) -> bool:
+        """
+        False when a publish cannot reach anyone, so that publishers can
+        skip building the event. Transports that cannot tell say yes.
+        """
+        has_listeners = getattr(self.transport, "has_listeners", None)
+        return has_listeners is None or has_listeners()
+
+    def publish(self, channel: str, event: str, data: dict) -> None:
+        self.transport.send(channel, event, data)
+
+    def deliver(self, channel: str, event: str, data: dict) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        if not subscriptions:
+            return
+        message = (
+            f"id: {next(self._ids)}\n"
+            f"event: {event}\n"
+            f"data: {json.dumps(data)}\n\n"
+        )
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+
+class LocalBroadcast:
+    """
+    Delivers only to subscribers of this process.
+
+    Stand-in for a cross-worker transport: a Redis or Postgres
+    LISTEN/NOTIFY implementation would ``send`` to the shared channel and
+    call ``broker.deliver`` from its listener in every worker.
+    """
+
+    def __init__(self, broker: Broker) -> None:
+        self.broker = broker
+
+    def send(self, channel: str, event: str, data: dict) -> None:
+        self.broker.deliver(channel, event, data)
+
+    def has_listeners(self) -> bool:
+        return self.broker.subscriber_count() > 0
+
+
+broker = Broker()
+
+
+async def stream(channel: str) -> AsyncIterator[str]:
+    subscription = broker.subscribe(channel)
+    heartbeat = settings.LIVE_EVENTS_HEARTBEAT_SECONDS
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(), heartbeat
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                return
+            yield message
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def publish_review(review: Review) -> None:
+    author = review.author
+    data = {
+        "id": review.id,
+        "caption": review.caption,
+        "comment": review.comment,
+        "hotel_rating": review.hotel_rating,
+        "author": f"{author.first_name} {author.last_name}".strip()
+        or author.username,
+    }
+    # Robust: live updates are best effort and must never fail a write
+    # that has already been committed.
+    transaction.on_commit(
+        lambda: broker.publish(hotel_channel(review.hotel_id), "review", data),
+        robust=True,
+    )
+
+
+def publish_review_ratings(review_ids: Iterable[int]) -> None:
+    """Publish current like - dislike counts once the transaction commits."""
+    review_ids = set(review_ids)
+    if review_ids:
+        transaction.on_commit(
+            lambda: _send_review_ratings(review_ids), robust=True
+        )
+
+
+def _send_review_ratings(review_ids: set[int]) -> None:
+    # Checked on commit, not on save: most reactions come with no one
+    # watching, and then the counts are not worth a query.
+    if not broker.has_listeners():
+        return
+    for database, shard_review_ids in sharding.group_by_shard(
+        review_ids
+    ).items():
+        rows = (
+            Review.objects.using(database)
+            .filter(id__in=shard_review_ids)
+            .order_by()
+            .annotate(
+                likes=Count("userreviewreaction",
+                            filter=Q(userreviewreaction__reaction="L")),
+                dislikes=Count("userreviewreaction",
+                               filter=Q(userreviewreaction__reaction="D")),
+            )
+            .values_list("id", "hotel_id", "likes", "dislikes")
+        )
+        for review_id, hotel_id, likes, dislikes in rows:
+            broker.publish(
+                hotel_channel(hotel_id),
+                "reaction",
+                {"review": review_id, "rating": likes - dislikes},
+            )
@@ -1,15 +1,60 @@
 from django import forms
+from django.contrib.auth import forms as auth_forms
+
+from hotel_review_service.api import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Resource
+)
 
 from hotel_review_service.models import (
     Hotel,
-    Review
+    HotelClass,
+    Review,
+    User
+)
+from hotel_review_service.nearby import (
+    MAX_NEARBY_RESULTS,
+    MAX_SEARCH_RADIUS_KM
 )
 
 
+def clean_live_username(form: forms.ModelForm) -> str:
+    username = form.cleaned_data.get("username")
+    # The unique check only sees users that are not being deleted.
+    if username and User.all_objects.filter(
+        username=username, deleted_at__isnull=False
+    ).exclude(pk=form.instance.pk).exists():
+        raise forms.ValidationError(
+            "A user with this username is being deleted, try again later."
+        )
+    return username
+
+
+class UserCreationForm(auth_forms.UserCreationForm):
+    class Meta(auth_forms.UserCreationForm.Meta):
+        model = User
+
+    def clean_username(self) -> str:
+        return super().clean_username() and clean_live_username(self)
+
+
+class UserChangeForm(auth_forms.UserChangeForm):
+    class Meta(auth_forms.UserChangeForm.Meta):
+        model = User
+
+    def clean_username(self) -> str:
+        return clean_live_username(self)
+
+
 class HotelForm(forms.ModelForm):
     country = forms.CharField(max_length=255)
     city = forms.CharField(max_length=255)
     address = forms.CharField(max_length=255)
+    latitude = forms.FloatField(min_value=-90, max_value=90, required=False)
+    longitude = forms.FloatField(
+        min_value=-180, max_value=180, required=False
+    )
 
     class Meta:
         model = Hotel
@@ -22,9 +67,50 @@ class HotelForm(forms.ModelForm):
             initial["country"] = hotel.placement.country
             initial["city"] = hotel.placement.city
             initial["address"] = hotel.placement.address
+            initial["latitude"] = hotel.placement.latitude
+            initial["longitude"] = hotel.placement.longitude
 
         super().__init__(*args, **kwargs)
 
+    def clean_name(self) -> str:
+        name = self.cleaned_data["name"]
+        # The unique check only sees hotels that are not being deleted.
+        if Hotel.all_objects.filter(
+            name=name, deleted_at__isnull=False
+        ).exists():
+            raise forms.ValidationError(
+                "A hotel with this name is being deleted, try again later."
+            )
+        return name
+
+    def clean(self) -> dict:
+        cleaned_data = super().clean()
+        if (cleaned_data.get("latitude") is None) != (
+            cleaned_data.get("longitude") is None
+        ):
+            raise forms.ValidationError(
+                "Give both latitude and longitude, or neither."
+            )
+        return cleaned_data
+
+
+class HotelNearbyForm(forms.Form):
+    latitude = forms.FloatField(min_value=-90, max_value=90)
+    longitude = forms.FloatField(min_value=-180, max_value=180)
+    radius = forms.FloatField(
+        min_value=0.01,
+        max_value=MAX_SEARCH_RADIUS_KM,
+        required=False,
+        label="Radius, km",
+        help_text="Leave empty for the nearest hotels at any distance.",
+    )
+    limit = forms.IntegerField(
+        min_value=1,
+        max_value=MAX_NEARBY_RESULTS,
+        required=False,
+        initial=10,
+    )
+
 
 class HotelSearchForm(forms.Form):
     search = forms.CharField(
@@ -54,3 +140,78 @@ class UserSearchForm(forms.Form):
         required=False,
         label="",
     )
+
+
+class HotelRollupSearchForm(forms.Form):
+    hotel_class = forms.ModelChoiceField(
+        queryset=HotelClass.objects.all(),
+        required=False,
+        empty_label="Any class",
+        label="",
+    )
+    country = forms.CharField(
+        max_length=255,
+        required=False,
+        label="",
+        widget=forms.TextInput(attrs={"placeholder": "Country"}),
+    )
+    city = forms.CharField(
+        max_length=255,
+        required=False,
+        label="",
+        widget=forms.TextInput(attrs={"placeholder": "City"}),
+    )
+
+
+class ApiQueryForm(forms.Form):
+    """Query parameters of the JSON API, see hotel_review_service/api.py."""
+
+    fields = forms.CharField(required=False)
+    page = forms.IntegerField(min_value=1, required=False)
+    page_size = forms.IntegerField(
+        min_value=1, max_value=MAX_PAGE_SIZE, required=False
+    )
+
+    def __init__(self, *args, resource: Resource, detail: bool = False,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.resource = resource
+        self.detail = detail
+        for name, lookup in resource.filters.items():
+            # Ids are checked here, not left to fail inside the query.
+            if lookup.endswith("_id"):
+                self.fields[name] = forms.IntegerField(required=False)
+            else:
+                self.fields[name] = forms.CharField(required=False)
+
+    def clean_fields(self) -> list[str]:
+        names = [
+            name.strip()
+            for name in self.cleaned_data["fields"].split(",")
+            if name.strip()
+        ]
+        if not names:
+            if self.detail:
+                return list(self.resource.detail_fields)
+            return list(self.resource.list_fields)
+        unknown = [name for name in names if name not in self.resource.fields]
+        if unknown:
+            raise forms.ValidationError(
+                "Unknown fields: %(unknown)s. Available: %(available)s.",
+                params={
+                    "unknown": ", ".join(unknown),
+                    "available": ", ".join(self.resource.fields),
+                },
+            )
+        return list(dict.fromkeys(names))
+
+    def clean_page(self) -> int:
+        return self.cleaned_data["page"] or 1
+
+    def clean_page_size(self) -> int:
+        return self.cleaned_data["page_size"] or DEFAULT_PAGE_SIZE
+
+    def get_filters(self) -> dict:
+        return {
+            name: self.cleaned_data[name] for name in self.resource.filters
+        }
@@ -0,0 +1,118 @@
+import math
+
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Geohashes are BASE32 strings, so every hash starting with a prefix sorts
+# in [prefix, prefix + RANGE_END): prefix searches become B-tree ranges.
+RANGE_END = "~"
+
+
+def encode(
+    latitude: float, longitude: float, precision: int = PRECISION
+) -> str:
+    """Geohash of a point: bits alternate longitude, latitude halvings."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (
+            (lon_range, longitude) if even else (lat_range, latitude)
+        )
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(latitude, longitude) size in degrees of a cell at ``precision``."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180 / 2 ** lat_bits, 360 / 2 ** lon_bits
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle (haversine) distance."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    haversine = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(haversine)))
+
+
+def bounding_box(
+    latitude: float, longitude: float, radius_km: float
+) -> tuple[float, float, float, float] | None:
+    """
+    (min_lat, max_lat, min_lon, max_lon) around the circle, or None when
+    it covers every longitude. Longitudes may run past +-180.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat = max(latitude - delta_lat, -90.0)
+    max_lat = min(latitude + delta_lat, 90.0)
+    widest = max(abs(min_lat), abs(max_lat))
+    if widest >= 90:
+        return None
+    delta_lon = delta_lat / math.cos(math.radians(widest))
+    if delta_lon >= 180:
+        return None
+    return min_lat, max_lat, longitude - delta_lon, longitude + delta_lon
+
+
+def _steps(start: float, stop: float, step: float):
+    value = start
+    while value < stop:
+        yield value
+        value += step
+    yield stop
+
+
+def covering_prefixes(
+    latitude: float, longitude: float, radius_km: float, max_cells: int
+) -> list[str] | None:
+    """
+    Sorted geohash prefixes of the cells that cover the circle, at the
+    finest precision that needs no more than ``max_cells`` of them, or
+    None when the circle is too large to be worth narrowing.
+    """
+    box = bounding_box(latitude, longitude, radius_km)
+    if box is None:
+        return None
+    min_lat, max_lat, min_lon, max_lon = box
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        columns = (
+            math.floor(max_lon / width) - math.floor(min_lon / width) + 1
+        )
+        if rows * columns > max_cells:
+            continue
+        # A sample every cell size from each edge hits every cell that
+        # the box touches.
+        return sorted({
+            encode(
+                min(lat, 90.0),
+                (lon + 180) % 360 - 180,
+                precision,
+            )
+            for lat in _steps(min_lat, max_lat, height)
+            for lon in _steps(min_lon, max_lon, width)
+        })
+    return None
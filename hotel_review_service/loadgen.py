@@ -0,0 +1,388 @@
+import asyncio
+import random
+import re
+import secrets
+import ssl
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model
+)
+from django.urls import Resolver404, resolve, reverse
+
+from hotel_review_service import sharding
+from hotel_review_service.models import Hotel, Review
+
+
+LOG_LINE = re.compile(
+    r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+"\s+(?P<status>\d{3})'
+)
+
+DEFAULT_WEIGHTS = {
+    "hotel-list": 20,
+    "hotel-search": 10,
+    "hotel-detail": 25,
+    "review-list": 15,
+    "review-search": 10,
+    "review-detail": 5,
+    "user-detail": 5,
+    "review-rate": 10,
+}
+
+
+@dataclass(frozen=True)
+class PlannedRequest:
+    method: str
+    path: str
+    body: bytes = b""
+
+
+@dataclass
+class Session:
+    cookies: dict[str, str]
+    csrf_token: str
+
+
+@dataclass
+class UrlStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+
+def url_name(path: str) -> str:
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return "unresolved"
+    return match.url_name or match.view_name
+
+
+def parse_access_log(lines: Iterable[str]) -> Iterator[PlannedRequest]:
+    for line in lines:
+        match = LOG_LINE.search(line)
+        if match is None:
+            continue
+        method, path = match["method"], match["path"]
+        body = b""
+        if method == "POST" and url_name(path) == "review-rate":
+            body = urlencode({"reaction": random.choice(["like", "dislike"])})
+            body = body.encode()
+        yield PlannedRequest(method, path, body)
+
+
+class SyntheticMix:
+    """Weighted request mix over ids and search terms sampled from the DB."""
+
+    def __init__(
+        self,
+        weights: dict[str, int] | None = None,
+        sample_size: int = 1000,
+    ) -> None:
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.hotel_ids = list(
+            Hotel.objects.order_by("?")
+            .values_list("id", flat=True)[:sample_size]
+        )
+        self.review_ids = [
+            review_id
+            for database in sharding.review_databases()
+            for review_id in Review.objects.using(database).order_by("?")
+            .values_list("id", flat=True)[:sample_size]
+        ]
+        self.user_ids = list(
+            get_user_model().objects.order_by("?")
+            .values_list("id", flat=True)[:sample_size]
+        )
+        self.search_terms = [
+            term
+            for name, city in Hotel.objects.order_by("?").values_list(
+                "name", "placement__city"
+            )[:sample_size]
+            for term in (name.split()[0], city)
+        ]
+
+    def build(self, name: str) -> PlannedRequest:
+        namespace = "hotel_review_service"
+        if name in ("hotel-search", "review-search"):
+            list_name = name.replace("search", "list")
+            query = urlencode({"search": random.choice(self.search_terms)})
+            return PlannedRequest(
+                "GET", f"{reverse(f'{namespace}:{list_name}')}?{query}"
+            )
+        if name in ("hotel-list", "review-list"):
+            page = random.choice([1, 1, 1, 2])
+            return PlannedRequest(
+                "GET", f"{reverse(f'{namespace}:{name}')}?page={page}"
+            )
+        if name == "hotel-detail":
+            pk = random.choice(self.hotel_ids)
+        elif name == "user-detail":
+            pk = random.choice(self.user_ids)
+        else:
+            pk = random.choice(self.review_ids)
+        path = reverse(f"{namespace}:{name}", args=[pk])
+        if name == "review-rate":
+            body = urlencode({"reaction": random.choice(["like", "dislike"])})
+            return PlannedRequest("POST", path, body.encode())
+        return PlannedRequest("GET", path)
+
+    def __iter__(self) -> Iterator[PlannedRequest]:
+        names = [name for name in self.weights if self.usable(name)]
+        weights = [self.weights[name] for name in names]
+        while True:
+            yield self.build(random.choices(names, weights)[0])
+
+    def usable(self, name: str) -> bool:
+        if name in ("hotel-detail", "hotel-search", "review-search"):
+            return bool(self.hotel_ids)
+        if name in ("review-detail", "review-rate"):
+            return bool(self.review_ids)
+        if name == "user-detail":
+            return bool(self.user_ids)
+        return True
+
+
+def mint_sessions(amount: int) -> list[Session]:
+    """
+    Create logged-in sessions directly in the session store.
+
+    Only useful when the target shares the database/session backend
+    with this process, e.g. a staging deployment.
+    """
+    from importlib import import_module
+
+    store_class = import_module(settings.SESSION_ENGINE).SessionStore
+    users = list(get_user_model().objects.order_by("?")[:amount])
+    sessions = []
+    for user in users:
+        store = store_class()
+        store[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store.save()
+        sessions.append(new_session({
+            settings.SESSION_COOKIE_NAME: store.session_key
+        }))
+    return sessions
+
+
+def new_session(cookies: dict[str, str] | None = None) -> Session:
+    # Django accepts an unmasked 32 character secret as the CSRF token.
+    csrf_token = secrets.token_hex(16)
+    cookies = dict(cookies or {})
+    cookies[settings.CSRF_COOKIE_NAME] = csrf_token
+    return Session(cookies, csrf_token)
+
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client on top of asyncio streams."""
+
+    def __init__(self, base_url: str, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(
+            self.host,
+            self.port,
+            ssl=(
+                ssl.create_default_context()
+                if self.scheme == "https" else None
+            ),
+        )
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(
+        self, session: Session, planned: PlannedRequest, referer: str
+    ) -> tuple[int, str]:
+        if self.writer is None:
+            await self.connect()
+        headers = {
+            "Host": self.host_header,
+            "Cookie": "; ".join(f"{k}={v}" for k, v in session.cookies.items()),
+            "Referer": referer,
+            "Connection": "keep-alive",
+        }
+        if planned.method == "POST":
+            headers["X-CSRFToken"] = session.csrf_token
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            headers["Content-Length"] = str(len(planned.body))
+        head = f"{planned.method} {planned.path} HTTP/1.1\r\n" + "".join(
+            f"{key}: {value}\r\n" for key, value in headers.items()
+        )
+        self.writer.write(head.encode("latin-1") + b"\r\n" + planned.body)
+        await self.writer.drain()
+        return await asyncio.wait_for(self.read_response(session), self.timeout)
+
+    async def read_response(self, session: Session) -> tuple[int, str]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+
+        response_headers = []
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers.append((name.strip().lower(), value.strip()))
+
+        for name, value in response_headers:
+            if name == "set-cookie":
+                cookie_name, _, rest = value.partition("=")
+                session.cookies[cookie_name] = rest.split(";", 1)[0]
+
+        headers = dict(response_headers)
+        location = headers.get("location", "")
+        if "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            while size := int(
+                (await self.reader.readline()).split(b";")[0], 16
+            ):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        else:
+            await self.reader.read()
+            await self.close()
+            return status, location
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, location
+
+
+async def login(base_url: str, username: str, password: str) -> Session:
+    session = new_session()
+    connection = HttpConnection(base_url, timeout=30.0)
+    body = urlencode({
+        "username": username,
+        "password": password,
+        "csrfmiddlewaretoken": session.csrf_token,
+    }).encode()
+    try:
+        status, _ = await connection.request(
+            session,
+            PlannedRequest("POST", reverse("login"), body),
+            referer=base_url.rstrip("/") + reverse("login"),
+        )
+    finally:
+        await connection.close()
+    if status != 302 or settings.SESSION_COOKIE_NAME not in session.cookies:
+        raise ValueError(f"Login as {username!r} failed with status {status}")
+    return session
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        base_url: str,
+        requests: Iterable[PlannedRequest],
+        sessions: list[Session],
+        clients: int,
+        total: int | None = None,
+        duration: float | None = None,
+        timeout: float = 30.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.requests = iter(requests)
+        self.sessions = sessions
+        self.clients = clients
+        self.total = total
+        self.duration = duration
+        self.timeout = timeout
+        self.stats: dict[str, UrlStats] = defaultdict(UrlStats)
+        self.sent = 0
+        self.elapsed = 0.0
+
+    def next_request(self, deadline: float | None) -> PlannedRequest | None:
+        if self.total is not None and self.sent >= self.total:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        planned = next(self.requests, None)
+        if planned is not None:
+            self.sent += 1
+        return planned
+
+    async def client(self, number: int, deadline: float | None) -> None:
+        session = self.sessions[number % len(self.sessions)]
+        connection = HttpConnection(self.base_url, self.timeout)
+        referer = self.base_url + reverse("hotel_review_service:review-list")
+        login_path = reverse("login")
+        try:
+            while (planned := self.next_request(deadline)) is not None:
+                stats = self.stats[url_name(planned.path)]
+                started = time.perf_counter()
+                try:
+                    status, location = await connection.request(
+                        session, planned, referer
+                    )
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                    stats.errors += 1
+                    stats.statuses[0] += 1
+                    await connection.close()
+                    continue
+                stats.latencies.append(time.perf_counter() - started)
+                stats.statuses[status] += 1
+                if status >= 400 or urlsplit(location).path == login_path:
+                    stats.errors += 1
+        finally:
+            await connection.close()
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        deadline = started + self.duration if self.duration else None
+        await asyncio.gather(*(
+            self.client(number, deadline) for number in range(self.clients)
+        ))
+        self.elapsed = time.perf_counter() - started
+
+    def report(self) -> list[dict]:
+        rows = []
+        for name, stats in sorted(self.stats.items()):
+            latencies = sorted(stats.latencies)
+            requests = len(latencies) + stats.statuses.get(0, 0)
+            rows.append({
+                "url_name": name,
+                "requests": requests,
+                "throughput": requests / self.elapsed if self.elapsed else 0.0,
+                "error_rate": stats.errors / requests if requests else 0.0,
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else None,
+                "statuses": dict(stats.statuses),
+            })
+        return rows
+
+
+def percentile(values: list[float], rank: float) -> float | None:
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    return quantiles[int(rank) - 1]
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hotel_review_service import sharding
+from hotel_review_service.archive import archive_reviews, get_archive_cutoff
+
+
+class Command(BaseCommand):
+    help = "Move old reviews and their reactions into the archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.REVIEW_ARCHIVE_AFTER_DAYS,
+            help="Archive reviews older than this many days",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        sharding.ensure_single_database("archive_reviews")
+        cutoff = get_archive_cutoff(options["days"])
+        total = 0
+        for archived in archive_reviews(cutoff, options["batch_size"]):
+            total += archived
+            self.stdout.write(f"Archived {total} reviews")
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {total} reviews older than {cutoff}")
+        )
@@ -0,0 +1,133 @@
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from hotel_review_service import minhash, sharding
+from hotel_review_service.models import Review, ReviewBucket
+from hotel_review_service.utils import get_review_buckets
+
+
+def compute_signatures(chunk: list[tuple[int, str]]) -> list[tuple[int, bytes]]:
+    return [
+        (review_id, minhash.pack(minhash.signature(comment)))
+        for review_id, comment in chunk
+        if minhash.normalize(comment)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Index every review with MinHash/LSH and flag near-duplicates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--threshold", type=float, default=minhash.DUPLICATE_THRESHOLD
+        )
+        parser.add_argument(
+            "--skip-index",
+            action="store_true",
+            help="Reuse stored signatures instead of recomputing them",
+        )
+
+    def handle(self, *args, **options):
+        sharding.ensure_single_database("find_duplicate_reviews")
+        if not options["skip_index"]:
+            indexed = self.reindex(options["chunk_size"], options["workers"])
+            self.stdout.write(f"Indexed {indexed} reviews")
+
+        flagged = self.flag_duplicates(options["threshold"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Flagged {flagged} near-duplicate reviews")
+        )
+
+    def iter_chunks(self, chunk_size: int):
+        last_id = 0
+        while True:
+            chunk = list(
+                Review.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "comment")[:chunk_size]
+            )
+            if not chunk:
+                return
+            last_id = chunk[-1][0]
+            yield chunk
+
+    def reindex(self, chunk_size: int, workers: int | None) -> int:
+        workers = workers or os.cpu_count() or 1
+        indexed = 0
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk in self.iter_chunks(chunk_size):
+                pending.append(executor.submit(compute_signatures, chunk))
+                if len(pending) >= workers * 2:
+                    indexed += self.store(pending.popleft().result())
+            while pending:
+                indexed += self.store(pending.popleft().result())
+        return indexed
+
+    def store(self, signatures: list[tuple[int, bytes]]) -> int:
+        reviews = [
+            Review(id=review_id, minhash=signature)
+            for review_id, signature in signatures
+        ]
+        with transaction.atomic():
+            Review.objects.bulk_update(reviews, ["minhash"])
+            ReviewBucket.objects.filter(
+                review_id__in=[review.id for review in reviews]
+            ).delete()
+            ReviewBucket.objects.bulk_create([
+                bucket
+                for review in reviews
+                for bucket in get_review_buckets(review)
+            ])
+        return len(reviews)
+
+    def flag_duplicates(self, threshold: float) -> int:
+        colliding = (
+            ReviewBucket.objects.filter(Exists(
+                ReviewBucket.objects.filter(
+                    band=OuterRef("band"), key=OuterRef("key")
+                ).exclude(review_id=OuterRef("review_id"))
+            ))
+            .order_by("band", "key", "review_id")
+            .values_list("band", "key", "review_id")
+        )
+
+        candidates = defaultdict(set)
+        for _, rows in groupby(colliding.iterator(), key=lambda r: r[:2]):
+            original, *others = [review_id for *_, review_id in rows]
+            for review_id in others:
+                candidates[review_id].add(original)
+
+        involved = sorted(
+            set(candidates) | {i for ids in candidates.values() for i in ids}
+        )
+        signatures = {}
+        for start in range(0, len(involved), 500):
+            signatures.update(
+                Review.objects.filter(id__in=involved[start:start + 500])
+                .values_list("id", "minhash")
+            )
+
+        flagged = []
+        for review_id, originals in candidates.items():
+            signature = minhash.unpack(signatures[review_id])
+            scored = [
+                (minhash.similarity(signature,
+                                    minhash.unpack(signatures[original])),
+                 original)
+                for original in originals
+            ]
+            score, original = max(scored)
+            if score >= threshold:
+                flagged.append(Review(id=review_id, duplicate_of_id=original))
+
+        Review.objects.bulk_update(flagged, ["duplicate_of"], batch_size=1000)
+        return len(flagged)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from hotel_review_service import sharding
+from hotel_review_service.reports import REPORT_FORMATS, iter_hotel_stats
+
+
+class Command(BaseCommand):
+    help = "Stream per-hotel review statistics as CSV or columnar chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=REPORT_FORMATS, default="csv"
+        )
+        parser.add_argument(
+            "--output", help="Write to this file instead of stdout"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched per database round trip",
+        )
+
+    def handle(self, *args, **options):
+        sharding.ensure_single_database("hotel_stats_report")
+        render, *_ = REPORT_FORMATS[options["format"]]
+        rows = iter_hotel_stats(chunk_size=options["chunk_size"])
+
+        if options["output"]:
+            with open(options["output"], "w", newline="") as output:
+                output.writelines(render(rows))
+        else:
+            for part in render(rows):
+                self.stdout.write(part, ending="")
@@ -0,0 +1,67 @@
+import pstats
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge the request profiles collected by ProfilingMiddleware and "
+        "print the hottest functions per view"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=settings.PROFILING_DIR,
+            help="Profile directory (defaults to PROFILING_DIR)",
+        )
+        parser.add_argument(
+            "--view",
+            action="append",
+            help="Only these url names, e.g. hotel_review_service.hotel-detail",
+        )
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--sort", choices=SORT_KEYS, default="cumulative")
+        parser.add_argument(
+            "--output",
+            help="Also write one merged .prof per view into this directory "
+                 "(for snakeviz, gprof2dot, ...)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dir"]:
+            raise CommandError("Set PROFILING_DIR or pass --dir")
+        root = Path(options["dir"])
+        views = sorted(
+            path for path in root.iterdir()
+            if path.is_dir()
+            and (not options["view"] or path.name in options["view"])
+        ) if root.is_dir() else []
+        if not views:
+            raise CommandError(f"No profiles found in {root}")
+
+        for view in views:
+            files = sorted(view.glob("*.prof"))
+            if not files:
+                continue
+            stats = pstats.Stats(str(files[0]), stream=self.stdout)
+            for path in files[1:]:
+                stats.add(str(path))
+
+            per_request_ms = stats.total_tt / len(files) * 1000
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{view.name}: {len(files)} requests, "
+                f"{per_request_ms:.1f} ms profiled per request"
+            ))
+            stats.strip_dirs().sort_stats(options["sort"]).print_stats(
+                options["top"]
+            )
+            if options["output"]:
+                output = Path(options["output"])
+                output.mkdir(parents=True, exist_ok=True)
+                stats.dump_stats(output / f"{view.name}.prof")
@@ -0,0 +1,32 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from hotel_review_service.purge import purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the reviews and reactions of hotels and users marked "
+        "deleted, in batches, then the hotels and users themselves"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows deleted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        totals = {}
+        for name, deleted in purge_deleted(options["batch_size"]):
+            totals.setdefault(name, Counter()).update(deleted)
+            self.stdout.write(f"{name}: " + ", ".join(
+                f"{amount} {label.split('.')[-1]}"
+                for label, amount in totals[name].items()
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {len(totals)} deleted hotels and users"
+        ))
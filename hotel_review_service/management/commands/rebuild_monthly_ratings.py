@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from hotel_review_service import rollups
+
+
+class Command(BaseCommand):
+    help = "Backfill the per-hotel monthly rating buckets from all reviews"
+
+    def handle(self, *args, **options):
+        buckets = rollups.rebuild_monthly_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {buckets} monthly rating buckets")
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from hotel_review_service import reputation
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's review count and reputation from scratch"
+
+    def handle(self, *args, **options):
+        users = reputation.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {users} users"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from hotel_review_service import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the hotel class x country x city rollups from scratch"
+
+    def handle(self, *args, **options):
+        groups = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {groups} rollups"))
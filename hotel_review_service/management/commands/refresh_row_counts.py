@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from hotel_review_service import pagination
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the rows behind estimated pagination counts "
+        "(not needed on PostgreSQL)"
+    )
+
+    def handle(self, *args, **options):
+        for model, rows in pagination.refresh_row_counts().items():
+            self.stdout.write(f"{model}: {rows}")
+        self.stdout.write(self.style.SUCCESS("Row counts refreshed"))
@@ -0,0 +1,131 @@
+import asyncio
+import itertools
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hotel_review_service.loadgen import (
+    DEFAULT_WEIGHTS,
+    LoadGenerator,
+    SyntheticMix,
+    login,
+    mint_sessions,
+    parse_access_log
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay an access log, or a synthetic weighted request mix, against "
+        "a running instance with concurrent logged-in asyncio clients"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url", default="http://127.0.0.1:8000",
+        )
+        parser.add_argument(
+            "--log",
+            help=(
+                "Access log in common/combined format; synthetic mix if "
+                "omitted"
+            ),
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Replay the access log repeatedly",
+        )
+        parser.add_argument("--clients", type=int, default=10)
+        parser.add_argument("--requests", type=int, default=None)
+        parser.add_argument(
+            "--duration", type=float, default=None, help="Seconds"
+        )
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument(
+            "--weight",
+            action="append",
+            default=[],
+            metavar="URL_NAME=WEIGHT",
+            help=f"Override synthetic weights ({', '.join(DEFAULT_WEIGHTS)})",
+        )
+        parser.add_argument("--username")
+        parser.add_argument("--password")
+        parser.add_argument(
+            "--session-users",
+            type=int,
+            default=10,
+            help="Mint sessions for this many users when no credentials are "
+                 "given (target must share the database)",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON"
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] is None and options["duration"] is None:
+            options["requests"] = 1000
+
+        if options["log"]:
+            with open(options["log"]) as log:
+                planned = list(parse_access_log(log))
+            if not planned:
+                raise CommandError("No requests found in the access log")
+            requests = itertools.cycle(planned) if options["loop"] else planned
+        else:
+            weights = dict(DEFAULT_WEIGHTS)
+            for override in options["weight"]:
+                name, _, weight = override.partition("=")
+                if name not in weights:
+                    raise CommandError(f"Unknown URL name {name!r}")
+                weights[name] = int(weight)
+            requests = SyntheticMix(weights)
+
+        if options["username"]:
+            sessions = [asyncio.run(login(
+                options["base_url"], options["username"], options["password"]
+            ))]
+        else:
+            sessions = mint_sessions(options["session_users"])
+            if not sessions:
+                raise CommandError("There are no users to log in as")
+
+        generator = LoadGenerator(
+            options["base_url"],
+            requests,
+            sessions,
+            clients=options["clients"],
+            total=options["requests"],
+            duration=options["duration"],
+            timeout=options["timeout"],
+        )
+        asyncio.run(generator.run())
+        report = generator.report()
+
+        if options["json"]:
+            self.stdout.write(json.dumps({
+                "elapsed": generator.elapsed,
+                "requests": generator.sent,
+                "urls": report,
+            }, indent=2))
+            return
+
+        self.stdout.write(
+            f"{generator.sent} requests in {generator.elapsed:.2f}s "
+            f"({generator.sent / generator.elapsed:.1f} req/s)"
+        )
+        self.stdout.write(
+            f"{'url name':<16}{'requests':>9}{'req/s':>9}{'errors':>8}"
+            f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        )
+        for row in report:
+            latencies = "".join(
+                f"{row[key] * 1000:>9.1f}" if row[key] is not None
+                else f"{'-':>9}"
+                for key in ("p50", "p90", "p99", "max")
+            )
+            self.stdout.write(
+                f"{row['url_name']:<16}{row['requests']:>9}"
+                f"{row['throughput']:>9.1f}{row['error_rate']:>8.1%}"
+                f"{latencies}"
+            )
@@ -0,0 +1,33 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from hotel_review_service import pagination, sharding
+from hotel_review_service.models import Review, UserReviewReaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Move reviews, their reactions and LSH buckets to their hotel's "
+        "shard after turning on or changing REVIEW_SHARDS"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Reviews moved per transaction",
+        )
+
+    def handle(self, *args, **options):
+        totals = Counter()
+        for database, moved in sharding.move_reviews(options["batch_size"]):
+            totals[database] += moved
+            self.stdout.write(
+                f"{database}: moved {totals[database]} reviews"
+            )
+        pagination.refresh_row_counts([Review, UserReviewReaction])
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {sum(totals.values())} reviews to their shards"
+        ))
@@ -0,0 +1,158 @@
+import cProfile
+import os
+import random
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from hotel_review_service.slow_queries import SlowQueryLogger, record
+from hotel_review_service.utils import get_url_name
+
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAMETER = "profile"
+
+
+class ProfilingMiddleware:
+    """
+    Runs cProfile around a request and writes the stats to
+    PROFILING_DIR/<url name>/ for the merge_profiles command.
+
+    A request is profiled when a staff user sends ``X-Profile: 1`` or
+    ``?profile=1``, or at random with PROFILING_SAMPLE_RATE. Needs
+    AuthenticationMiddleware before it; for streaming responses only the
+    view itself is measured, not the streamed body.
+
+    Synchronous only, so enabling it runs every view under ASGI in a
+    thread: cProfile only sees the thread it was enabled in.
+    """
+
+    def __init__(self, get_response) -> None:
+        if not settings.PROFILING_DIR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.directory = Path(settings.PROFILING_DIR)
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+
+    def should_profile(self, request) -> bool:
+        requested = (
+            request.META.get(PROFILE_HEADER) == "1"
+            or request.GET.get(PROFILE_PARAMETER) == "1"
+        )
+        if requested and request.user.is_staff:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+
+        directory = self.directory / get_url_name(request)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{time.time_ns()}-{os.getpid()}.prof"
+        profile.dump_stats(path)
+        response["X-Profile"] = f"{directory.name}/{path.name}"
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Times every query of a request, on every database, and records the
+    ones over SLOW_QUERY_THRESHOLD_MS together with their EXPLAIN output.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not settings.SLOW_QUERY_THRESHOLD_MS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def start(self, request, stack: ExitStack) -> list[SlowQueryLogger]:
+        query_loggers = []
+        for connection in connections.all():
+            query_logger = SlowQueryLogger(connection, request, self.threshold)
+            stack.enter_context(connection.execute_wrapper(query_logger))
+            query_loggers.append(query_logger)
+        return query_loggers
+
+    def finish(self, request, query_loggers: list[SlowQueryLogger]) -> None:
+        captured = [
+            query
+            for query_logger in query_loggers
+            for query in query_logger.captured
+        ]
+        if captured:
+            # Outside the wrappers and after the view's transactions.
+            record(get_url_name(request), captured)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with ExitStack() as stack:
+            query_loggers = self.start(request, stack)
+            response = self.get_response(request)
+        self.finish(request, query_loggers)
+        return response
+
+    async def __acall__(self, request):
+        # Connections belong to a thread and the async ORM runs queries in
+        # the request's sync thread, so the wrappers are installed there.
+        stack = ExitStack()
+        query_loggers = await sync_to_async(self.start)(request, stack)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        await sync_to_async(self.finish)(request, query_loggers)
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can also run in an async middleware chain. WhiteNoise
+    itself is synchronous only, which would make Django run every view
+    under ASGI in a thread, async views included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings) -> None:
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(
+                request.path_info
+            )
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel_review_service', '0004_alter_review_options_rename_adress_placement_address_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='hotel_review_service.review'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='minhash',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.CreateModel(
+            name='ReviewBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('key', models.BigIntegerField()),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='hotel_review_service.review')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'key'], name='hotel_revie_band_b0360c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel_review_service', '0005_review_duplicate_of_review_minhash_reviewbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReview',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('caption', models.CharField(max_length=255)),
+                ('comment', models.TextField()),
+                ('created_at', models.DateField()),
+                ('hotel_rating', models.IntegerField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedUserReviewReaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reaction', models.CharField(choices=[('L', 'Liked'), ('D', 'Disliked')], max_length=1, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='hotel',
+            name='archived_rating_sum',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='hotel',
+            name='archived_reviews_amount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at'], name='hotel_revie_created_88d816_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedreview',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedreview',
+            name='hotel',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to='hotel_review_service.hotel'),
+        ),
+        migrations.AddField(
+            model_name='archiveduserreviewreaction',
+            name='review',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reactions', to='hotel_review_service.archivedreview'),
+        ),
+        migrations.AddField(
+            model_name='archiveduserreviewreaction',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel_review_service', '0006_archived_reviews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotelRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(max_length=255)),
+                ('city', models.CharField(max_length=255)),
+                ('hotels_amount', models.IntegerField(default=0)),
+                ('reviews_amount', models.IntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('hotel_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='hotel_review_service.hotelclass')),
+            ],
+            options={
+                'ordering': ('country', 'city', 'hotel_class__name'),
+                'indexes': [models.Index(fields=['country', 'city'], name='hotel_revie_country_b1d14d_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='hotelrollup',
+            constraint=models.UniqueConstraint(fields=('hotel_class', 'country', 'city'), name='unique_hotel_rollup'),
+        ),
+    ]
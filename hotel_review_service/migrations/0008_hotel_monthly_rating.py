@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel_review_service', '0007_hotel_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotelMonthlyRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('reviews_amount', models.IntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_ratings', to='hotel_review_service.hotel')),
+            ],
+            options={
+                'ordering': ('hotel', 'month'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='hotelmonthlyrating',
+            constraint=models.UniqueConstraint(fields=('hotel', 'month'), name='unique_hotel_month'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:32
+
+from django.db import migrations, models
+from django.db.models import (
+    Case,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When
+)
+from django.db.models.functions import Coalesce
+
+
+def reputation_of_author(reactions) -> Coalesce:
+    return Coalesce(
+        Subquery(
+            reactions.filter(review__author_id=OuterRef("id"))
+            .order_by()
+            .values("review__author_id")
+            .annotate(score=Sum(Case(
+                When(reaction="L", then=Value(1)),
+                When(reaction="D", then=Value(-1)),
+                default=Value(0),
+            )))
+            .values("score")
+        ),
+        0,
+    )
+
+
+def delete_duplicate_reactions(apps, schema_editor):
+    # Keep the oldest row per (user, review), as review_rate always did.
+    database = schema_editor.connection.alias
+    UserReviewReaction = apps.get_model(
+        "hotel_review_service", "UserReviewReaction"
+    )
+    ArchivedUserReviewReaction = apps.get_model(
+        "hotel_review_service", "ArchivedUserReviewReaction"
+    )
+    User = apps.get_model("hotel_review_service", "User")
+    TableRowCount = apps.get_model("hotel_review_service", "TableRowCount")
+
+    reactions = UserReviewReaction.objects.using(database)
+    keep = (
+        reactions.order_by()
+        .values("user_id", "review_id")
+        .annotate(keep_id=Min("id"))
+        .values("keep_id")
+    )
+    deleted, _ = reactions.exclude(id__in=keep).delete()
+    if not deleted:
+        return
+    # The duplicates were counted in reputation and in the row count:
+    # recompute both, as rebuild_reputation and refresh_row_counts do.
+    User.objects.using(database).update(
+        reputation=(
+            reputation_of_author(reactions)
+            + reputation_of_author(
+                ArchivedUserReviewReaction.objects.using(database)
+            )
+        )
+    )
+    TableRowCount.objects.using(database).filter(
+        model="hotel_review_service.userreviewreaction"
+    ).update(rows=reactions.count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel_review_service', '0010_user_reputation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userreviewreaction',
+            name='previous_reaction',
+            field=models.CharField(blank=True, choices=[('L', 'Liked'), ('D', 'Disliked')], editable=False, max_length=1, null=True),
+        ),
+        migrations.RunPython(
+            delete_duplicate_reactions, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='userreviewreaction',
+            constraint=models.UniqueConstraint(fields=('user', 'review'), name='unique_user_review_reaction'),
+        ),
+    ]
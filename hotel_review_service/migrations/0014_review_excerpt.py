@@ -0,0 +1,45 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:50
+
+from django.db import migrations, models
+
+# Frozen copy of models.make_excerpt as of this migration.
+def make_excerpt(text):
+    text = " ".join(text.split())
+    if len(text) <= 200:
+        return text
+    return text[:199].rsplit(" ", 1)[0] + "…"
+
+
+def fill_excerpts(apps, schema_editor):
+    Review = apps.get_model("hotel_review_service", "Review")
+    reviews = Review.objects.using(schema_editor.connection.alias)
+    batch = []
+    for review in reviews.only("id", "comment").iterator(chunk_size=2000):
+        review.excerpt = make_excerpt(review.comment)
+        review.word_count = len(review.comment.split())
+        batch.append(review)
+        if len(batch) == 2000:
+            reviews.bulk_update(batch, ["excerpt", "word_count"])
+            batch = []
+    reviews.bulk_update(batch, ["excerpt", "word_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel_review_service', '0013_review_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='excerpt',
+            field=models.CharField(default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:13
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel_review_service', '0014_review_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placement',
+            name='geohash',
+            field=models.CharField(default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='placement',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='placement',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddIndex(
+            model_name='placement',
+            index=models.Index(fields=['geohash', 'latitude', 'longitude'], name='placement_geohash_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+import hashlib
+import random
+import re
+import struct
+import zlib
+
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5
+DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_SIGNATURE_FORMAT = f"<{NUM_PERMUTATIONS}I"
+
+# Fixed seed: signatures are stored in the database, so the permutations
+# must be identical across processes and deployments.
+_random = random.Random(20240722)
+_PERMUTATIONS = [
+    (
+        _random.randrange(1, _MERSENNE_PRIME),
+        _random.randrange(0, _MERSENNE_PRIME),
+    )
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def shingles(text: str) -> set[int]:
+    text = normalize(text)
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {
+        zlib.crc32(text[i:i + SHINGLE_SIZE].encode())
+        for i in range(len(text) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(text: str) -> list[int]:
+    hashed = shingles(text)
+    if not hashed:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    return [
+        min((a * x + b) % _MERSENNE_PRIME for x in hashed) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def pack(values: list[int]) -> bytes:
+    return struct.pack(_SIGNATURE_FORMAT, *values)
+
+
+def unpack(data: bytes) -> list[int]:
+    return list(struct.unpack(_SIGNATURE_FORMAT, bytes(data)))
+
+
+def band_keys(values: list[int]) -> list[int]:
+    keys = []
+    for band in range(BANDS):
+        rows = values[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            struct.pack(f"<{ROWS_PER_BAND}I", *rows), digest_size=8
+        ).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def similarity(first: list[int], second: list[int]) -> float:
+    matches = sum(a == b for a, b in zip(first, second))
+    return matches / NUM_PERMUTATIONS
@@ -1,8 +1,11 @@
-from django.contrib.auth.models import AbstractUser
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core import validators
 from django.db import models
 
-from core import settings
+from hotel_review_service import minhash
+from hotel_review_service.geohash import PRECISION as GEOHASH_PRECISION
+from hotel_review_service.geohash import encode as encode_geohash
 
 
 class HotelClass(models.Model):
@@ -17,10 +20,61 @@ class Placement(models.Model):
     country = models.CharField(max_length=255)
     city = models.CharField(max_length=255)
     address = models.CharField(max_length=255)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[
+            validators.MinValueValidator(-90),
+            validators.MaxValueValidator(90)
+        ]
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[
+            validators.MinValueValidator(-180),
+            validators.MaxValueValidator(180)
+        ]
+    )
+    # Maintained on save, see hotel_review_service/nearby.py. Empty without
+    # coordinates.
+    geohash = models.CharField(
+        max_length=GEOHASH_PRECISION, default="", editable=False
+    )
+
+    class Meta:
+        indexes = [
+            # Covering: nearby searches read only these columns.
+            models.Index(fields=["geohash", "latitude", "longitude"],
+                         name="placement_geohash_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.country}, {self.city}, {self.address}"
 
+    def save(self, *args, **kwargs) -> None:
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ""
+        else:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
+
+class LiveManager(models.Manager):
+    """Hides rows waiting to be purged, see hotel_review_service/purge.py."""
+
+    def get_queryset(self) -> models.QuerySet:
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class LiveUserManager(LiveManager, UserManager):
+    def get_by_natural_key(self, username: str) -> "User":
+        # Usernames stay taken until the purge, so createsuperuser sees them.
+        # Marked users are inactive, which keeps them from logging in.
+        return self.model.all_objects.db_manager(self.db).get_by_natural_key(
+            username
+        )
+
 
 class Hotel(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -30,6 +84,12 @@ class Hotel(models.Model):
     hotel_class = models.ForeignKey(
         HotelClass, on_delete=models.DO_NOTHING, related_name="hotels"
     )
+    archived_reviews_amount = models.PositiveIntegerField(default=0)
+    archived_rating_sum = models.PositiveBigIntegerField(default=0)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ("name",)
@@ -38,49 +98,128 @@ class Hotel(models.Model):
         return f"{self.name} {self.hotel_class} {self.placement}"
 
 
+class HotelRollup(models.Model):
+    hotel_class = models.ForeignKey(
+        HotelClass, on_delete=models.CASCADE, related_name="rollups"
+    )
+    country = models.CharField(max_length=255)
+    city = models.CharField(max_length=255)
+    hotels_amount = models.IntegerField(default=0)
+    reviews_amount = models.IntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+
+    @property
+    def average_rating(self) -> float | None:
+        if not self.reviews_amount:
+            return None
+        return self.rating_sum / self.reviews_amount
+
+    class Meta:
+        ordering = ("country", "city", "hotel_class__name")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hotel_class", "country", "city"],
+                name="unique_hotel_rollup",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["country", "city"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.hotel_class} {self.country}, {self.city}"
+
+
 class User(AbstractUser):
     reviews_reacted = models.ManyToManyField(
         "Review",
         through="UserReviewReaction",
         related_name="reacted_by"
     )
+    # Maintained incrementally, see hotel_review_service/reputation.py.
+    reviews_amount = models.PositiveIntegerField(default=0)
+    reputation = models.IntegerField(default=0)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveUserManager()
+    all_objects = UserManager()
+
+    @property
+    def is_top_reviewer(self) -> bool:
+        return self.reputation >= settings.TOP_REVIEWER_REPUTATION
 
     @property
     def liked(self) -> list["Review"]:
-        return [
-            user_reactions.review
-            for user_reactions
-            in self.userreviewreaction_set.filter(reaction="L")
-        ]
+        return self._reacted("L")
 
     @property
     def disliked(self) -> list["Review"]:
-        return [
-            user_reactions.review
-            for user_reactions
-            in self.userreviewreaction_set.filter(reaction="D")
-        ]
+        return self._reacted("D")
+
+    def _reacted(self, reaction: str) -> list["Review"]:
+        # sharding imports this module.
+        from hotel_review_service import sharding
+
+        return list(sharding.scatter(Review.objects.filter(
+            userreviewreaction__user=self,
+            userreviewreaction__reaction=reaction,
+        )))
 
     class Meta:
         ordering = ("first_name", "last_name")
+        indexes = [
+            models.Index(fields=["-reputation", "id"],
+                         name="user_reputation_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name}"
 
 
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(text: str) -> str:
+    """First EXCERPT_LENGTH characters of ``text``, cut at a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    return text[:EXCERPT_LENGTH - 1].rsplit(" ", 1)[0] + "…"
+
+
+class ShardedQuerySet(models.QuerySet):
+    def create(self, **kwargs) -> models.Model:
+        # Let the router place the new row by its hotel, see sharding.py;
+        # QuerySet.create would only give it the model.
+        if self._db is not None:
+            return super().create(**kwargs)
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True)
+        return obj
+
+
 class Review(models.Model):
+    # No database constraints: with REVIEW_SHARDS reviews live apart from
+    # users and hotels, see hotel_review_service/sharding.py.
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="reviews",
+        db_constraint=False,
     )
     hotel = models.ForeignKey(
         Hotel,
         on_delete=models.CASCADE,
         related_name="reviews",
+        db_constraint=False,
     )
     caption = models.CharField(max_length=255)
     comment = models.TextField()
+    # Maintained on save so that list pages can defer the comment.
+    excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH, default="", editable=False
+    )
+    word_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateField(auto_now_add=True)
     hotel_rating = models.IntegerField(
         validators=[
@@ -88,6 +227,18 @@ class Review(models.Model):
             validators.MaxValueValidator(10)
         ]
     )
+    minhash = models.BinaryField(null=True)
+    duplicate_of = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="duplicates",
+    )
+
+    is_archived = False
+
+    objects = ShardedQuerySet.as_manager()
 
     @property
     def review_rating(self) -> int:
@@ -99,12 +250,103 @@ class Review(models.Model):
             dislike_amount = self.dislike_amount
         return like_amount - dislike_amount
 
+    @property
+    def signature(self) -> list[int] | None:
+        if self.minhash is None:
+            return None
+        return minhash.unpack(self.minhash)
+
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
 
     def __str__(self) -> str:
         return self.caption
 
+    @property
+    def is_excerpt_truncated(self) -> bool:
+        # Not the trailing "…": a comment can end with one. The comment
+        # itself is deferred on list pages.
+        return len(self.excerpt.split()) < self.word_count
+
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Review":
+        review = super().from_db(db, field_names, values)
+        # None when deferred: save() then knows it was not changed.
+        review._loaded_comment = review.__dict__.get("comment")
+        return review
+
+    def is_comment_changed(self, update_fields=None) -> bool:
+        if update_fields is not None and "comment" not in update_fields:
+            return False
+        if "comment" in self.get_deferred_fields():
+            return False
+        return (
+            self._state.adding
+            or self.comment != getattr(self, "_loaded_comment", None)
+        )
+
+    def save(self, *args, **kwargs) -> None:
+        # The signature and the LSH buckets (see signals.py) are only
+        # recomputed for a new comment, not for rating or admin edits.
+        update_fields = kwargs.get("update_fields")
+        self._comment_changed = self.is_comment_changed(update_fields)
+        if self._comment_changed:
+            self.excerpt = make_excerpt(self.comment)
+            self.word_count = len(self.comment.split())
+            if minhash.normalize(self.comment):
+                self.minhash = minhash.pack(minhash.signature(self.comment))
+            else:
+                self.minhash = None
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "excerpt", "word_count", "minhash"
+                }
+        super().save(*args, **kwargs)
+        if "comment" not in self.get_deferred_fields():
+            self._loaded_comment = self.comment
+
+
+class HotelMonthlyRating(models.Model):
+    hotel = models.ForeignKey(
+        Hotel, on_delete=models.CASCADE, related_name="monthly_ratings"
+    )
+    month = models.DateField()
+    reviews_amount = models.IntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+
+    @property
+    def average_rating(self) -> float | None:
+        return HotelRollup.average_rating.fget(self)
+
+    class Meta:
+        ordering = ("hotel", "month")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hotel", "month"], name="unique_hotel_month"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.hotel_id} {self.month:%Y-%m}"
+
+
+class ReviewBucket(models.Model):
+    review = models.ForeignKey(
+        Review,
+        on_delete=models.CASCADE,
+        related_name="lsh_buckets",
+    )
+    band = models.PositiveSmallIntegerField()
+    key = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["band", "key"]),
+        ]
+
 
 class UserReviewReaction(models.Model):
     reactions = (
@@ -113,6 +355,112 @@ class UserReviewReaction(models.Model):
     )
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
-                             on_delete=models.CASCADE)
+                             on_delete=models.CASCADE,
+                             db_constraint=False)
     review = models.ForeignKey(Review, on_delete=models.CASCADE)
     reaction = models.CharField(max_length=1, choices=reactions, null=True)
+    # Written by the upsert in reactions.toggle_reaction so that it can
+    # return the prior state: "" when the row was just inserted, otherwise
+    # the reaction before the latest toggle.
+    previous_reaction = models.CharField(
+        max_length=1, choices=reactions, null=True, blank=True, editable=False
+    )
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "review"],
+                name="unique_user_review_reaction",
+            ),
+        ]
+
+
+class ArchivedReview(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_reviews",
+    )
+    hotel = models.ForeignKey(
+        Hotel,
+        on_delete=models.CASCADE,
+        related_name="archived_reviews",
+    )
+    caption = models.CharField(max_length=255)
+    comment = models.TextField()
+    created_at = models.DateField()
+    hotel_rating = models.IntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    @property
+    def review_rating(self) -> int:
+        return Review.review_rating.fget(self)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    def __str__(self) -> str:
+        return self.caption
+
+
+class ArchivedUserReviewReaction(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE)
+    review = models.ForeignKey(ArchivedReview,
+                               on_delete=models.CASCADE,
+                               related_name="reactions")
+    reaction = models.CharField(max_length=1,
+                                choices=UserReviewReaction.reactions,
+                                null=True)
+
+
+class TableRowCount(models.Model):
+    """Maintained row count per model, used for estimated pagination."""
+    model = models.CharField(max_length=100, unique=True)
+    rows = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.model}: {self.rows}"
+
+
+class IdSequence(models.Model):
+    """Ids shared by every database, see sharding.allocate_review_id."""
+    name = models.CharField(max_length=100, unique=True)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.last_value}"
+
+
+class SlowQuery(models.Model):
+    """Counters per normalized query and view, see slow_queries.py."""
+    fingerprint = models.CharField(max_length=32)
+    view = models.CharField(max_length=255)
+    sql = models.TextField()
+    calls = models.PositiveIntegerField(default=0)
+    total_time = models.FloatField(default=0, help_text="Milliseconds")
+    max_time = models.FloatField(default=0, help_text="Milliseconds")
+    plan = models.TextField(blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-total_time",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fingerprint", "view"],
+                name="unique_slow_query_per_view",
+            ),
+        ]
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.view}: {self.sql[:80]}"
@@ -0,0 +1,116 @@
+import heapq
+from dataclasses import dataclass
+from operator import attrgetter
+
+from django.db.models import Q
+
+from hotel_review_service import geohash
+from hotel_review_service.models import Hotel, Placement
+
+
+MAX_NEARBY_RESULTS = 100
+# Radius searches measure every placement in the circle, and a city holds
+# thousands within 10 km: beyond this, ask for the k nearest instead.
+MAX_SEARCH_RADIUS_KM = 25.0
+# Geohash ranges per query: more cells hug the circle tighter but make a
+# longer OR of index ranges.
+MAX_CELLS = 32
+# k-nearest searches start at this radius and double until they have k.
+START_RADIUS_KM = 2.0
+MAX_RADIUS_KM = geohash.EARTH_RADIUS_KM * 3.2
+
+
+@dataclass
+class NearbyHotel:
+    hotel: Hotel
+    distance_km: float
+
+
+def prefix_ranges(prefixes: list[str]) -> list[tuple[str, str]]:
+    """
+    Merge sorted same-length prefixes into ``[low, high)`` ranges. Cells
+    that follow each other in geohash order are contiguous in the index.
+    """
+    ranges = []
+    previous = None
+    for prefix in prefixes:
+        value = int("".join(
+            f"{geohash.BASE32.index(char):05b}" for char in prefix
+        ), 2)
+        if previous is not None and value == previous + 1:
+            ranges[-1][1] = prefix + geohash.RANGE_END
+        else:
+            ranges.append([prefix, prefix + geohash.RANGE_END])
+        previous = value
+    return [tuple(bounds) for bounds in ranges]
+
+
+def candidates(
+    latitude: float, longitude: float, radius_km: float
+) -> list[tuple[int, float]]:
+    """(placement id, distance) of every placement within the radius."""
+    prefixes = geohash.covering_prefixes(
+        latitude, longitude, radius_km, MAX_CELLS
+    )
+    if prefixes is None:
+        # Placements without coordinates have an empty geohash.
+        placements = Placement.objects.filter(geohash__gt="")
+    else:
+        # Each range alone, so SQLite searches the index once per range
+        # instead of pairing a bound with ``geohash > ''``.
+        condition = Q()
+        for low, high in prefix_ranges(prefixes):
+            condition |= Q(geohash__gte=low, geohash__lt=high)
+        placements = Placement.objects.filter(condition)
+    rows = placements.values_list("id", "latitude", "longitude")
+    found = []
+    for placement_id, lat, lon in rows.iterator(chunk_size=10_000):
+        distance = geohash.distance_km(latitude, longitude, lat, lon)
+        if distance <= radius_km:
+            found.append((placement_id, distance))
+    return found
+
+
+def nearby_hotels(
+    latitude: float,
+    longitude: float,
+    radius_km: float | None = None,
+    limit: int = 10,
+) -> list[NearbyHotel]:
+    """
+    Hotels nearest to a point, closest first: the ``limit`` nearest within
+    ``radius_km``, or anywhere when no radius is given.
+
+    Candidates come from geohash ranges over the placement index and are
+    ranked by exact distance. Without a radius the search radius doubles
+    until it holds ``limit`` hotels, so only nearby cells are read.
+    """
+    if radius_km is not None:
+        found = candidates(latitude, longitude, radius_km)
+    else:
+        radius_km = START_RADIUS_KM
+        while True:
+            found = candidates(latitude, longitude, radius_km)
+            if len(found) >= limit or radius_km >= MAX_RADIUS_KM:
+                break
+            radius_km *= 2
+
+    wanted = limit
+    while True:
+        distances = dict(heapq.nsmallest(
+            wanted, found, key=lambda row: (row[1], row[0])
+        ))
+        hotels = list(Hotel.objects.select_related(
+            "placement", "hotel_class"
+        ).filter(placement_id__in=distances))
+        if len(hotels) >= limit or len(distances) == len(found):
+            break
+        # Placements left behind by deleted hotels: look further.
+        wanted += limit - len(hotels)
+    return sorted(
+        (
+            NearbyHotel(hotel, round(distances[hotel.placement_id], 3))
+            for hotel in hotels
+        ),
+        key=attrgetter("distance_km"),
+    )[:limit]
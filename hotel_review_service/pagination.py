@@ -0,0 +1,171 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections, router
+from django.db.models import F, Model, QuerySet
+from django.utils.functional import cached_property
+
+from hotel_review_service import sharding
+from hotel_review_service.utils import alist, exclude_deleted
+from hotel_review_service.models import (
+    Hotel,
+    Review,
+    TableRowCount,
+    User,
+    UserReviewReaction
+)
+
+
+# Tables large enough to paginate with estimated counts.
+COUNTED_MODELS = [Hotel, Review, User, UserReviewReaction]
+
+
+def get_databases(model: type[Model]) -> list[str]:
+    if model._meta.label_lower in sharding.SHARDED_MODELS:
+        return sharding.review_databases()
+    return [router.db_for_read(model)]
+
+
+def uses_planner_statistics(model: type[Model]) -> bool:
+    return all(
+        connections[database].vendor == "postgresql"
+        for database in get_databases(model)
+    )
+
+
+def estimated_count(model: type[Model]) -> int | None:
+    """
+    Cheap row count for the whole table, or None when there is none.
+
+    PostgreSQL keeps one in its planner statistics; elsewhere it comes from
+    the TableRowCount maintained by signals (see refresh_row_counts).
+    """
+    if uses_planner_statistics(model):
+        total = 0
+        for database in get_databases(model):
+            connection = connections[database]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+            # -1 means the table was never vacuumed or analyzed.
+            if row is None or row[0] < 0:
+                return None
+            total += row[0]
+        return total
+    return (
+        TableRowCount.objects.filter(model=model._meta.label_lower)
+        .values_list("rows", flat=True)
+        .first()
+    )
+
+
+def adjust_row_count(model: type[Model], delta: int) -> None:
+    if delta and not uses_planner_statistics(model):
+        TableRowCount.objects.filter(model=model._meta.label_lower).update(
+            rows=F("rows") + delta
+        )
+
+
+def record_deleted(deleted: dict[str, int]) -> None:
+    """Apply the per-model counts returned by QuerySet.delete()."""
+    for label, amount in deleted.items():
+        adjust_row_count(apps.get_model(label), -amount)
+
+
+def refresh_row_counts(
+    models: list[type[Model]] = COUNTED_MODELS,
+) -> dict[str, int]:
+    counts = {}
+    for model in models:
+        counts[model._meta.label_lower] = sum(
+            model._base_manager.using(database).count()
+            for database in get_databases(model)
+        )
+        TableRowCount.objects.update_or_create(
+            model=model._meta.label_lower,
+            defaults={"rows": counts[model._meta.label_lower]},
+        )
+    return counts
+
+
+def is_whole_table(object_list) -> bool:
+    if isinstance(object_list, sharding.ShardedList):
+        return all(
+            is_whole_table(queryset) for queryset in object_list.querysets
+        )
+    if not isinstance(object_list, QuerySet):
+        return False
+    query = object_list.query
+    # Default managers and exclude_deleted() may hide rows waiting to be
+    # purged: the estimate counts them too, close enough.
+    manager = object_list.model._default_manager
+    live_wheres = [manager.all().query.where]
+    if object_list.model is Review:
+        live_wheres.append(exclude_deleted(manager).query.where)
+    return (
+        (not query.where or query.where in live_wheres)
+        and not query.distinct
+        and not query.combinator
+        and query.low_mark == 0
+        and query.high_mark is None
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the estimated table size once it is above
+    PAGINATOR_ESTIMATE_THRESHOLD rows. Filtered querysets, and small
+    tables, are still counted exactly.
+    """
+
+    is_estimated = False
+
+    @cached_property
+    def count(self) -> int:
+        if is_whole_table(self.object_list):
+            estimate = estimated_count(self.object_list.model)
+            if (
+                estimate is not None
+                and estimate >= settings.PAGINATOR_ESTIMATE_THRESHOLD
+            ):
+                self.is_estimated = True
+                return estimate
+        return super().count
+
+    async def acount(self) -> int:
+        if "count" not in self.__dict__:
+            if (
+                isinstance(self.object_list, QuerySet)
+                and not is_whole_table(self.object_list)
+            ):
+                self.__dict__["count"] = await self.object_list.acount()
+            else:
+                await sync_to_async(lambda: self.count)()
+        return self.count
+
+    async def apage(self, number: int) -> Page:
+        """
+        page() for async views. The rows and the count are independent, so
+        they are fetched concurrently and the number is validated after.
+        """
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page + self.orphans
+        if isinstance(self.object_list, QuerySet):
+            rows = alist(self.object_list[bottom:top])
+        else:
+            # Id lists and shard merges query as soon as they are sliced.
+            rows = sync_to_async(lambda: list(self.object_list[bottom:top]))()
+        rows, count = await asyncio.gather(rows, self.acount())
+        number = self.validate_number(number)
+        if bottom + self.per_page + self.orphans < count:
+            rows = rows[:self.per_page]
+        return self._get_page(rows, number, self)
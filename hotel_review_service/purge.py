@@ -0,0 +1,263 @@
+from collections import defaultdict
+from collections.abc import Iterator
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, F, Model, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from hotel_review_service import (
+    pagination,
+    reputation,
+    rollups,
+    search_cache,
+    sharding,
+    utils
+)
+from hotel_review_service.models import (
+    ArchivedReview,
+    ArchivedUserReviewReaction,
+    Hotel,
+    Review,
+    ReviewBucket,
+    User,
+    UserReviewReaction
+)
+
+
+# (model, database, condition): the rows one purge stage deletes.
+Stage = tuple[type[Model], str, Q]
+
+REACTION_MODELS = {
+    Review: UserReviewReaction,
+    ArchivedReview: ArchivedUserReviewReaction,
+}
+
+
+def mark_hotel_deleted(hotel: Hotel) -> None:
+    """
+    Hide the hotel from every page and take it out of the rollups right
+    away. Its reviews stay until purge_hotel removes them.
+    """
+    with transaction.atomic():
+        hotel = Hotel.all_objects.select_for_update().select_related(
+            "placement"
+        ).get(id=hotel.id)
+        if hotel.deleted_at is not None:
+            return
+        # Counted once the lock is held, right before the mark, so that
+        # reviews added while waiting for it are taken out too.
+        live = (
+            Review.objects.using(sharding.shard_for_hotel(hotel.id))
+            .filter(hotel_id=hotel.id)
+            .aggregate(reviews=Count("id"), rating=Sum("hotel_rating"))
+        )
+        hotel.deleted_at = timezone.now()
+        hotel.save(update_fields=["deleted_at"])
+        rollups.apply(
+            rollups.get_hotel_key(hotel),
+            hotels=-1,
+            reviews=-(live["reviews"] + hotel.archived_reviews_amount),
+            rating=-((live["rating"] or 0) + hotel.archived_rating_sum),
+        )
+    # Cached review searches still hold the hotel's reviews.
+    search_cache.invalidate("review")
+    utils.invalidate_deleted_ids()
+
+
+def mark_user_deleted(user: User) -> None:
+    """Log the user out and hide them; purge_user removes their rows."""
+    user.deleted_at = timezone.now()
+    user.is_active = False
+    user.save(update_fields=["deleted_at", "is_active"])
+    search_cache.invalidate("review")
+    utils.invalidate_deleted_ids()
+
+
+def _delete_in(
+    database: str, model: type[Model], column: str, ids: list[int]
+) -> int:
+    """DELETE ... WHERE column IN (ids), without loading the rows."""
+    connection = connections[database]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} "
+            f"WHERE {quote(column)} IN ({', '.join(['%s'] * len(ids))})",
+            ids,
+        )
+        return cursor.rowcount
+
+
+def _next_ids(
+    model: type[Model], database: str, condition: Q, batch_size: int | None
+) -> list[int]:
+    # Unordered: sorting by id would walk the whole table for conditions
+    # on a joined review.
+    return list(
+        model.objects.using(database).filter(condition)
+        .order_by().values_list("id", flat=True)[:batch_size]
+    )
+
+
+def purge_reactions_batch(
+    model: type[Model], database: str, condition: Q, batch_size: int | None
+) -> int:
+    """Delete up to ``batch_size`` reactions, with the reputation they gave."""
+    with transaction.atomic(using=database), transaction.atomic():
+        ids = _next_ids(model, database, condition, batch_size)
+        if not ids:
+            return 0
+        scores = (
+            model.objects.using(database).filter(id__in=ids).order_by()
+            .values("review__author_id")
+            .annotate(score=reputation.score_sum())
+            .values_list("review__author_id", "score")
+        )
+        reputation.adjust({author_id: -score for author_id, score in scores})
+        deleted = _delete_in(database, model, "id", ids)
+    if model is UserReviewReaction:
+        pagination.adjust_row_count(model, -deleted)
+    return deleted
+
+
+def _uncount_reviews(rows, archived: bool) -> None:
+    """Take deleted reviews out of the rollups and monthly ratings."""
+    per_hotel = defaultdict(lambda: [0, 0])
+    for hotel_id, month, amount, rating in rows:
+        rollups.apply_month(hotel_id, month, reviews=-amount, rating=-rating)
+        per_hotel[hotel_id][0] += amount
+        per_hotel[hotel_id][1] += rating
+    for hotel_id, (amount, rating) in per_hotel.items():
+        # None for hotels marked deleted: they already left the rollups.
+        rollups.apply(
+            rollups.get_hotel_key_by_id(hotel_id),
+            reviews=-amount,
+            rating=-rating,
+        )
+        if archived:
+            Hotel.all_objects.filter(id=hotel_id).update(
+                archived_reviews_amount=F("archived_reviews_amount") - amount,
+                archived_rating_sum=F("archived_rating_sum") - rating,
+            )
+
+
+def purge_reviews_batch(
+    model: type[Model], database: str, condition: Q, batch_size: int | None
+) -> int:
+    """
+    Delete up to ``batch_size`` reviews, live or archived, and keep every
+    counter built from them in step.
+    """
+    reaction_model = REACTION_MODELS[model]
+    with transaction.atomic(using=database), transaction.atomic():
+        ids = _next_ids(model, database, condition, batch_size)
+        if not ids:
+            return 0
+        # Normally gone already, unless added since the reactions stage.
+        purge_reactions_batch(
+            reaction_model, database, Q(review_id__in=ids), None
+        )
+        reviews = model.objects.using(database).filter(id__in=ids).order_by()
+        authors = reviews.values("author_id").annotate(amount=Count("id"))
+        months = list(
+            reviews.annotate(month=TruncMonth("created_at"))
+            .values("hotel_id", "month")
+            .annotate(amount=Count("id"), rating=Sum("hotel_rating"))
+            .values_list("hotel_id", "month", "amount", "rating")
+        )
+        reputation.adjust(
+            {row["author_id"]: -row["amount"] for row in authors},
+            field="reviews_amount",
+        )
+        _uncount_reviews(months, archived=model is ArchivedReview)
+
+        if model is Review:
+            _delete_in(database, ReviewBucket, "review_id", ids)
+            model.objects.using(database).filter(
+                duplicate_of_id__in=ids
+            ).update(duplicate_of=None)
+        deleted = _delete_in(database, model, "id", ids)
+    if model is Review:
+        pagination.adjust_row_count(model, -deleted)
+        search_cache.invalidate(model._meta.model_name)
+    return deleted
+
+
+def purge(
+    stages: list[Stage], batch_size: int
+) -> Iterator[dict[str, int]]:
+    """Run the stages in order, yielding the rows deleted per batch."""
+    for model, database, condition in stages:
+        purge_batch = (
+            purge_reviews_batch if model in REACTION_MODELS
+            else purge_reactions_batch
+        )
+        while deleted := purge_batch(model, database, condition, batch_size):
+            yield {model._meta.label: deleted}
+
+
+def purge_hotel(
+    hotel: Hotel, batch_size: int = 1000
+) -> Iterator[dict[str, int]]:
+    database = sharding.shard_for_hotel(hotel.id)
+    yield from purge([
+        (UserReviewReaction, database, Q(review__hotel_id=hotel.id)),
+        (Review, database, Q(hotel_id=hotel.id)),
+        (ArchivedUserReviewReaction, DEFAULT_DB_ALIAS,
+         Q(review__hotel_id=hotel.id)),
+        (ArchivedReview, DEFAULT_DB_ALIAS, Q(hotel_id=hotel.id)),
+    ], batch_size)
+    # mark_hotel_deleted already took the hotel out of the rollups.
+    with rollups.paused():
+        hotel.delete()
+    pagination.adjust_row_count(Hotel, -1)
+    yield {Hotel._meta.label: 1}
+
+
+def purge_user(
+    user: User, batch_size: int = 1000
+) -> Iterator[dict[str, int]]:
+    stages = []
+    for database in sharding.review_databases():
+        stages += [
+            (UserReviewReaction, database, Q(user_id=user.id)),
+            (UserReviewReaction, database, Q(review__author_id=user.id)),
+            (Review, database, Q(author_id=user.id)),
+        ]
+    stages += [
+        (ArchivedUserReviewReaction, DEFAULT_DB_ALIAS, Q(user_id=user.id)),
+        (ArchivedUserReviewReaction, DEFAULT_DB_ALIAS,
+         Q(review__author_id=user.id)),
+        (ArchivedReview, DEFAULT_DB_ALIAS, Q(author_id=user.id)),
+    ]
+    yield from purge(stages, batch_size)
+    user.delete()
+    yield {User._meta.label: 1}
+
+
+def delete_review(review: Review, batch_size: int = 1000) -> None:
+    """Delete one review, its reactions in batches."""
+    database = review._state.db or sharding.shard_for_review(review.id)
+    for _ in purge([
+        (UserReviewReaction, database, Q(review_id=review.id)),
+        (Review, database, Q(id=review.id)),
+    ], batch_size):
+        pass
+
+
+def purge_deleted(
+    batch_size: int = 1000,
+) -> Iterator[tuple[str, dict[str, int]]]:
+    """
+    Purge every hotel and user marked deleted, yielding the hotel or user
+    ("hotel 12") and the rows deleted by each batch.
+    """
+    for hotel in Hotel.all_objects.filter(deleted_at__isnull=False):
+        name = f"{hotel._meta.verbose_name} {hotel.pk}"
+        for deleted in purge_hotel(hotel, batch_size):
+            yield name, deleted
+    for user in User.all_objects.filter(deleted_at__isnull=False):
+        name = f"{user._meta.verbose_name} {user.pk}"
+        for deleted in purge_user(user, batch_size):
+            yield name, deleted
@@ -0,0 +1,156 @@
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.db import connections, transaction
+
+from hotel_review_service import events, pagination, reputation, sharding
+from hotel_review_service.models import Review, UserReviewReaction
+
+
+REACTIONS = {
+    "like": "L",
+    "dislike": "D",
+}
+
+REACTION_NAMES = {code: name for name, code in REACTIONS.items()}
+
+MAX_BATCH_SIZE = 500
+
+
+def _toggle_sql(connection, rows: int = 1) -> str:
+    """Toggle ``rows`` (user_id, review_id, reaction) triples at once."""
+    table = connection.ops.quote_name(UserReviewReaction._meta.db_table)
+    values = ", ".join(["(%s, %s, %s, '')"] * rows)
+    return (
+        f"INSERT INTO {table} "
+        f"(user_id, review_id, reaction, previous_reaction) "
+        f"VALUES {values} "
+        f"ON CONFLICT (user_id, review_id) DO UPDATE SET "
+        f"previous_reaction = {table}.reaction, "
+        f"reaction = CASE WHEN {table}.reaction = excluded.reaction "
+        f"THEN NULL ELSE excluded.reaction END "
+        f"RETURNING review_id, reaction, previous_reaction"
+    )
+
+
+def toggle_reaction(user_id: int, review: Review, reaction: str) -> str | None:
+    """
+    Toggle ``reaction`` ("L" or "D") of a user on a review in a single
+    INSERT ... ON CONFLICT DO UPDATE and return the new reaction.
+
+    The conditional update runs against the locked row, so concurrent
+    toggles serialize instead of losing updates or inserting duplicates.
+    Being raw SQL it bypasses the model signals, so the counters and live
+    events they maintain are updated here.
+    """
+    database = sharding.shard_for_review(review.id)
+    # With REVIEW_SHARDS the reaction commits on the review's shard just
+    # before the counters commit in "default"; otherwise it is one
+    # transaction.
+    with (
+        transaction.atomic(),
+        transaction.atomic(using=database, savepoint=False),
+    ):
+        connection = connections[database]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _toggle_sql(connection), [user_id, review.id, reaction]
+            )
+            _, current, previous = cursor.fetchone()
+
+        if previous == "":
+            pagination.adjust_row_count(UserReviewReaction, 1)
+            previous = None
+        reputation.adjust({
+            review.author_id:
+                reputation.score(current) - reputation.score(previous)
+        })
+        events.publish_review_ratings([review.id])
+    return current
+
+
+@transaction.atomic
+def apply_reactions(user, items: list[tuple[int, str]]) -> list[dict]:
+    """
+    Apply (review_id, reaction) pairs with the same toggle semantics as
+    review_rate, using the upsert of toggle_reaction: one statement per
+    review shard, and one more round for every repeat of a review within
+    the batch, since a statement cannot update the same row twice.
+    """
+    shards = sharding.group_by_shard({review_id for review_id, _ in items})
+    authors = {}
+    for database, review_ids in shards.items():
+        authors.update(
+            Review.objects.using(database).filter(id__in=review_ids)
+            .values_list("id", "author_id")
+        )
+
+    # rounds[n][database]: (review_id, reaction) toggled by statement n.
+    rounds = []
+    repeats = Counter()
+    pending = []
+    results = []
+    for review_id, reaction in items:
+        error = None
+        if reaction not in REACTIONS:
+            error = "invalid reaction"
+        elif review_id not in authors:
+            error = "review not found"
+        elif authors[review_id] == user.id:
+            error = "can't react to your own review"
+        if error:
+            results.append({"review": review_id, "ok": False, "error": error})
+            continue
+
+        number = repeats[review_id]
+        repeats[review_id] += 1
+        if number == len(rounds):
+            rounds.append(defaultdict(list))
+        rounds[number][sharding.shard_for_review(review_id)].append(
+            (review_id, REACTIONS[reaction])
+        )
+        result = {"review": review_id, "ok": True}
+        results.append(result)
+        pending.append((result, number, review_id))
+
+    applied = [{} for _ in rounds]
+    created = 0
+    deltas = {}
+    # As in toggle_reaction, the shards commit only once the counters are
+    # written, just before "default".
+    with ExitStack() as stack:
+        for database in shards:
+            stack.enter_context(
+                transaction.atomic(using=database, savepoint=False)
+            )
+        for number, statements in enumerate(rounds):
+            for database, toggles in statements.items():
+                connection = connections[database]
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        _toggle_sql(connection, len(toggles)),
+                        [
+                            value
+                            for review_id, reaction in toggles
+                            for value in (user.id, review_id, reaction)
+                        ],
+                    )
+                    rows = cursor.fetchall()
+                for review_id, current, previous in rows:
+                    if previous == "":
+                        created += 1
+                        previous = None
+                    applied[number][review_id] = current
+                    author_id = authors[review_id]
+                    deltas[author_id] = deltas.get(author_id, 0) + (
+                        reputation.score(current) - reputation.score(previous)
+                    )
+
+        # Raw SQL bypasses the post_save signal.
+        pagination.adjust_row_count(UserReviewReaction, created)
+        reputation.adjust(deltas)
+    for result, number, review_id in pending:
+        result["reaction"] = REACTION_NAMES.get(applied[number][review_id])
+
+    events.publish_review_ratings(list(repeats))
+    return results
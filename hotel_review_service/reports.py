@@ -0,0 +1,267 @@
+import csv
+import datetime
+import json
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator
+
+from django.db.models import Count, Max, Q, QuerySet, Sum
+from django.utils import timezone
+
+from hotel_review_service import sharding
+from hotel_review_service.models import (
+    ArchivedReview,
+    ArchivedUserReviewReaction,
+    Hotel,
+    Review,
+    UserReviewReaction
+)
+
+
+RATINGS = range(0, 11)
+
+# Windows, in days, for the recent review counts of compare_hotels.
+RECENT_DAYS = (30, 90, 365)
+
+MAX_COMPARED_HOTELS = 10
+
+COLUMNS = (
+    "hotel_id",
+    "name",
+    "hotel_class",
+    "country",
+    "city",
+    "reviews_amount",
+    "average_rating",
+    *(f"rating_{rating}" for rating in RATINGS),
+    "likes_received",
+    "dislikes_received",
+    "latest_review",
+)
+
+
+class _HotelGroups:
+    """Walks a queryset ordered by hotel id in step with the hotel stream."""
+
+    def __init__(self, queryset: QuerySet, chunk_size: int) -> None:
+        self._groups = groupby(
+            queryset.iterator(chunk_size=chunk_size), key=itemgetter(0)
+        )
+        self._current = next(self._groups, None)
+
+    def pop(self, hotel_id: int) -> list[tuple]:
+        while self._current is not None and self._current[0] < hotel_id:
+            self._current = next(self._groups, None)
+        if self._current is None or self._current[0] != hotel_id:
+            return []
+        rows = list(self._current[1])
+        self._current = next(self._groups, None)
+        return rows
+
+
+def _review_totals() -> QuerySet:
+    live, archived = (
+        model.objects.order_by()
+        .values("hotel_id")
+        .annotate(
+            amount=Count("id"),
+            rating_sum=Sum("hotel_rating"),
+            latest=Max("created_at"),
+        )
+        .values_list("hotel_id", "amount", "rating_sum", "latest")
+        for model in (Review, ArchivedReview)
+    )
+    return live.union(archived, all=True).order_by("hotel_id")
+
+
+def _rating_distribution() -> QuerySet:
+    live, archived = (
+        model.objects.order_by()
+        .values("hotel_id", "hotel_rating")
+        .annotate(amount=Count("id"))
+        .values_list("hotel_id", "hotel_rating", "amount")
+        for model in (Review, ArchivedReview)
+    )
+    return live.union(archived, all=True).order_by("hotel_id")
+
+
+def _reactions_received() -> QuerySet:
+    live, archived = (
+        model.objects.order_by()
+        .values("review__hotel_id")
+        .annotate(
+            likes=Count("id", filter=Q(reaction="L")),
+            dislikes=Count("id", filter=Q(reaction="D")),
+        )
+        .values_list("review__hotel_id", "likes", "dislikes")
+        for model in (UserReviewReaction, ArchivedUserReviewReaction)
+    )
+    return live.union(archived, all=True).order_by("review__hotel_id")
+
+
+def iter_hotel_stats(chunk_size: int = 2000) -> Iterator[tuple]:
+    hotels = (
+        Hotel.objects.order_by("id")
+        .values_list(
+            "id",
+            "name",
+            "hotel_class__name",
+            "placement__country",
+            "placement__city",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    totals = _HotelGroups(_review_totals(), chunk_size)
+    distribution = _HotelGroups(_rating_distribution(), chunk_size)
+    reactions = _HotelGroups(_reactions_received(), chunk_size)
+
+    for hotel in hotels:
+        hotel_id = hotel[0]
+
+        amount = rating_sum = 0
+        latest = None
+        for _, part_amount, part_sum, part_latest in totals.pop(hotel_id):
+            amount += part_amount
+            rating_sum += part_sum
+            if latest is None or part_latest > latest:
+                latest = part_latest
+
+        ratings = dict.fromkeys(RATINGS, 0)
+        for _, rating, rating_amount in distribution.pop(hotel_id):
+            ratings[rating] += rating_amount
+
+        likes = dislikes = 0
+        for _, part_likes, part_dislikes in reactions.pop(hotel_id):
+            likes += part_likes
+            dislikes += part_dislikes
+
+        yield (
+            *hotel,
+            amount,
+            round(rating_sum / amount, 2) if amount else None,
+            *ratings.values(),
+            likes,
+            dislikes,
+            latest.isoformat() if latest else None,
+        )
+
+
+def _comparison_counts(
+    queryset: QuerySet, hotel_ids: list[int], today: datetime.date
+) -> QuerySet:
+    return (
+        queryset.filter(hotel_id__in=hotel_ids)
+        .order_by()
+        .values("hotel_id", "hotel_rating")
+        .annotate(
+            amount=Count("id"),
+            **{
+                f"recent_{days}": Count(
+                    "id",
+                    filter=Q(created_at__gt=today
+                             - datetime.timedelta(days=days)),
+                )
+                for days in RECENT_DAYS
+            },
+        )
+        .values_list(
+            "hotel_id", "hotel_rating", "amount",
+            *(f"recent_{days}" for days in RECENT_DAYS),
+        )
+    )
+
+
+def compare_hotels(
+    hotel_ids: list[int], today: datetime.date | None = None
+) -> list[dict]:
+    """
+    Side-by-side statistics for the given hotels, in the order asked for.
+
+    One query for the hotels, one grouped query per review shard involved
+    and one for the archive, however many hotels are compared.
+    """
+    today = today or timezone.localdate()
+    hotels = (
+        Hotel.objects.filter(id__in=hotel_ids)
+        .select_related("hotel_class", "placement")
+        .in_bulk()
+    )
+    stats = {
+        hotel_id: {
+            "amount": 0,
+            "rating_sum": 0,
+            "ratings": dict.fromkeys(RATINGS, 0),
+            "recent": dict.fromkeys(RECENT_DAYS, 0),
+        }
+        for hotel_id in hotels
+    }
+    parts = [
+        Review.objects.using(database)
+        for database in sorted({sharding.shard_for_hotel(hotel_id)
+                                for hotel_id in hotels})
+    ]
+    if hotels:
+        parts.append(ArchivedReview.objects.all())
+    for part in parts:
+        for hotel_id, rating, amount, *recent in _comparison_counts(
+            part, list(hotels), today
+        ):
+            hotel_stats = stats[hotel_id]
+            hotel_stats["amount"] += amount
+            hotel_stats["rating_sum"] += rating * amount
+            hotel_stats["ratings"][rating] += amount
+            for days, recent_amount in zip(RECENT_DAYS, recent):
+                hotel_stats["recent"][days] += recent_amount
+
+    comparison = []
+    for hotel_id in dict.fromkeys(hotel_ids):
+        if hotel_id not in hotels:
+            continue
+        hotel, hotel_stats = hotels[hotel_id], stats[hotel_id]
+        amount = hotel_stats["amount"]
+        comparison.append({
+            "id": hotel.id,
+            "name": hotel.name,
+            "hotel_class": hotel.hotel_class.name,
+            "country": hotel.placement.country,
+            "city": hotel.placement.city,
+            "address": hotel.placement.address,
+            "reviews_amount": amount,
+            "average_rating": (
+                round(hotel_stats["rating_sum"] / amount, 2)
+                if amount else None
+            ),
+            "ratings": hotel_stats["ratings"],
+            "recent_reviews": hotel_stats["recent"],
+        })
+    return comparison
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_columnar(
+    rows: Iterable[tuple], chunk_size: int = 2000
+) -> Iterator[str]:
+    """Newline-delimited JSON, one {column: [values]} object per chunk."""
+    rows = iter(rows)
+    while True:
+        chunk = [row for _, row in zip(range(chunk_size), rows)]
+        if not chunk:
+            return
+        yield json.dumps(dict(zip(COLUMNS, map(list, zip(*chunk))))) + "\n"
+
+
+REPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv", "csv"),
+    "columnar": (iter_columnar, "application/x-ndjson", "ndjson"),
+}
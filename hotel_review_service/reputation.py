@@ -0,0 +1,151 @@
+from collections import Counter
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When
+)
+from django.db.models.functions import Coalesce
+
+from hotel_review_service import sharding
+from hotel_review_service.backends import (
+    invalidate_cached_user,
+    invalidate_cached_users
+)
+from hotel_review_service.models import (
+    ArchivedReview,
+    ArchivedUserReviewReaction,
+    Review,
+    User,
+    UserReviewReaction
+)
+
+
+REACTION_SCORES = {"L": 1, "D": -1}
+
+
+def score(reaction: str | None) -> int:
+    return REACTION_SCORES.get(reaction, 0)
+
+
+# The counters are changed with update(), which sends no post_save: drop
+# the users cached by backends.CachedModelBackend here.
+
+def adjust_reviews_amount(author_id: int, delta: int) -> None:
+    User.all_objects.filter(id=author_id).update(
+        reviews_amount=F("reviews_amount") + delta
+    )
+    invalidate_cached_user(author_id)
+
+
+def adjust_for_review(review_id: int, delta: int) -> None:
+    """Add ``delta`` to the reputation of the review's author."""
+    if not delta:
+        return
+    author_id = (
+        Review.objects.using(sharding.shard_for_review(review_id))
+        .filter(id=review_id)
+        .values_list("author_id", flat=True)
+        .first()
+    )
+    if author_id is not None:
+        adjust({author_id: delta})
+
+
+def adjust(deltas: dict[int, int], field: str = "reputation") -> None:
+    """Add deltas to ``field`` keyed by user id, in a single UPDATE."""
+    deltas = {author_id: delta for author_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    User.all_objects.filter(id__in=deltas).update(**{
+        field: F(field) + Case(
+            *(When(id=author_id, then=Value(delta))
+              for author_id, delta in deltas.items()),
+            output_field=IntegerField(),
+        )
+    })
+    invalidate_cached_users(deltas)
+
+
+def score_sum() -> Sum:
+    """Reputation earned by a group of reactions."""
+    return Sum(Case(
+        *(When(reaction=reaction, then=Value(value))
+          for reaction, value in REACTION_SCORES.items()),
+        default=Value(0),
+    ))
+
+
+def _per_author(queryset, author_field: str, aggregate) -> Coalesce:
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{author_field: OuterRef("id")})
+            .order_by()
+            .values(author_field)
+            .annotate(value=aggregate)
+            .values("value")
+        ),
+        0,
+    )
+
+
+def _archived_counters() -> dict:
+    return {
+        "reviews_amount": _per_author(
+            ArchivedReview.objects, "author", Count("id")
+        ),
+        "reputation": _per_author(
+            ArchivedUserReviewReaction.objects, "review__author", score_sum()
+        ),
+    }
+
+
+def rebuild() -> int:
+    """Recompute every user's counters, archived reviews included."""
+    if sharding.is_enabled():
+        return _rebuild_sharded()
+    archived = _archived_counters()
+    return User.all_objects.update(
+        reviews_amount=(
+            _per_author(Review.objects, "author", Count("id"))
+            + archived["reviews_amount"]
+        ),
+        reputation=(
+            _per_author(
+                UserReviewReaction.objects, "review__author", score_sum()
+            )
+            + archived["reputation"]
+        ),
+    )
+
+
+@transaction.atomic
+def _rebuild_sharded(batch_size: int = 500) -> int:
+    # Subqueries cannot reach the shards: sum the live rows per author on
+    # each shard, then add them to the archived counters.
+    live = {"reviews_amount": Counter(), "reputation": Counter()}
+    for database in sharding.review_databases():
+        live["reviews_amount"].update(dict(
+            Review.objects.using(database).order_by()
+            .values("author_id").annotate(value=Count("id"))
+            .values_list("author_id", "value")
+        ))
+        live["reputation"].update(dict(
+            UserReviewReaction.objects.using(database).order_by()
+            .values("review__author_id").annotate(value=score_sum())
+            .values_list("review__author_id", "value")
+        ))
+    users = User.all_objects.update(**_archived_counters())
+    for field, deltas in live.items():
+        deltas = iter(deltas.items())
+        while batch := dict(islice(deltas, batch_size)):
+            adjust(batch, field)
+    return users
@@ -0,0 +1,206 @@
+import datetime
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, F, QuerySet, Sum
+from django.db.models.functions import TruncMonth
+
+from hotel_review_service import sharding
+from hotel_review_service.models import (
+    ArchivedReview,
+    Hotel,
+    HotelMonthlyRating,
+    HotelRollup,
+    Review
+)
+
+
+RollupKey = tuple[int, str, str]
+
+_paused = ContextVar("hotel_rollups_paused", default=False)
+
+
+@contextmanager
+def paused():
+    """Skip incremental updates, e.g. while reviews are being archived."""
+    token = _paused.set(True)
+    try:
+        yield
+    finally:
+        _paused.reset(token)
+
+
+def is_paused() -> bool:
+    return _paused.get()
+
+
+def get_hotel_key(hotel: Hotel) -> RollupKey:
+    return hotel.hotel_class_id, hotel.placement.country, hotel.placement.city
+
+
+def get_hotel_key_by_id(hotel_id: int) -> RollupKey | None:
+    return (
+        Hotel.objects.filter(id=hotel_id)
+        .values_list("hotel_class_id", "placement__country", "placement__city")
+        .first()
+    )
+
+
+def apply(
+    key: RollupKey | None, hotels: int = 0, reviews: int = 0, rating: int = 0
+) -> None:
+    if key is None or not (hotels or reviews or rating):
+        return
+    hotel_class_id, country, city = key
+    rollup, _ = HotelRollup.objects.get_or_create(
+        hotel_class_id=hotel_class_id, country=country, city=city
+    )
+    HotelRollup.objects.filter(id=rollup.id).update(
+        hotels_amount=F("hotels_amount") + hotels,
+        reviews_amount=F("reviews_amount") + reviews,
+        rating_sum=F("rating_sum") + rating,
+    )
+
+
+def move_hotel(
+    hotel_id: int, old_key: RollupKey | None, new_key: RollupKey | None
+) -> None:
+    if old_key is None or new_key is None or old_key == new_key:
+        return
+    hotel = Hotel.objects.get(id=hotel_id)
+    live = (
+        Review.objects.using(sharding.shard_for_hotel(hotel_id))
+        .filter(hotel_id=hotel_id)
+        .aggregate(reviews=Count("id"), rating=Sum("hotel_rating"))
+    )
+    reviews = live["reviews"] + hotel.archived_reviews_amount
+    rating = (live["rating"] or 0) + hotel.archived_rating_sum
+    with transaction.atomic():
+        apply(old_key, hotels=-1, reviews=-reviews, rating=-rating)
+        apply(new_key, hotels=1, reviews=reviews, rating=rating)
+
+
+@transaction.atomic
+def rebuild() -> int:
+    totals = defaultdict(lambda: [0, 0, 0])
+    key_fields = ("hotel_class_id", "placement__country", "placement__city")
+
+    for *key, hotels, reviews, rating in (
+        Hotel.objects.order_by()
+        .values(*key_fields)
+        .annotate(
+            hotels=Count("id"),
+            reviews=Sum("archived_reviews_amount"),
+            rating=Sum("archived_rating_sum"),
+        )
+        .values_list(*key_fields, "hotels", "reviews", "rating")
+    ):
+        totals[tuple(key)][0] += hotels
+        totals[tuple(key)][1] += reviews
+        totals[tuple(key)][2] += rating
+
+    if sharding.is_enabled():
+        # No join to the hotels on a shard: sum per hotel, then per key.
+        hotel_keys = {
+            hotel_id: tuple(key)
+            for hotel_id, *key in Hotel.objects.values_list("id", *key_fields)
+        }
+        for database in sharding.review_databases():
+            for hotel_id, reviews, rating in (
+                Review.objects.using(database).order_by()
+                .values("hotel_id")
+                .annotate(reviews=Count("id"), rating=Sum("hotel_rating"))
+                .values_list("hotel_id", "reviews", "rating")
+            ):
+                if hotel_id in hotel_keys:
+                    totals[hotel_keys[hotel_id]][1] += reviews
+                    totals[hotel_keys[hotel_id]][2] += rating
+    else:
+        review_key_fields = tuple(f"hotel__{field}" for field in key_fields)
+        for *key, reviews, rating in (
+            Review.objects.order_by()
+            .filter(hotel__deleted_at__isnull=True)
+            .values(*review_key_fields)
+            .annotate(reviews=Count("id"), rating=Sum("hotel_rating"))
+            .values_list(*review_key_fields, "reviews", "rating")
+        ):
+            totals[tuple(key)][1] += reviews
+            totals[tuple(key)][2] += rating
+
+    HotelRollup.objects.all().delete()
+    HotelRollup.objects.bulk_create([
+        HotelRollup(
+            hotel_class_id=hotel_class_id,
+            country=country,
+            city=city,
+            hotels_amount=hotels,
+            reviews_amount=reviews,
+            rating_sum=rating,
+        )
+        for (hotel_class_id, country, city), (hotels, reviews, rating)
+        in totals.items()
+    ])
+    return len(totals)
+
+
+def apply_month(
+    hotel_id: int, day: datetime.date, reviews: int, rating: int
+) -> None:
+    month = day.replace(day=1)
+    if reviews > 0:
+        HotelMonthlyRating.objects.get_or_create(hotel_id=hotel_id, month=month)
+    # Decrements never create rows: they may run while the hotel itself is
+    # being deleted.
+    HotelMonthlyRating.objects.filter(hotel_id=hotel_id, month=month).update(
+        reviews_amount=F("reviews_amount") + reviews,
+        rating_sum=F("rating_sum") + rating,
+    )
+
+
+def latest_monthly_ratings(hotel_id: int, months: int) -> QuerySet:
+    return HotelMonthlyRating.objects.filter(
+        hotel_id=hotel_id, reviews_amount__gt=0
+    ).order_by("-month")[:months]
+
+
+def get_monthly_ratings(hotel_id: int, months: int = 24) -> list:
+    return list(reversed(latest_monthly_ratings(hotel_id, months)))
+
+
+async def aget_monthly_ratings(hotel_id: int, months: int = 24) -> list:
+    return [
+        rating async for rating in latest_monthly_ratings(hotel_id, months)
+    ][::-1]
+
+
+@transaction.atomic
+def rebuild_monthly_ratings() -> int:
+    totals = defaultdict(lambda: [0, 0])
+    sources = [
+        Review.objects.using(database)
+        for database in sharding.review_databases()
+    ] + [ArchivedReview.objects.all()]
+    for reviews in sources:
+        for hotel_id, month, amount, rating in (
+            reviews.order_by()
+            .annotate(month=TruncMonth("created_at"))
+            .values("hotel_id", "month")
+            .annotate(reviews=Count("id"), rating=Sum("hotel_rating"))
+            .values_list("hotel_id", "month", "reviews", "rating")
+        ):
+            totals[(hotel_id, month)][0] += amount
+            totals[(hotel_id, month)][1] += rating
+
+    HotelMonthlyRating.objects.all().delete()
+    HotelMonthlyRating.objects.bulk_create([
+        HotelMonthlyRating(
+            hotel_id=hotel_id,
+            month=month,
+            reviews_amount=reviews,
+            rating_sum=rating,
+        )
+        for (hotel_id, month), (reviews, rating) in totals.items()
+    ], batch_size=1000)
+    return len(totals)
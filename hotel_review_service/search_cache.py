@@ -0,0 +1,150 @@
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Model, QuerySet
+
+
+def normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+class SearchResultCache:
+    """
+    Process-local LRU of ordered id arrays, bounded by approximate size.
+    Entries expire ``timeout`` seconds after they are stored.
+    """
+
+    def __init__(
+        self, max_bytes: int, max_ids: int, timeout: float = 60
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_ids = max_ids
+        self.timeout = timeout
+        self.size = 0
+        # key: (expiry on the monotonic clock, ids)
+        self._entries: OrderedDict[tuple, tuple[float, array]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def entry_size(key: tuple, ids: array) -> int:
+        return sys.getsizeof(ids) + sum(map(sys.getsizeof, key))
+
+    def get(self, key: tuple) -> array | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, ids = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.size -= self.entry_size(key, ids)
+                return None
+            self._entries.move_to_end(key)
+            return ids
+
+    def set(self, key: tuple, ids: array) -> None:
+        if len(ids) > self.max_ids:
+            return
+        size = self.entry_size(key, ids)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                _, old_ids = self._entries.pop(key)
+                self.size -= self.entry_size(key, old_ids)
+            self._entries[key] = (time.monotonic() + self.timeout, ids)
+            self.size += size
+            while self.size > self.max_bytes:
+                old_key, (_, old_ids) = self._entries.popitem(last=False)
+                self.size -= self.entry_size(old_key, old_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+search_cache = SearchResultCache(
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    max_ids=settings.SEARCH_CACHE_MAX_IDS,
+    timeout=settings.SEARCH_CACHE_TIMEOUT,
+)
+
+
+def get_generation_key(namespace: str) -> str:
+    return f"hotel_review_service:search-generation:{namespace}"
+
+
+def get_generation(namespace: str) -> int:
+    return cache.get(get_generation_key(namespace), 0)
+
+
+def increment_version(key: str) -> None:
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def invalidate(namespace: str) -> None:
+    # The generation lives in Django's cache. With a shared backend
+    # (DJANGO_CACHE_BACKEND) every worker drops its local entries for the
+    # namespace at once; with the per-process default only this one does,
+    # and the others serve theirs until SEARCH_CACHE_TIMEOUT runs out.
+    increment_version(get_generation_key(namespace))
+
+
+def get_cached_ids(
+    namespace: str, term: str, queryset: QuerySet
+) -> array | None:
+    """
+    Return the ordered ids ``queryset`` matches, or None when there are more
+    than ``search_cache.max_ids`` of them and the caller should paginate
+    the queryset itself.
+    """
+    key = (namespace, get_generation(namespace), term)
+    ids = search_cache.get(key)
+    if ids is None:
+        max_ids = search_cache.max_ids
+        ids = array("q", queryset.values_list("id", flat=True)[:max_ids + 1])
+        if len(ids) > max_ids:
+            return None
+        search_cache.set(key, ids)
+    return ids
+
+
+class HydratedIdList(Sequence):
+    """
+    Ordered ids that look like a queryset to the paginator. Only the
+    slice for the requested page is loaded from ``queryset``.
+    """
+
+    ordered = True
+
+    def __init__(self, ids: array, queryset: QuerySet) -> None:
+        self.ids = ids
+        self.queryset = queryset
+        self.model = queryset.model
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int | slice) -> Model | list[Model]:
+        if not isinstance(index, slice):
+            return self[index:index + 1 or None][0]
+        page_ids = list(self.ids[index])
+        objects = self.queryset.in_bulk(page_ids)
+        return [objects[pk] for pk in page_ids if pk in objects]
@@ -0,0 +1,297 @@
+import heapq
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import (
+    F,
+    Max,
+    Model,
+    QuerySet,
+    prefetch_related_objects
+)
+from django.db.models.functions import Greatest
+
+from hotel_review_service.models import (
+    Hotel,
+    IdSequence,
+    Review,
+    ReviewBucket,
+    UserReviewReaction
+)
+
+
+# Reviews and the rows that hang off them live on their hotel's shard,
+# everything else (hotels, users, rollups, archive) stays in "default".
+SHARDED_MODELS = {
+    "hotel_review_service.review",
+    "hotel_review_service.reviewbucket",
+    "hotel_review_service.userreviewreaction",
+}
+
+
+def is_enabled() -> bool:
+    return settings.REVIEW_SHARDS > 0
+
+
+def review_databases() -> list[str]:
+    if not is_enabled():
+        return [DEFAULT_DB_ALIAS]
+    return [f"shard_{shard}" for shard in range(settings.REVIEW_SHARDS)]
+
+
+def shard_for_hotel(hotel_id: int) -> str:
+    databases = review_databases()
+    return databases[hotel_id % len(databases)]
+
+
+def shard_for_review(review_id: int) -> str:
+    # Review ids carry their shard, see allocate_review_id.
+    databases = review_databases()
+    return databases[review_id % len(databases)]
+
+
+def group_by_shard(review_ids) -> dict[str, list[int]]:
+    groups = defaultdict(list)
+    for review_id in review_ids:
+        groups[shard_for_review(review_id)].append(review_id)
+    return groups
+
+
+def next_value(name: str) -> int:
+    connection = connections[DEFAULT_DB_ALIAS]
+    table = connection.ops.quote_name(IdSequence._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (name, last_value) VALUES (%s, 1) "
+            f"ON CONFLICT (name) DO UPDATE SET "
+            f"last_value = {table}.last_value + 1 "
+            f"RETURNING last_value",
+            [name],
+        )
+        return cursor.fetchone()[0]
+
+
+def allocate_review_id(hotel_id: int) -> int:
+    """
+    Globally unique review id with ``id % REVIEW_SHARDS`` equal to the
+    hotel's shard, so that a review can be found from its id alone.
+    """
+    return next_value("review") * settings.REVIEW_SHARDS + (
+        hotel_id % settings.REVIEW_SHARDS
+    )
+
+
+def _misplaced_reviews(database: str) -> QuerySet:
+    reviews = Review.objects.using(database).order_by()
+    if database not in review_databases():
+        return reviews
+    shard = review_databases().index(database)
+    return reviews.alias(
+        hotel_shard=F("hotel_id") % settings.REVIEW_SHARDS,
+        id_shard=F("id") % settings.REVIEW_SHARDS,
+    ).exclude(hotel_shard=shard, id_shard=shard)
+
+
+def _delete_reviews(database: str, review_ids: list[int]) -> None:
+    """Delete reviews and their rows without signals: they were moved."""
+    connection = connections[database]
+    quote = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(review_ids))
+    with connection.cursor() as cursor:
+        for model, column in (
+            (UserReviewReaction, "review_id"),
+            (ReviewBucket, "review_id"),
+            (Review, "id"),
+        ):
+            cursor.execute(
+                f"DELETE FROM {quote(model._meta.db_table)} "
+                f"WHERE {quote(column)} IN ({placeholders})",
+                review_ids,
+            )
+
+
+def move_reviews_batch(database: str, batch_size: int) -> int:
+    """
+    Copy up to ``batch_size`` reviews that do not belong in ``database``,
+    with their reactions and LSH buckets, to their hotel's shard, then
+    delete them from ``database``. A review whose id does not carry that
+    shard is given a new id.
+    """
+    reviews = list(_misplaced_reviews(database)[:batch_size])
+    if not reviews:
+        return 0
+    review_ids = [review.id for review in reviews]
+    reactions = defaultdict(list)
+    for reaction in UserReviewReaction.objects.using(database).filter(
+        review_id__in=review_ids
+    ):
+        reactions[reaction.review_id].append(reaction)
+    buckets = defaultdict(list)
+    for bucket in ReviewBucket.objects.using(database).filter(
+        review_id__in=review_ids
+    ):
+        buckets[bucket.review_id].append(bucket)
+
+    per_shard = defaultdict(list)
+    for review in reviews:
+        per_shard[shard_for_hotel(review.hotel_id)].append(review)
+    for shard, shard_reviews in per_shard.items():
+        # Copied by an earlier, interrupted run: only the delete is left.
+        copied = set(
+            Review.objects.using(shard)
+            .filter(id__in=[review.id for review in shard_reviews])
+            .values_list("id", flat=True)
+        )
+        new_reviews, new_rows = [], []
+        for review in shard_reviews:
+            old_id = review.id
+            if shard_for_review(old_id) != shard:
+                review.id = allocate_review_id(review.hotel_id)
+            elif old_id in copied:
+                continue
+            new_reviews.append(review)
+            for row in reactions[old_id] + buckets[old_id]:
+                row.pk = None
+                row.review_id = review.id
+                new_rows.append(row)
+        with transaction.atomic(using=shard):
+            Review.objects.using(shard).bulk_create(new_reviews)
+            for model in (UserReviewReaction, ReviewBucket):
+                model.objects.using(shard).bulk_create(
+                    [row for row in new_rows if isinstance(row, model)]
+                )
+
+    with transaction.atomic(using=database):
+        _delete_reviews(database, review_ids)
+    return len(reviews)
+
+
+def move_reviews(batch_size: int = 1000):
+    """
+    Put every review on its hotel's shard: the ones left in "default" when
+    sharding is turned on, and the ones on the wrong shard after
+    REVIEW_SHARDS changes. Yields ``(database, moved)`` per batch.
+    """
+    if not is_enabled():
+        raise CommandError("Set REVIEW_SHARDS to move reviews to shards")
+    databases = [DEFAULT_DB_ALIAS, *review_databases()]
+    # New ids must not collide with the ones already handed out, which
+    # predate the sequence when reviews were in "default".
+    highest = max(
+        Review.objects.using(database).aggregate(Max("id"))["id__max"] or 0
+        for database in databases
+    )
+    IdSequence.objects.get_or_create(name="review")
+    IdSequence.objects.filter(name="review").update(
+        last_value=Greatest("last_value", highest // settings.REVIEW_SHARDS)
+    )
+    for database in databases:
+        while moved := move_reviews_batch(database, batch_size):
+            yield database, moved
+
+
+def ensure_single_database(command: str) -> None:
+    if is_enabled():
+        raise CommandError(
+            f"{command} reads reviews from one database and does not "
+            f"support REVIEW_SHARDS yet"
+        )
+
+
+class ReviewShardRouter:
+    """Routes SHARDED_MODELS by hotel and every other model to "default"."""
+
+    def db_for_read(self, model: type[Model], **hints) -> str | None:
+        if model._meta.label_lower not in SHARDED_MODELS:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if isinstance(instance, Hotel):
+            return shard_for_hotel(instance.pk)
+        if isinstance(instance, Review):
+            if instance.pk is not None:
+                return shard_for_review(instance.pk)
+            if instance.hotel_id is not None:
+                return shard_for_hotel(instance.hotel_id)
+        review_id = getattr(instance, "review_id", None)
+        if review_id is not None:
+            return shard_for_review(review_id)
+        # Unknown shard, e.g. user.reviews: use scatter() instead.
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> bool:
+        return True
+
+
+class ShardedList(Sequence):
+    """
+    The same queryset on every shard, merged newest first on
+    ``(created_at, id)``. A slice fetches up to ``stop`` rows from each
+    shard, so deep pages cost more than shallow ones. Prefetches run once
+    on the merged rows instead of once per shard. ``key`` reads
+    ``(created_at, id)`` from rows that are not model instances.
+    """
+
+    ordered = True
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        key: Callable = attrgetter("created_at", "id"),
+    ) -> None:
+        self.model = queryset.model
+        self.key = key
+        self.lookups = queryset._prefetch_related_lookups
+        self.querysets = [
+            queryset.prefetch_related(None)
+            .order_by("-created_at", "-id")
+            .using(database)
+            for database in review_databases()
+        ]
+        self._count = None
+
+    def count(self) -> int:
+        if self._count is None:
+            self._count = sum(
+                queryset.count() for queryset in self.querysets
+            )
+        return self._count
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index: int | slice) -> Model | list[Model]:
+        if not isinstance(index, slice):
+            return self[index:index + 1 or None][0]
+        start, stop = index.start or 0, index.stop
+        merged = heapq.merge(
+            *(
+                queryset if stop is None else queryset[:stop]
+                for queryset in self.querysets
+            ),
+            key=self.key,
+            reverse=True,
+        )
+        rows = list(islice(merged, start, stop))
+        prefetch_related_objects(rows, *self.lookups)
+        return rows
+
+
+def scatter(
+    queryset: QuerySet, key: Callable | None = None
+) -> QuerySet | ShardedList:
+    """Run a review queryset on every shard, or as is without sharding."""
+    if not is_enabled():
+        return queryset
+    if key is not None:
+        return ShardedList(queryset, key)
+    return ShardedList(queryset)
@@ -0,0 +1,325 @@
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import receiver
+
+from hotel_review_service import (
+    autocomplete,
+    events,
+    pagination,
+    reputation,
+    rollups,
+    search_cache,
+    sharding
+)
+from hotel_review_service.backends import invalidate_cached_user
+from hotel_review_service.models import (
+    Hotel,
+    Placement,
+    Review,
+    User,
+    UserReviewReaction
+)
+from hotel_review_service.utils import index_review_buckets
+
+
+@receiver(post_save, sender=Review)
+def update_review_buckets(sender, instance: Review, raw: bool, **kwargs):
+    if raw or not getattr(instance, "_comment_changed", True):
+        return
+    index_review_buckets(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance: User, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_user_cache_on_logout(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_cached_user(user.pk)
+
+
+@receiver(pre_save, sender=Review)
+def assign_sharded_review_id(
+    sender, instance: Review, raw: bool, **kwargs
+):
+    if raw or instance.pk is not None or not sharding.is_enabled():
+        return
+    instance.pk = sharding.allocate_review_id(instance.hotel_id)
+
+
+@receiver(pre_delete, sender=Hotel)
+def delete_sharded_hotel_reviews(sender, instance: Hotel, **kwargs):
+    # Cascades only follow relations within one database.
+    if sharding.is_enabled():
+        Review.objects.using(sharding.shard_for_hotel(instance.pk)).filter(
+            hotel_id=instance.pk
+        ).delete()
+
+
+@receiver(pre_delete, sender=User)
+def delete_sharded_user_rows(sender, instance: User, **kwargs):
+    if not sharding.is_enabled():
+        return
+    for database in sharding.review_databases():
+        Review.objects.using(database).filter(author_id=instance.pk).delete()
+        UserReviewReaction.objects.using(database).filter(
+            user_id=instance.pk
+        ).delete()
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_review(sender, instance: Review, raw: bool, **kwargs):
+    instance._previous = None
+    if raw or instance._state.adding:
+        return
+    instance._previous = (
+        Review.objects.using(instance._state.db).filter(id=instance.id)
+        .values_list("hotel_id", "hotel_rating", "created_at")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rollups_on_review_save(
+    sender, instance: Review, created: bool, raw: bool, **kwargs
+):
+    if raw or rollups.is_paused():
+        return
+    previous = None if created else getattr(instance, "_previous", None)
+    current = (instance.hotel_id, instance.hotel_rating)
+    if previous is not None and previous[:2] == current:
+        return
+    if previous is not None:
+        hotel_id, rating, _ = previous
+        rollups.apply(
+            rollups.get_hotel_key_by_id(hotel_id), reviews=-1, rating=-rating
+        )
+    rollups.apply(
+        rollups.get_hotel_key_by_id(instance.hotel_id),
+        reviews=1,
+        rating=instance.hotel_rating,
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_monthly_ratings_on_review_save(
+    sender, instance: Review, created: bool, raw: bool, **kwargs
+):
+    if raw or rollups.is_paused():
+        return
+    previous = None if created else getattr(instance, "_previous", None)
+    current = (instance.hotel_id, instance.hotel_rating, instance.created_at)
+    if previous == current:
+        return
+    if previous is not None:
+        hotel_id, rating, created_at = previous
+        rollups.apply_month(hotel_id, created_at, reviews=-1, rating=-rating)
+    rollups.apply_month(
+        instance.hotel_id,
+        instance.created_at,
+        reviews=1,
+        rating=instance.hotel_rating,
+    )
+
+
+@receiver(post_delete, sender=Review)
+def update_rollups_on_review_delete(sender, instance: Review, **kwargs):
+    if rollups.is_paused():
+        return
+    key = rollups.get_hotel_key_by_id(instance.hotel_id)
+    if key is not None:
+        rollups.apply(key, reviews=-1, rating=-instance.hotel_rating)
+    rollups.apply_month(
+        instance.hotel_id,
+        instance.created_at,
+        reviews=-1,
+        rating=-instance.hotel_rating,
+    )
+
+
+@receiver(post_save, sender=Hotel)
+def update_rollups_on_hotel_create(
+    sender, instance: Hotel, created: bool, raw: bool, **kwargs
+):
+    if raw or not created or rollups.is_paused():
+        return
+    rollups.apply(rollups.get_hotel_key(instance), hotels=1)
+
+
+ROLLUP_KEY_FIELDS = {
+    Hotel: {"hotel_class", "hotel_class_id", "placement", "placement_id"},
+    Placement: {"country", "city"},
+}
+
+
+@receiver(pre_save, sender=Hotel)
+@receiver(pre_save, sender=Placement)
+def remember_previous_rollup_keys(sender, instance, raw: bool, **kwargs):
+    """Rollup keys of the hotels that the save may move, keyed by id."""
+    instance._previous_rollup_keys = {}
+    update_fields = kwargs.get("update_fields")
+    if (
+        raw
+        or instance._state.adding
+        or rollups.is_paused()
+        or (update_fields is not None
+            and not ROLLUP_KEY_FIELDS[sender] & set(update_fields))
+    ):
+        return
+    hotels = Hotel.objects.filter(
+        **{"id" if sender is Hotel else "placement_id": instance.pk}
+    )
+    instance._previous_rollup_keys = {
+        hotel_id: tuple(key)
+        for hotel_id, *key in hotels.values_list(
+            "id", "hotel_class_id", "placement__country", "placement__city"
+        )
+    }
+
+
+@receiver(post_save, sender=Hotel)
+@receiver(post_save, sender=Placement)
+def move_hotels_between_rollups(
+    sender, instance, created: bool, raw: bool, **kwargs
+):
+    if raw or created or rollups.is_paused():
+        return
+    for hotel_id, old_key in getattr(
+        instance, "_previous_rollup_keys", {}
+    ).items():
+        rollups.move_hotel(
+            hotel_id, old_key, rollups.get_hotel_key_by_id(hotel_id)
+        )
+
+
+@receiver(post_delete, sender=Hotel)
+def update_rollups_on_hotel_delete(sender, instance: Hotel, **kwargs):
+    if rollups.is_paused():
+        return
+    try:
+        key = rollups.get_hotel_key(instance)
+    except Placement.DoesNotExist:
+        return
+    rollups.apply(
+        key,
+        hotels=-1,
+        reviews=-instance.archived_reviews_amount,
+        rating=-instance.archived_rating_sum,
+    )
+
+
+@receiver(post_save, sender=Hotel)
+@receiver(post_delete, sender=Hotel)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_search_cache(sender, **kwargs):
+    search_cache.invalidate(sender._meta.model_name)
+
+
+@receiver(post_save, sender=Hotel)
+@receiver(post_delete, sender=Hotel)
+@receiver(post_save, sender=Placement)
+def invalidate_autocomplete_index(sender, **kwargs):
+    autocomplete.invalidate()
+
+
+@receiver(post_save, sender=Review)
+def publish_new_review(
+    sender, instance: Review, created: bool, raw: bool, **kwargs
+):
+    if raw or not created:
+        return
+    events.publish_review(instance)
+
+
+@receiver(post_save, sender=UserReviewReaction)
+@receiver(post_delete, sender=UserReviewReaction)
+def publish_review_rating(sender, instance: UserReviewReaction, **kwargs):
+    if kwargs.get("raw") or rollups.is_paused():
+        return
+    events.publish_review_ratings([instance.review_id])
+
+
+@receiver(post_save, sender=Hotel)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserReviewReaction)
+def count_created_row(sender, created: bool, **kwargs):
+    # Archival deletes in bulk and records the counts itself.
+    if created and not rollups.is_paused():
+        pagination.adjust_row_count(sender, 1)
+
+
+@receiver(post_delete, sender=Hotel)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=UserReviewReaction)
+def count_deleted_row(sender, **kwargs):
+    if not rollups.is_paused():
+        pagination.adjust_row_count(sender, -1)
+
+
+@receiver(post_save, sender=Review)
+def count_authored_review(
+    sender, instance: Review, created: bool, raw: bool, **kwargs
+):
+    if raw or not created or rollups.is_paused():
+        return
+    reputation.adjust_reviews_amount(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Review)
+def uncount_authored_review(sender, instance: Review, **kwargs):
+    # Archived reviews keep counting towards their author.
+    if rollups.is_paused():
+        return
+    reputation.adjust_reviews_amount(instance.author_id, -1)
+
+
+@receiver(pre_save, sender=UserReviewReaction)
+def remember_previous_reaction(
+    sender, instance: UserReviewReaction, raw: bool, **kwargs
+):
+    instance._previous_reaction = None
+    if raw or instance._state.adding or rollups.is_paused():
+        return
+    instance._previous_reaction = (
+        UserReviewReaction.objects.using(instance._state.db)
+        .filter(id=instance.id)
+        .values_list("reaction", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=UserReviewReaction)
+def update_reputation_on_reaction_save(
+    sender, instance: UserReviewReaction, raw: bool, **kwargs
+):
+    if raw or rollups.is_paused():
+        return
+    previous = getattr(instance, "_previous_reaction", None)
+    reputation.adjust_for_review(
+        instance.review_id,
+        reputation.score(instance.reaction) - reputation.score(previous),
+    )
+
+
+@receiver(post_delete, sender=UserReviewReaction)
+def update_reputation_on_reaction_delete(
+    sender, instance: UserReviewReaction, **kwargs
+):
+    if rollups.is_paused():
+        return
+    reputation.adjust_for_review(
+        instance.review_id, -reputation.score(instance.reaction)
+    )
@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from hotel_review_service.models import SlowQuery
+from hotel_review_service.utils import get_url_name
+
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+_explaining = ContextVar("slow_query_explaining", default=False)
+
+
+def normalize_sql(sql: str) -> str:
+    """Replace literals and placeholder lists so that similar queries match."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql: str) -> str:
+    return hashlib.md5(normalized_sql.encode()).hexdigest()
+
+
+def explain(connection, sql: str, params) -> str:
+    if not sql.lstrip()[:6].upper() == "SELECT":
+        # Never re-run writes, even to explain them.
+        return ""
+    token = _explaining.set(True)
+    try:
+        # In a savepoint: on PostgreSQL a failed statement would otherwise
+        # abort the transaction of the request being logged.
+        with (
+            transaction.atomic(using=connection.alias),
+            connection.cursor() as cursor,
+        ):
+            cursor.execute(
+                f"{connection.ops.explain_query_prefix()} {sql}", params
+            )
+            rows = cursor.fetchall()
+    except DatabaseError as error:
+        return f"EXPLAIN failed: {error}"
+    finally:
+        _explaining.reset(token)
+    if connection.vendor == "sqlite":
+        # (id, parent, notused, detail) rows.
+        depth = {0: 0}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, 0) + 1
+            lines.append("  " * (depth[node_id] - 1) + detail)
+        return "\n".join(lines)
+    return "\n".join(str(row[0]) for row in rows)
+
+
+@dataclass
+class CapturedQuery:
+    sql: str
+    duration: float
+    plan: str
+
+
+class SlowQueryLogger:
+    """Execute wrapper that records queries slower than the threshold."""
+
+    def __init__(self, connection, request, threshold: float) -> None:
+        self.connection = connection
+        self.request = request
+        self.threshold = threshold
+        self.captured: list[CapturedQuery] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if _explaining.get():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= self.threshold:
+            self.capture(sql, params, many, duration)
+        return result
+
+    def capture(self, sql: str, params, many: bool, duration: float) -> None:
+        plan = "" if many else explain(self.connection, sql, params)
+        self.captured.append(CapturedQuery(sql, duration, plan))
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s\n%s",
+            duration, get_url_name(self.request), normalize_sql(sql), plan,
+        )
+
+
+def record(view: str, captured: list[CapturedQuery]) -> None:
+    """Fold captured queries into the per-fingerprint counters."""
+    now = timezone.now()
+    for query in captured:
+        normalized = normalize_sql(query.sql)
+        slow_query, created = SlowQuery.objects.get_or_create(
+            fingerprint=fingerprint(normalized),
+            view=view,
+            defaults={
+                "sql": normalized,
+                "calls": 1,
+                "total_time": query.duration,
+                "max_time": query.duration,
+                "plan": query.plan,
+                "last_seen": now,
+            },
+        )
+        if created:
+            continue
+        updates = {
+            "calls": F("calls") + 1,
+            "total_time": F("total_time") + query.duration,
+            "max_time": Greatest("max_time", query.duration),
+            "last_seen": now,
+        }
+        if query.plan:
+            updates["plan"] = query.plan
+        SlowQuery.objects.filter(id=slow_query.id).update(**updates)
@@ -0,0 +1,182 @@
+"""
+Query-budget harness: renders a page against a small and a large generated
+dataset and fails when the number of queries changes with the data, or
+when the page fetches more rows than its budget.
+"""
+import difflib
+import itertools
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from hotel_review_service.models import (
+    Hotel,
+    HotelClass,
+    Placement,
+    Review,
+    UserReviewReaction
+)
+from hotel_review_service.search_cache import search_cache
+from hotel_review_service.slow_queries import normalize_sql
+from hotel_review_service.tests.sharded import single_database
+
+
+class Dataset:
+    """
+    Hotels, reviewers and reactions that grow in place.
+
+    At scale ``n`` every hotel has ``n // REVIEWS_PER_HOTEL_DIVISOR + 1``
+    reviews, each by a different reviewer, and every reviewer writes as
+    many. So everything grows with the scale: the number of hotels and
+    users, the reviews on a hotel or user page, the reactions on every
+    review and the reactions of the viewer.
+    """
+
+    REVIEWS_PER_HOTEL_DIVISOR = 2
+
+    def __init__(self, viewer) -> None:
+        self.viewer = viewer
+        self.hotel_class = HotelClass.objects.create(name="Budget")
+        self.hotels: list[Hotel] = []
+        self.users = [viewer]
+        self.reviews: list[Review] = []
+        self.reviewed: set[tuple[int, int]] = set()
+        self.reacted: set[tuple[int, int]] = set()
+
+    def reviews_per_hotel(self, scale: int) -> int:
+        return scale // self.REVIEWS_PER_HOTEL_DIVISOR + 1
+
+    def grow(self, scale: int) -> None:
+        """Extend the dataset to ``scale`` hotels and reviewers."""
+        start = len(self.hotels)
+        placements = Placement.objects.bulk_create(
+            Placement(country="Ukraine", city=f"City {i % 3}",
+                      address=f"Street {i}")
+            for i in range(start, scale)
+        )
+        hotels = Hotel.objects.bulk_create(
+            Hotel(name=f"Hotel {i:05}", placement=placement,
+                  hotel_class=self.hotel_class)
+            for i, placement in zip(range(start, scale), placements)
+        )
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"reviewer{i}", first_name="Reviewer",
+                             last_name=str(i), password="!")
+            for i in range(start, scale)
+        )
+        self.hotels += hotels
+        self.users += users
+
+        # Hotel i is reviewed by reviewers i, i + 1, ..., so every reviewer
+        # writes as many reviews as every hotel gets.
+        reviewers = self.users[1:]
+        reviews = []
+        for i, hotel in enumerate(self.hotels):
+            for n in range(self.reviews_per_hotel(scale)):
+                author = reviewers[(i + n) % len(reviewers)]
+                if (hotel.id, author.id) not in self.reviewed:
+                    self.reviewed.add((hotel.id, author.id))
+                    reviews.append(Review(
+                        author=author, hotel=hotel, caption=f"Review {n}",
+                        comment="Budget", hotel_rating=n % 6 + 5,
+                    ))
+        self.reviews += Review.objects.bulk_create(reviews)
+
+        reactions = []
+        for user, review in itertools.product(self.users, self.reviews):
+            if (user.id, review.id) not in self.reacted:
+                self.reacted.add((user.id, review.id))
+                reactions.append(UserReviewReaction(
+                    user=user, review=review,
+                    reaction="L" if (user.id + review.id) % 2 else "D",
+                ))
+        UserReviewReaction.objects.bulk_create(reactions)
+
+
+class QueryRecorder:
+    """Execute wrapper that keeps every SELECT with its parameters."""
+
+    def __init__(self) -> None:
+        self.queries: list[tuple[str, tuple]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == "SELECT":
+            self.queries.append((sql, tuple(params or ())))
+        return execute(sql, params, many, context)
+
+    def rows(self) -> list[tuple[int, str]]:
+        """Rows each recorded query returns against the current data."""
+        counted = []
+        with connection.cursor() as cursor:
+            for sql, params in self.queries:
+                cursor.execute(
+                    f"SELECT COUNT(*) FROM ({sql}) AS budget", params
+                )
+                counted.append((cursor.fetchone()[0], sql))
+        return counted
+
+
+# Queries are recorded and counted on the default connection only.
+@single_database
+class QueryBudgetTestCase(TestCase):
+    small_scale = 3
+    large_scale = 30
+
+    def setUp(self):
+        self.viewer = get_user_model().objects.create_user(
+            username="budget", password="budget", is_staff=True
+        )
+        self.client.force_login(self.viewer)
+        self.dataset = Dataset(self.viewer)
+        self.dataset.grow(self.small_scale)
+
+    def record(self, url: str, data: dict | None = None) -> QueryRecorder:
+        # Measure a warm request: the first one fills per-process caches.
+        search_cache.clear()
+        self.assertEqual(self.client.get(url, data).status_code, 200)
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            self.assertEqual(self.client.get(url, data).status_code, 200)
+        return recorder
+
+    def assertQueryBudget(
+        self, url: str, max_rows: int, data: dict | None = None
+    ) -> None:
+        """
+        Render ``url`` at both scales. The query count must not change
+        and neither run may fetch more than ``max_rows`` rows in total.
+        """
+        small = self.record(url, data)
+        self.assertRowBudget(url, small, max_rows)
+        self.dataset.grow(self.large_scale)
+        large = self.record(url, data)
+        self.assertRowBudget(url, large, max_rows)
+
+        if len(small.queries) != len(large.queries):
+            diff = difflib.unified_diff(
+                [normalize_sql(sql) for sql, _ in small.queries],
+                [normalize_sql(sql) for sql, _ in large.queries],
+                f"{self.small_scale} hotels", f"{self.large_scale} hotels",
+                lineterm="",
+            )
+            self.fail(
+                f"{url}: {len(small.queries)} queries with "
+                f"{self.small_scale} hotels, {len(large.queries)} with "
+                f"{self.large_scale}\n" + "\n".join(diff)
+            )
+
+    def assertRowBudget(
+        self, url: str, recorder: QueryRecorder, max_rows: int
+    ) -> None:
+        counted = recorder.rows()
+        total = sum(rows for rows, _ in counted)
+        if total > max_rows:
+            lines = [
+                f"{rows:>6}  {normalize_sql(sql)}"
+                for rows, sql in sorted(counted, reverse=True)
+            ]
+            self.fail(
+                f"{url}: fetched {total} rows, budget {max_rows}\n"
+                + "\n".join(lines)
+            )
@@ -0,0 +1,38 @@
+import unittest
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from hotel_review_service import rollups, sharding
+
+
+# Archival, the stats report and the other features that still read reviews
+# from one database, see the README.
+single_database = unittest.skipIf(
+    sharding.is_enabled(), "reads reviews from one database"
+)
+
+
+def shard_fixtures() -> None:
+    """Leave each fixture review on its hotel's shard only."""
+    call_command("shard_reviews", stdout=StringIO())
+    # Sharded hotel averages come from the monthly ratings, which loaddata
+    # does not fill in.
+    rollups.rebuild_monthly_ratings()
+
+
+class ShardedTestCase(TestCase):
+    """
+    A TestCase that also runs with REVIEW_SHARDS, e.g. under
+    core.settings_test_shards. Fixtures are loaded into every database;
+    shard_reviews then leaves each review on its hotel's shard only.
+    """
+
+    databases = "__all__"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        if cls.fixtures and sharding.is_enabled():
+            shard_fixtures()
@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service import api, sharding
+from hotel_review_service.models import Hotel, Review
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+class ApiTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.get(id=1))
+
+    def get(self, name: str, *args, **params):
+        return self.client.get(
+            reverse(f"hotel_review_service:{name}", args=args), params
+        )
+
+    def test_login_required(self):
+        self.client.logout()
+        for response in (
+            self.get("api-hotel-list"), self.get("api-review-detail", 1)
+        ):
+            self.assertEqual(response.status_code, 401)
+            self.assertIn("errors", response.json())
+
+    def test_hotel_list(self):
+        data = self.get("api-hotel-list", page_size=2).json()
+        self.assertEqual(data["fields"], list(api.HOTEL_FIELDS))
+        self.assertEqual(data["count"], Hotel.objects.count())
+        self.assertEqual(data["num_pages"], -(-data["count"] // 2))
+        hotel = Hotel.objects.select_related("hotel_class", "placement").get(
+            id=data["results"][0][0]
+        )
+        self.assertEqual(
+            dict(zip(data["fields"], data["results"][0])),
+            {
+                "id": hotel.id,
+                "name": hotel.name,
+                "hotel_class": hotel.hotel_class.name,
+                "country": hotel.placement.country,
+                "city": hotel.placement.city,
+                "address": hotel.placement.address,
+                "latitude": None,
+                "longitude": None,
+            },
+        )
+
+    def test_sparse_fields(self):
+        data = self.get("api-review-list", fields="id,likes,dislikes").json()
+        self.assertEqual(data["fields"], ["id", "likes", "dislikes"])
+        counts = {review_id: (likes, dislikes)
+                  for review_id, likes, dislikes in data["results"]}
+        self.assertEqual(counts[1], (4, 0))
+        self.assertEqual(counts[2], (0, 2))
+        self.assertEqual(counts[9], (0, 0))
+
+    def test_review_list_skips_comment(self):
+        data = self.get("api-review-list", hotel=1).json()
+        self.assertNotIn("comment", data["fields"])
+        self.assertEqual(
+            [row[0] for row in data["results"]],
+            list(
+                Review.objects.using(sharding.shard_for_hotel(1))
+                .filter(hotel_id=1).order_by("-created_at", "-id")
+                .values_list("id", flat=True)
+            ),
+        )
+
+    def test_reaction_counts_are_only_computed_when_asked(self):
+        connection = connections[sharding.shard_for_hotel(1)]
+        with CaptureQueriesContext(connection) as context:
+            self.get("api-review-list", hotel=1, fields="id,caption")
+        self.assertNotIn(
+            "userreviewreaction", context.captured_queries[-1]["sql"]
+        )
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        counts = []
+        for page_size in (1, 10):
+            with CaptureQueriesContext(connection) as context:
+                self.get("api-review-list", page_size=page_size)
+            counts.append(len(context))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_detail(self):
+        review = Review.objects.using(sharding.shard_for_review(1)).get(id=1)
+        data = self.get("api-review-detail", 1).json()
+        self.assertEqual(data["comment"], review.comment)
+        self.assertEqual(data["likes"], 4)
+        self.assertEqual(
+            self.get("api-user-detail", 1, fields="username").json(),
+            {"username": "admin"},
+        )
+
+    def test_unknown_field(self):
+        response = self.get("api-user-list", fields="id,email")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.json()["errors"]["fields"][0])
+
+    def test_invalid_filter_and_page(self):
+        self.assertEqual(
+            self.get("api-review-list", hotel="x").status_code, 400
+        )
+        self.assertEqual(
+            self.get("api-review-list", page_size=api.MAX_PAGE_SIZE + 1)
+            .status_code,
+            400,
+        )
+        self.assertEqual(self.get("api-hotel-list", page=99).status_code, 404)
+
+    def test_missing_and_deleted_rows(self):
+        self.assertEqual(self.get("api-hotel-detail", 999).status_code, 404)
+        Hotel.objects.filter(id=1).update(deleted_at="2024-01-01T00:00Z")
+        self.assertEqual(self.get("api-hotel-detail", 1).status_code, 404)
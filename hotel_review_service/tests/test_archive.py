@@ -0,0 +1,78 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Avg
+from django.test import TestCase
+from django.urls import reverse
+
+from hotel_review_service.models import (
+    ArchivedReview,
+    ArchivedUserReviewReaction,
+    Hotel,
+    Review,
+    UserReviewReaction
+)
+from hotel_review_service.tests.sharded import single_database
+from hotel_review_service.utils import hotel_average_rating
+
+
+@single_database
+class ArchiveReviewsTest(TestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+
+    def test_archive_moves_reviews_and_reactions(self):
+        old_ids = set(
+            Review.objects.filter(created_at__lt=datetime.date(2023, 1, 5))
+            .values_list("id", flat=True)
+        )
+        reactions_amount = UserReviewReaction.objects.filter(
+            review_id__in=old_ids
+        ).count()
+
+        call_command(
+            "archive_reviews",
+            days=(datetime.date.today() - datetime.date(2023, 1, 5)).days,
+            batch_size=2,
+            stdout=StringIO(),
+        )
+
+        self.assertFalse(Review.objects.filter(id__in=old_ids).exists())
+        self.assertEqual(
+            set(ArchivedReview.objects.values_list("id", flat=True)), old_ids
+        )
+        self.assertEqual(
+            ArchivedUserReviewReaction.objects.count(), reactions_amount
+        )
+
+    def test_hotel_average_rating_includes_archived_reviews(self):
+        expected = dict(
+            Hotel.objects.annotate(rating=Avg("reviews__hotel_rating"))
+            .values_list("id", "rating")
+        )
+
+        call_command("archive_reviews", days=0, stdout=StringIO())
+
+        self.assertFalse(Review.objects.exists())
+        actual = dict(
+            Hotel.objects.annotate(rating=hotel_average_rating())
+            .values_list("id", "rating")
+        )
+        self.assertEqual(actual, expected)
+
+    def test_archived_review_detail(self):
+        review = Review.objects.get(id=1)
+        call_command("archive_reviews", days=0, stdout=StringIO())
+
+        response = self.client.get(
+            reverse("hotel_review_service:review-detail", args=[review.id])
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, review.comment)
+        self.assertEqual(response.context["review"].like_amount, 4)
@@ -0,0 +1,159 @@
+import importlib
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.test import override_settings
+from django.urls import clear_url_caches, resolve, reverse
+
+from hotel_review_service import sharding, views
+from hotel_review_service.models import Hotel, Review, SlowQuery
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+def reload_urls() -> None:
+    for module in ("hotel_review_service.urls", settings.ROOT_URLCONF):
+        importlib.reload(importlib.import_module(module))
+    clear_url_caches()
+
+
+class AsyncReadViewTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Cleanups run last in, first out: restore the settings, then the
+        # urls built from them.
+        cls.addClassCleanup(reload_urls)
+        cls.enterClassContext(override_settings(
+            ASYNC_READ_VIEWS=True,
+            MIDDLEWARE=[
+                middleware for middleware in settings.MIDDLEWARE
+                if not middleware.startswith("debug_toolbar.")
+            ],
+        ))
+        reload_urls()
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.async_client.force_login(self.user)
+
+    def test_read_pages_are_routed_to_async_views(self):
+        for url, view in (
+            (reverse("hotel_review_service:hotel-list"),
+             views.hotel_list_async),
+            (reverse("hotel_review_service:hotel-detail", args=[1]),
+             views.hotel_detail_async),
+            (reverse("hotel_review_service:review-list"),
+             views.review_list_async),
+            (reverse("hotel_review_service:user-detail", args=[1]),
+             views.user_detail_async),
+        ):
+            self.assertIs(resolve(url).func, view)
+            self.assertTrue(iscoroutinefunction(view))
+
+    def test_middleware_does_not_adapt_async_views(self):
+        # Django logs every sync/async adaptation of the chain.
+        with self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler().load_middleware(is_async=True)
+
+    async def test_hotel_list(self):
+        response = await self.async_client.get(
+            reverse("hotel_review_service:hotel-list"), {"page": "last"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(
+            response, "hotel_review_service/hotel_list.html"
+        )
+        hotels = [hotel async for hotel in Hotel.objects.order_by("name")]
+        paginator = response.context["paginator"]
+        self.assertEqual(paginator.count, len(hotels))
+        self.assertEqual(
+            list(response.context["hotel_list"]),
+            hotels[(paginator.num_pages - 1) * 5:],
+        )
+
+    async def test_hotel_search(self):
+        hotel = await Hotel.objects.aget(id=1)
+        response = await self.async_client.get(
+            reverse("hotel_review_service:hotel-list"),
+            {"search": hotel.name},
+        )
+        self.assertIn(hotel, response.context["hotel_list"])
+
+    async def test_invalid_page(self):
+        for page in ("0", "99", "first"):
+            response = await self.async_client.get(
+                reverse("hotel_review_service:review-list"), {"page": page}
+            )
+            self.assertEqual(response.status_code, 404)
+
+    async def test_hotel_detail(self):
+        response = await self.async_client.get(
+            reverse("hotel_review_service:hotel-detail", args=[1])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["hotel"].id, 1)
+        self.assertEqual(
+            [review.id for review in response.context["hotel_reviews"]],
+            [
+                review.id async for review in
+                Review.objects.using(sharding.shard_for_hotel(1))
+                .filter(hotel_id=1).order_by("-created_at")
+            ],
+        )
+        response = await self.async_client.get(
+            reverse("hotel_review_service:hotel-detail", args=[999])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_review_list(self):
+        response = await self.async_client.get(
+            reverse("hotel_review_service:review-list")
+        )
+        self.assertEqual(response.status_code, 200)
+        reviews = sharding.scatter(Review.objects.order_by("-created_at"))
+        self.assertEqual(
+            [review.id for review in response.context["review_list"]],
+            await sync_to_async(
+                lambda: [review.id for review in reviews[:5]]
+            )(),
+        )
+        self.assertEqual(
+            response.context["paginator"].count,
+            await sync_to_async(reviews.count)(),
+        )
+
+    async def test_user_detail(self):
+        response = await self.async_client.get(
+            reverse("hotel_review_service:user-detail", args=[1])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["user"].id, 1)
+        self.assertEqual(
+            len(response.context["user_reviews"]),
+            await sync_to_async(
+                sharding.scatter(Review.objects.filter(author_id=1)).count
+            )(),
+        )
+
+    async def test_login_required(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get(
+            reverse("hotel_review_service:review-list")
+        )
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=1e-9)
+    async def test_slow_queries_are_recorded(self):
+        with self.assertLogs("hotel_review_service.slow_queries", "WARNING"):
+            await self.async_client.get(
+                reverse("hotel_review_service:review-list")
+            )
+        self.assertTrue(
+            await SlowQuery.objects.filter(
+                view="hotel_review_service.review-list"
+            ).aexists()
+        )
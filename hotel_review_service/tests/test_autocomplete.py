@@ -0,0 +1,139 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from hotel_review_service.autocomplete import (
+    VERSION_KEY,
+    WARM_UP_UID,
+    AutocompleteIndex,
+    PrefixIndex,
+    autocomplete_index,
+    warm_up
+)
+from hotel_review_service.models import Hotel, HotelClass, Placement
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+class PrefixIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = PrefixIndex([
+            (1, "Kyiv Palace", "Kyiv"),
+            (2, "Grand Hotel Kyiv", "Kyiv"),
+            (3, "Grand Budapest", "Lutz"),
+            (4, "Seaside Inn", "Odesa"),
+        ])
+
+    def names(self, term: str, limit: int = 10) -> list[str]:
+        return [hotel["name"] for hotel in self.index.search(term, limit)]
+
+    def test_name_prefix_matches_first(self):
+        self.assertEqual(
+            self.names("  GRAND  h"), ["Grand Hotel Kyiv"]
+        )
+        self.assertEqual(
+            self.names("kyiv"), ["Kyiv Palace", "Grand Hotel Kyiv"]
+        )
+
+    def test_later_word_and_city_match(self):
+        self.assertEqual(self.names("budapest"), ["Grand Budapest"])
+        self.assertEqual(self.names("odes"), ["Seaside Inn"])
+
+    def test_limit_and_empty_term(self):
+        self.assertEqual(len(self.names("g", limit=1)), 1)
+        self.assertEqual(self.names("   "), [])
+
+
+class AutocompleteIndexTest(SimpleTestCase):
+    def test_first_request_waits_for_warm_up_build(self):
+        holder = AutocompleteIndex()
+        started, release = threading.Event(), threading.Event()
+
+        def build():
+            started.set()
+            release.wait(5)
+            holder.index = PrefixIndex([(1, "Kyiv Palace", "Kyiv")])
+            holder.version = cache.get(VERSION_KEY, 0)
+            holder.built_at = time.monotonic()
+            return holder.index
+
+        with mock.patch.object(holder, "build", side_effect=build) as built:
+            holder.refresh_in_background()
+            started.wait(5)
+            request = threading.Thread(target=holder.get)
+            request.start()
+            # Let the request reach the build lock before the warm-up
+            # finishes.
+            time.sleep(0.05)
+            release.set()
+            request.join(5)
+        built.assert_called_once()
+        self.assertEqual(holder.search("kyiv")[0]["id"], 1)
+
+
+class HotelAutocompleteViewTest(ShardedTestCase):
+    URL = reverse("hotel_review_service:hotel-autocomplete")
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.get(id=1))
+        autocomplete_index.build()
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(self.URL, {"q": "a"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_returns_matching_hotels(self):
+        hotel = Hotel.objects.select_related("placement").first()
+        response = self.client.get(self.URL, {"q": hotel.name[:3]})
+        self.assertIn(
+            {"id": hotel.id, "name": hotel.name, "city": hotel.placement.city},
+            response.json()["results"],
+        )
+
+    def test_write_bumps_version_and_rebuild_sees_hotel(self):
+        version = autocomplete_index.version
+        Hotel.objects.create(
+            name="Zzyzx Lodge",
+            hotel_class=HotelClass.objects.first(),
+            placement=Placement.objects.create(
+                country="USA", city="Zzyzx", address="1 Desert Rd"
+            ),
+        )
+        # Within AUTOCOMPLETE_REFRESH_SECONDS the old index keeps serving.
+        self.assertEqual(autocomplete_index.search("zzyzx lo"), [])
+
+        autocomplete_index.build()
+        self.assertNotEqual(autocomplete_index.version, version)
+        self.assertEqual(
+            [hotel["name"] for hotel in autocomplete_index.search("zzyzx lo")],
+            ["Zzyzx Lodge"],
+        )
+
+    @override_settings(
+        AUTOCOMPLETE_MAX_AGE_SECONDS=0, AUTOCOMPLETE_REFRESH_SECONDS=0
+    )
+    def test_old_index_is_rebuilt_without_a_version_bump(self):
+        with mock.patch.object(
+            autocomplete_index, "refresh_in_background"
+        ) as refresh:
+            autocomplete_index.search("a")
+        refresh.assert_called_once()
+
+    def test_warm_up_on_first_request_only(self):
+        request_started.connect(warm_up, dispatch_uid=WARM_UP_UID)
+        with (
+            mock.patch.object(autocomplete_index, "index", None),
+            mock.patch.object(
+                autocomplete_index, "refresh_in_background"
+            ) as refresh,
+        ):
+            self.client.get(reverse("hotel_review_service:index"))
+            self.client.get(reverse("hotel_review_service:index"))
+        refresh.assert_called_once()
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service import reputation
+from hotel_review_service.backends import get_user_cache_key
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+@override_settings(
+    AUTHENTICATION_BACKENDS=[
+        "hotel_review_service.backends.CachedModelBackend"
+    ],
+    SESSION_ENGINE="django.contrib.sessions.backends.cache",
+)
+class CachedModelBackendTest(ShardedTestCase):
+    HOTEL_LIST_URL = reverse("hotel_review_service:hotel-list")
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+
+    def get_auth_queries(self) -> list[str]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.HOTEL_LIST_URL)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query["sql"] for query in context.captured_queries
+            if "django_session" in query["sql"]
+            or 'FROM "hotel_review_service_user"' in query["sql"]
+        ]
+
+    def test_warm_cache_needs_no_auth_queries(self):
+        self.assertEqual(len(self.get_auth_queries()), 1)
+        self.assertEqual(self.get_auth_queries(), [])
+
+    def test_password_change_invalidates_cached_user(self):
+        self.get_auth_queries()
+        self.user.set_password("new-password-123")
+        self.user.save()
+
+        response = self.client.get(self.HOTEL_LIST_URL)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("login"), response.url)
+
+    def test_logout_invalidates_cached_user(self):
+        self.get_auth_queries()
+        self.assertIsNotNone(cache.get(get_user_cache_key(self.user.id)))
+
+        self.client.post(reverse("logout"))
+
+        self.assertIsNone(cache.get(get_user_cache_key(self.user.id)))
+
+    def test_counter_updates_invalidate_cached_user(self):
+        key = get_user_cache_key(self.user.id)
+        for adjust in (
+            lambda: reputation.adjust({self.user.id: 5}),
+            lambda: reputation.adjust_reviews_amount(self.user.id, 1),
+        ):
+            self.get_auth_queries()
+            self.assertIsNotNone(cache.get(key))
+            adjust()
+            self.assertIsNone(cache.get(key))
+        response = self.client.get(self.HOTEL_LIST_URL)
+        self.user.refresh_from_db()
+        self.assertEqual(
+            response.wsgi_request.user.reputation, self.user.reputation
+        )
@@ -0,0 +1,88 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service.archive import archive_reviews_batch
+from hotel_review_service.reports import compare_hotels
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+class CompareHotelsTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def test_statistics(self):
+        first, second = compare_hotels(
+            [2, 1], today=datetime.date(2023, 1, 20)
+        )
+        self.assertEqual((first["id"], second["id"]), (2, 1))
+        self.assertEqual(second["reviews_amount"], 3)
+        self.assertEqual(second["average_rating"], 8.0)
+        self.assertEqual(
+            [second["ratings"][rating] for rating in (7, 8, 9)], [1, 1, 1]
+        )
+        self.assertEqual(second["recent_reviews"], {30: 3, 90: 3, 365: 3})
+
+        [hotel] = compare_hotels([1], today=datetime.date(2023, 2, 10))
+        self.assertEqual(hotel["recent_reviews"][30], 1)
+
+    def test_archived_reviews_count(self):
+        before = compare_hotels([1, 2])
+        archive_reviews_batch(datetime.date(2023, 1, 5), batch_size=100)
+        after = compare_hotels([1, 2])
+        for hotel_before, hotel_after in zip(before, after):
+            self.assertEqual(
+                hotel_before["reviews_amount"], hotel_after["reviews_amount"]
+            )
+            self.assertEqual(hotel_before["ratings"], hotel_after["ratings"])
+
+    def test_unknown_hotels_are_skipped(self):
+        self.assertEqual(
+            [hotel["id"] for hotel in compare_hotels([3, 999, 3, 1])], [3, 1]
+        )
+
+
+class HotelCompareViewTest(ShardedTestCase):
+    URL = reverse("hotel_review_service:hotel-compare")
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.get(id=1))
+
+    def count_queries(self, ids: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.URL, {"ids": ids})
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_query_count_does_not_depend_on_hotels(self):
+        self.assertEqual(
+            self.count_queries("1,2"), self.count_queries("1,2,3,4,5,6")
+        )
+
+    def test_page(self):
+        response = self.client.get(self.URL + "?ids=1&ids=2")
+        self.assertTemplateUsed(
+            response, "hotel_review_service/hotel_compare.html"
+        )
+        self.assertEqual(
+            [hotel["id"] for hotel in response.context["hotels"]], [1, 2]
+        )
+
+    def test_json(self):
+        response = self.client.get(self.URL, {"ids": "1,2", "format": "json"})
+        self.assertEqual(
+            [hotel["reviews_amount"] for hotel in response.json()["hotels"]],
+            [3, 2],
+        )
+
+    def test_invalid_selection(self):
+        for ids in ("1", "1,x", ",".join(map(str, range(1, 12)))):
+            response = self.client.get(self.URL, {"ids": ids, "format": "json"})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.URL, {"ids": "1"})
+        self.assertRedirects(
+            response, reverse("hotel_review_service:hotel-list")
+        )
@@ -0,0 +1,188 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service import events, sharding
+from hotel_review_service.models import Hotel, Review
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+class BrokerTest(SimpleTestCase):
+    async def test_fan_out_per_channel(self):
+        broker = events.Broker()
+        self.assertFalse(broker.has_listeners())
+        first = broker.subscribe("hotel:1")
+        second = broker.subscribe("hotel:1")
+        other = broker.subscribe("hotel:2")
+        self.assertTrue(broker.has_listeners())
+
+        broker.publish("hotel:1", "reaction", {"review": 5, "rating": 2})
+        await asyncio.sleep(0)
+
+        for subscription in (first, second):
+            message = subscription.queue.get_nowait()
+            self.assertIn("event: reaction\n", message)
+            self.assertIn('data: {"review": 5, "rating": 2}\n\n', message)
+        self.assertTrue(other.queue.empty())
+
+        for subscription in (first, second, other):
+            broker.unsubscribe(subscription)
+        self.assertEqual(broker.subscriber_count(), 0)
+        self.assertFalse(broker.has_listeners())
+
+    @override_settings(LIVE_EVENTS_MAX_QUEUED=2)
+    async def test_slow_subscriber_is_dropped(self):
+        broker = events.Broker()
+        subscription = broker.subscribe("hotel:1")
+        for rating in range(3):
+            broker.deliver("hotel:1", "reaction", {"rating": rating})
+        await asyncio.sleep(0)
+
+        self.assertIsNotNone(subscription.queue.get_nowait())
+        self.assertIsNone(subscription.queue.get_nowait())
+
+    async def test_many_idle_subscribers(self):
+        broker = events.Broker()
+        subscriptions = [broker.subscribe("hotel:1") for _ in range(5000)]
+        broker.deliver("hotel:1", "review", {"id": 1})
+        await asyncio.sleep(0)
+        self.assertTrue(all(s.queue.qsize() == 1 for s in subscriptions))
+
+
+class StreamTest(SimpleTestCase):
+    async def test_disconnect_unsubscribes(self):
+        async def consume():
+            async for _ in events.stream("test"):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        self.assertEqual(events.broker.subscriber_count("test"), 1)
+
+        # The ASGI handler cancels the response task when the client goes.
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(events.broker.subscriber_count("test"), 0)
+
+    @override_settings(LIVE_EVENTS_HEARTBEAT_SECONDS=0)
+    async def test_heartbeat(self):
+        content = events.stream("test")
+        self.assertEqual(await anext(content), "retry: 5000\n\n")
+        self.assertEqual(await anext(content), ": keep-alive\n\n")
+        await content.aclose()
+
+
+class HotelEventsViewTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.hotel = Hotel.objects.first()
+        self.url = reverse(
+            "hotel_review_service:hotel-events", args=[self.hotel.id]
+        )
+
+    async def test_streams_published_events(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        content = aiter(response.streaming_content)
+        self.assertEqual(await anext(content), b"retry: 5000\n\n")
+        self.assertEqual(
+            events.broker.subscriber_count(events.hotel_channel(self.hotel.id)),
+            1,
+        )
+
+        events.broker.publish(
+            events.hotel_channel(self.hotel.id), "review", {"id": 1}
+        )
+        message = (await anext(content)).decode()
+        self.assertIn("event: review\n", message)
+        await content.aclose()
+
+    async def test_login_required(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_wsgi_request_is_told_not_to_reconnect(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+
+
+@mock.patch.object(events.broker, "deliver")
+class PublishEventsTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+        self.review = sharding.scatter(
+            Review.objects.exclude(author=self.user)
+        )[0]
+        self.channel = events.hotel_channel(self.review.hotel_id)
+        # Nobody is subscribed here; pretend a client elsewhere is.
+        listeners = mock.patch.object(
+            events.broker, "has_listeners", return_value=True
+        )
+        self.has_listeners = listeners.start()
+        self.addCleanup(listeners.stop)
+
+    def test_new_review(self, deliver):
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(
+                author=self.user, hotel_id=self.review.hotel_id,
+                caption="Live", comment="Pushed", hotel_rating=7,
+            )
+        channel, event, data = deliver.call_args.args
+        self.assertEqual((channel, event), (self.channel, "review"))
+        self.assertEqual(data["id"], review.id)
+
+    def test_reaction_from_form(self, deliver):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("hotel_review_service:review-rate",
+                        args=[self.review.id]),
+                {"reaction": "like"},
+                HTTP_REFERER="/",
+            )
+        channel, event, data = deliver.call_args.args
+        self.assertEqual((channel, event), (self.channel, "reaction"))
+        self.assertEqual(data["review"], self.review.id)
+
+    def test_reaction_ratings_need_a_listener(self, deliver):
+        self.has_listeners.return_value = False
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(
+                reverse("hotel_review_service:review-rate",
+                        args=[self.review.id]),
+                {"reaction": "like"},
+                HTTP_REFERER="/",
+            )
+        with CaptureQueriesContext(
+            connections[self.review._state.db]
+        ) as context:
+            for callback in callbacks:
+                callback()
+        self.assertEqual(context.captured_queries, [])
+        deliver.assert_not_called()
+
+    def test_reactions_from_batch(self, deliver):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("hotel_review_service:review-rate-batch"),
+                json.dumps({"reactions": [
+                    {"review": self.review.id, "reaction": "dislike"},
+                ]}),
+                content_type="application/json",
+            )
+        deliver.assert_called_once()
+        channel, event, data = deliver.call_args.args
+        self.assertEqual(data["review"], self.review.id)
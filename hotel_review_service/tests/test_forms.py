@@ -1,4 +1,3 @@
-from django.test import TestCase
 from hotel_review_service.models import (
     Hotel,
     HotelClass,
@@ -11,9 +10,10 @@ from hotel_review_service.forms import (
     ReviewSearchForm,
     UserSearchForm
 )
+from hotel_review_service.tests.sharded import ShardedTestCase
 
 
-class FormsTestCase(TestCase):
+class FormsTestCase(ShardedTestCase):
     fixtures = ["initial_data.json"]
 
     def test_hotel_form_valid_data(self):
@@ -50,6 +50,19 @@ class FormsTestCase(TestCase):
         self.assertIn("city", form.errors)
         self.assertIn("address", form.errors)
 
+    def test_hotel_form_needs_both_coordinates(self):
+        form_data = {
+            "name": "Test Hotel",
+            "hotel_class": HotelClass.objects.first().id,
+            "country": "Ukraine",
+            "city": "Kyiv",
+            "address": "1234 Khreshchatyk St",
+            "latitude": 50.45,
+        }
+        self.assertFalse(HotelForm(data=form_data).is_valid())
+        form_data["longitude"] = 30.52
+        self.assertTrue(HotelForm(data=form_data).is_valid())
+
     def test_hotel_search_form_valid_data(self):
         form_data = {"search": "Kyiv"}
         form = HotelSearchForm(data=form_data)
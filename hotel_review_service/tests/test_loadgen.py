@@ -0,0 +1,67 @@
+import asyncio
+
+from django.test import LiveServerTestCase
+from django.urls import reverse
+
+from hotel_review_service.loadgen import (
+    LoadGenerator,
+    PlannedRequest,
+    SyntheticMix,
+    mint_sessions,
+    parse_access_log,
+    url_name
+)
+from hotel_review_service import sharding
+from hotel_review_service.tests.sharded import ShardedTestCase, shard_fixtures
+
+
+class AccessLogTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def test_parse_combined_log(self):
+        lines = [
+            '127.0.0.1 - - [19/Oct/2026:10:00:00 +0000] '
+            '"GET /hotels/?search=Kyiv HTTP/1.1" 200 5123 "-" "curl/8"',
+            '127.0.0.1 - - [19/Oct/2026:10:00:01 +0000] '
+            '"POST /reviews/3/rate HTTP/1.1" 302 0 "-" "curl/8"',
+            "garbage",
+        ]
+        planned = list(parse_access_log(lines))
+        self.assertEqual(
+            [url_name(request.path) for request in planned],
+            ["hotel-list", "review-rate"],
+        )
+        self.assertIn(b"reaction=", planned[1].body)
+
+    def test_synthetic_mix_resolves_to_weighted_url_names(self):
+        mix = SyntheticMix({"hotel-detail": 1, "review-rate": 1})
+        names = {url_name(request.path) for _, request in zip(range(50), mix)}
+        self.assertEqual(names, {"hotel-detail", "review-rate"})
+
+
+class LoadGeneratorTest(LiveServerTestCase):
+    databases = "__all__"
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        super().setUp()
+        if sharding.is_enabled():
+            shard_fixtures()
+
+    def test_reports_per_url_name(self):
+        requests = [
+            PlannedRequest("GET", reverse("hotel_review_service:hotel-list")),
+            PlannedRequest("GET", "/hotels/1/"),
+            PlannedRequest("GET", "/hotels/999999/"),
+        ] * 2
+        generator = LoadGenerator(
+            self.live_server_url, requests, mint_sessions(2), clients=2
+        )
+        asyncio.run(generator.run())
+
+        report = {row["url_name"]: row for row in generator.report()}
+        self.assertEqual(report["hotel-list"]["requests"], 2)
+        self.assertEqual(report["hotel-list"]["error_rate"], 0)
+        self.assertEqual(report["hotel-detail"]["requests"], 4)
+        self.assertEqual(report["hotel-detail"]["error_rate"], 0.5)
+        self.assertIsNotNone(report["hotel-detail"]["p99"])
@@ -1,26 +1,34 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
 
-from hotel_review_service.models import Review
-from hotel_review_service.utils import get_reviews_with_calculated_fields
+from hotel_review_service import minhash, sharding
+from hotel_review_service.models import EXCERPT_LENGTH, Review, make_excerpt
+from hotel_review_service.tests.sharded import ShardedTestCase
+from hotel_review_service.utils import (
+    get_reviews_with_calculated_fields,
+    find_near_duplicates
+)
 
 
-class ReviewTests(TestCase):
+class ReviewTests(ShardedTestCase):
     fixtures = ["initial_data.json"]
 
     def test_review_review_rating_without_calculated_fields(self):
-        review = Review.objects.get(id=1)
+        review = Review.objects.using(sharding.shard_for_review(1)).get(id=1)
         self.assertEqual(review.review_rating,
                          0,
                          "the review should have review rating zero")
 
     def test_review_review_rating_with_calculated_fields(self):
-        review = get_reviews_with_calculated_fields(Review.objects).get(id=1)
+        review = get_reviews_with_calculated_fields(
+            Review.objects.using(sharding.shard_for_review(1))
+        ).get(id=1)
         self.assertEqual(review.review_rating, 4)
         self.assertEqual(review.like_amount, 4)
         self.assertEqual(review.dislike_amount, 0)
 
-class UserTest(TestCase):
+class UserTest(ShardedTestCase):
     fixtures = ["initial_data.json"]
 
     def test_user_without_likes(self):
@@ -31,4 +39,95 @@ class UserTest(TestCase):
         user = get_user_model().objects.get(id=5)
         review_ids_should_be_liked = [1, 3]
         for review_id in review_ids_should_be_liked:
-            self.assertIn(Review.objects.get(id=review_id), user.liked)
+            review = Review.objects.using(
+                sharding.shard_for_review(review_id)
+            ).get(id=review_id)
+            self.assertIn(review, user.liked)
+
+
+class ReviewMinHashTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def create_review(self, comment: str, hotel_id: int = 1) -> Review:
+        return Review.objects.create(
+            author_id=1,
+            hotel_id=hotel_id,
+            caption="Caption",
+            comment=comment,
+            hotel_rating=5,
+        )
+
+    def test_signature_computed_on_save(self):
+        review = self.create_review("Clean rooms and a friendly staff.")
+        self.assertIsNotNone(review.signature)
+        self.assertEqual(review.lsh_buckets.count(), minhash.BANDS)
+
+    def test_signature_kept_when_comment_is_unchanged(self):
+        review = self.create_review("Clean rooms and a friendly staff.")
+        signature = review.minhash
+        reviews = Review.objects.using(review._state.db)
+        with (
+            mock.patch.object(
+                minhash, "signature", wraps=minhash.signature
+            ) as computed,
+            mock.patch(
+                "hotel_review_service.signals.index_review_buckets"
+            ) as indexed,
+        ):
+            review.hotel_rating = 9
+            review.save()
+            reviews.get(id=review.id).save(update_fields=["hotel_rating"])
+            reviews.defer("comment").get(id=review.id).save()
+            computed.assert_not_called()
+            indexed.assert_not_called()
+        with mock.patch.object(
+            minhash, "signature", wraps=minhash.signature
+        ) as computed:
+            review.comment = "Noisy street, tiny bathroom, never again."
+            review.save(update_fields=["comment"])
+            computed.assert_called_once()
+        review = reviews.get(id=review.id)
+        self.assertNotEqual(review.minhash, signature)
+        self.assertEqual(review.word_count, 6)
+        self.assertEqual(review.lsh_buckets.count(), minhash.BANDS)
+
+    def test_near_duplicate_found(self):
+        text = ("The breakfast was amazing, the rooms were spotless "
+                "and the staff went out of their way to help us.")
+        original = self.create_review(text)
+        copy = self.create_review(text + "!", hotel_id=2)
+        other = self.create_review("Noisy street, tiny bathroom, never again.")
+
+        # With REVIEW_SHARDS the search covers one shard, see sharding.py.
+        reviews = Review.objects.using(original._state.db)
+        duplicates = find_near_duplicates(copy, reviews)
+
+        self.assertEqual([review for review, _ in duplicates], [original])
+        self.assertEqual(find_near_duplicates(other, reviews), [])
+
+
+class ReviewExcerptTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def test_short_comment_is_its_own_excerpt(self):
+        self.assertEqual(make_excerpt("  Clean\n rooms. "), "Clean rooms.")
+
+    def test_long_comment_is_cut_at_a_word(self):
+        excerpt = make_excerpt("word " * 100)
+        self.assertLessEqual(len(excerpt), EXCERPT_LENGTH)
+        self.assertTrue(excerpt.endswith("word…"))
+
+    def test_excerpt_and_word_count_kept_on_save(self):
+        review = Review.objects.using(sharding.shard_for_review(1)).get(id=1)
+        review.comment = "Quiet " * 60
+        review.save()
+        review.refresh_from_db()
+        self.assertEqual(review.word_count, 60)
+        self.assertTrue(review.is_excerpt_truncated)
+        self.assertEqual(review.excerpt, make_excerpt(review.comment))
+
+    def test_short_comment_ending_with_ellipsis_is_not_truncated(self):
+        review = Review(comment="Nice, but…", caption="Ellipsis")
+        review.excerpt = make_excerpt(review.comment)
+        review.word_count = len(review.comment.split())
+        self.assertFalse(review.is_excerpt_truncated)
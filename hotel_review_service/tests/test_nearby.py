@@ -0,0 +1,181 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from hotel_review_service import geohash
+from hotel_review_service.models import Hotel, HotelClass, Placement
+from hotel_review_service.nearby import (
+    MAX_SEARCH_RADIUS_KM,
+    nearby_hotels,
+    prefix_ranges
+)
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+class GeohashTest(TestCase):
+    def test_encode(self):
+        self.assertEqual(
+            geohash.encode(57.64911, 10.40744, 11), "u4pruydqqvj"
+        )
+        self.assertEqual(geohash.encode(-90, -180, 3), "000")
+
+    def test_prefix_ranges_merge_adjacent_cells(self):
+        self.assertEqual(
+            prefix_ranges(["u4p", "u4q", "u4r", "u4t"]),
+            [("u4p", "u4r~"), ("u4t", "u4t~")],
+        )
+
+    def test_covering_prefixes_contain_every_point_in_radius(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            lat, lon = rng.uniform(-80, 80), rng.uniform(-180, 180)
+            radius = rng.choice([1, 25, 400])
+            prefixes = geohash.covering_prefixes(lat, lon, radius, 32)
+            min_lat, max_lat, min_lon, max_lon = geohash.bounding_box(
+                lat, lon, radius
+            )
+            for _ in range(20):
+                other_lat = rng.uniform(min_lat, max_lat)
+                other_lon = (rng.uniform(min_lon, max_lon) + 180) % 360 - 180
+                if geohash.distance_km(lat, lon, other_lat, other_lon) > radius:
+                    continue
+                code = geohash.encode(other_lat, other_lon)
+                self.assertTrue(
+                    any(code.startswith(prefix) for prefix in prefixes),
+                    (lat, lon, radius, other_lat, other_lon),
+                )
+
+
+class NearbyHotelsTest(ShardedTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(2)
+        hotel_class = HotelClass.objects.create(name="Nearby")
+        cls.points = {}
+        for i in range(300):
+            # Dense around Kyiv, plus some across the date line.
+            if i % 3:
+                lat = 50.45 + rng.uniform(-1, 1)
+                lon = 30.52 + rng.uniform(-1, 1)
+            else:
+                lat = rng.uniform(-60, 60)
+                lon = rng.choice([-1, 1]) * rng.uniform(170, 180)
+            hotel = Hotel.objects.create(
+                name=f"Nearby {i}",
+                hotel_class=hotel_class,
+                placement=Placement.objects.create(
+                    country="Ukraine", city="Kyiv", address=str(i),
+                    latitude=lat, longitude=lon,
+                ),
+            )
+            cls.points[hotel.id] = (lat, lon)
+
+    def brute_force(self, lat, lon, radius_km=None, limit=10):
+        distances = sorted(
+            (geohash.distance_km(lat, lon, *point), hotel_id)
+            for hotel_id, point in self.points.items()
+        )
+        return [
+            hotel_id for distance, hotel_id in distances
+            if radius_km is None or distance <= radius_km
+        ][:limit]
+
+    def test_geohash_is_stored(self):
+        placement = Placement.objects.filter(latitude__isnull=False).first()
+        self.assertEqual(
+            placement.geohash,
+            geohash.encode(placement.latitude, placement.longitude),
+        )
+
+    def test_radius_search_matches_brute_force(self):
+        for lat, lon, radius in (
+            (50.45, 30.52, 15), (50.0, 31.0, 60), (0, 179.9, 800),
+        ):
+            results = nearby_hotels(lat, lon, radius_km=radius, limit=100)
+            self.assertEqual(
+                [result.hotel.id for result in results],
+                self.brute_force(lat, lon, radius, limit=100),
+            )
+            self.assertTrue(all(r.distance_km <= radius for r in results))
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in ((50.45, 30.52), (10, -179.95), (-70, 0)):
+            results = nearby_hotels(lat, lon, limit=7)
+            self.assertEqual(
+                [result.hotel.id for result in results],
+                self.brute_force(lat, lon, limit=7),
+            )
+
+    def test_placements_without_coordinates_are_skipped(self):
+        hotel = Hotel.objects.create(
+            name="Nowhere",
+            hotel_class=HotelClass.objects.first(),
+            placement=Placement.objects.create(
+                country="Ukraine", city="Kyiv", address="Unknown"
+            ),
+        )
+        results = nearby_hotels(50.45, 30.52, limit=100)
+        self.assertNotIn(hotel, [result.hotel for result in results])
+
+    def test_placements_without_hotels_are_skipped(self):
+        nearest = self.brute_force(50.45, 30.52, limit=4)
+        Hotel.objects.filter(id__in=nearest[:2]).delete()
+        results = nearby_hotels(50.45, 30.52, limit=2)
+        self.assertEqual(
+            [result.hotel.id for result in results], nearest[2:]
+        )
+
+
+class HotelNearbyViewTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.get(id=1))
+        self.url = reverse("hotel_review_service:hotel-nearby")
+        self.hotel = Hotel.objects.get(id=1)
+        self.hotel.placement.latitude = 50.45
+        self.hotel.placement.longitude = 30.52
+        self.hotel.placement.save()
+
+    def test_form_page(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context.get("results"))
+
+    def test_results_page(self):
+        response = self.client.get(
+            self.url, {"latitude": 50.4, "longitude": 30.5, "radius": 10}
+        )
+        self.assertEqual(
+            [result.hotel for result in response.context["results"]],
+            [self.hotel],
+        )
+        self.assertContains(response, self.hotel.name)
+
+    def test_json(self):
+        response = self.client.get(
+            self.url, {"latitude": 50.45, "longitude": 30.52, "format": "json"}
+        )
+        [hotel] = response.json()["hotels"]
+        self.assertEqual(hotel["id"], self.hotel.id)
+        self.assertEqual(hotel["distance_km"], 0)
+        self.assertEqual(hotel["latitude"], 50.45)
+
+    def test_json_errors(self):
+        response = self.client.get(
+            self.url, {"latitude": 91, "format": "json"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(response.json()["errors"]), {"latitude", "longitude"}
+        )
+
+    def test_radius_is_capped(self):
+        response = self.client.get(self.url, {
+            "latitude": 50.45, "longitude": 30.52,
+            "radius": MAX_SEARCH_RADIUS_KM + 1, "format": "json",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["errors"]), {"radius"})
@@ -0,0 +1,139 @@
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service import sharding
+from hotel_review_service.archive import archive_reviews_batch
+from hotel_review_service.models import (
+    Review,
+    TableRowCount,
+    UserReviewReaction
+)
+from hotel_review_service.pagination import (
+    EstimatedCountPaginator,
+    estimated_count,
+    get_databases,
+    refresh_row_counts
+)
+from hotel_review_service.tests.sharded import (
+    ShardedTestCase,
+    single_database
+)
+
+
+def count_rows(model) -> int:
+    return sum(
+        model.objects.using(database).count()
+        for database in get_databases(model)
+    )
+
+
+class TableRowCountTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        refresh_row_counts()
+
+    def assertCountsMatch(self):
+        for model in (Review, UserReviewReaction):
+            self.assertEqual(estimated_count(model), count_rows(model))
+
+    def test_unknown_table_has_no_estimate(self):
+        TableRowCount.objects.all().delete()
+        self.assertIsNone(estimated_count(Review))
+
+    def test_counts_follow_creates_and_deletes(self):
+        review = Review.objects.create(
+            author=self.user, hotel_id=1, caption="Counted",
+            comment="One more", hotel_rating=8,
+        )
+        self.assertCountsMatch()
+        review.delete()
+        self.assertCountsMatch()
+
+    def test_counts_follow_batch_reactions(self):
+        self.client.force_login(self.user)
+        review_ids = [
+            review.id for review in
+            sharding.scatter(Review.objects.exclude(author=self.user))
+        ]
+        self.client.post(
+            reverse("hotel_review_service:review-rate-batch"),
+            json.dumps({"reactions": [
+                {"review": review_id, "reaction": "like"}
+                for review_id in review_ids
+            ]}),
+            content_type="application/json",
+        )
+        self.assertCountsMatch()
+
+    @single_database
+    def test_counts_follow_archival(self):
+        archive_reviews_batch(datetime.date(2023, 1, 5), batch_size=100)
+        self.assertCountsMatch()
+
+
+class EstimatedCountPaginatorTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        refresh_row_counts()
+
+    def count_queries(self, paginator: EstimatedCountPaginator) -> list[str]:
+        with CaptureQueriesContext(connection) as context:
+            paginator.count
+        return [
+            query["sql"] for query in context.captured_queries
+            if "COUNT(*)" in query["sql"]
+        ]
+
+    def test_small_table_counts_exactly(self):
+        paginator = EstimatedCountPaginator(Review.objects.all(), 5)
+        self.assertEqual(len(self.count_queries(paginator)), 1)
+        self.assertFalse(paginator.is_estimated)
+
+    @override_settings(PAGINATOR_ESTIMATE_THRESHOLD=1)
+    def test_large_table_uses_estimate(self):
+        TableRowCount.objects.filter(
+            model="hotel_review_service.review"
+        ).update(rows=5_000_000)
+        paginator = EstimatedCountPaginator(Review.objects.all(), 5)
+        self.assertEqual(self.count_queries(paginator), [])
+        self.assertTrue(paginator.is_estimated)
+        self.assertEqual(paginator.num_pages, 1_000_000)
+
+    @override_settings(PAGINATOR_ESTIMATE_THRESHOLD=1)
+    def test_filtered_queryset_counts_exactly(self):
+        paginator = EstimatedCountPaginator(
+            Review.objects.filter(hotel_rating__gte=5), 5
+        )
+        self.assertEqual(
+            paginator.count, Review.objects.filter(hotel_rating__gte=5).count()
+        )
+        self.assertFalse(paginator.is_estimated)
+
+
+@override_settings(PAGINATOR_ESTIMATE_THRESHOLD=1)
+class EstimatedCountPagesTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        refresh_row_counts()
+        self.client.force_login(get_user_model().objects.get(id=1))
+
+    def test_review_list_shows_approximate_pages(self):
+        response = self.client.get(reverse("hotel_review_service:review-list"))
+        self.assertTrue(response.context["paginator"].is_estimated)
+        self.assertContains(response, "/ ~")
+
+    def test_admin_changelist_shows_approximate_total(self):
+        response = self.client.get(
+            reverse("admin:hotel_review_service_review_changelist")
+        )
+        self.assertContains(response, f"~{count_rows(Review)} reviews")
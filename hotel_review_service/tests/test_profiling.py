@@ -0,0 +1,63 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+class ProfilingMiddlewareTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.settings = override_settings(PROFILING_DIR=directory.name)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+        self.url = reverse("hotel_review_service:hotel-detail", args=[1])
+
+    def profiles(self) -> list[Path]:
+        return sorted(self.directory.glob("*/*.prof"))
+
+    def test_staff_header_profiles_request(self):
+        self.client.force_login(get_user_model().objects.get(id=1))
+        response = self.client.get(self.url, HTTP_X_PROFILE="1")
+
+        profiles = self.profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(
+            profiles[0].parent.name, "hotel_review_service.hotel-detail"
+        )
+        self.assertEqual(
+            response["X-Profile"],
+            f"{profiles[0].parent.name}/{profiles[0].name}",
+        )
+
+    def test_non_staff_flag_is_ignored(self):
+        self.client.force_login(get_user_model().objects.get(id=2))
+        response = self.client.get(self.url, {"profile": "1"})
+        self.assertNotIn("X-Profile", response)
+        self.assertEqual(self.profiles(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_merged_per_view(self):
+        self.client.force_login(get_user_model().objects.get(id=2))
+        for _ in range(2):
+            self.client.get(self.url)
+        self.client.get(reverse("hotel_review_service:hotel-list"))
+
+        out = StringIO()
+        call_command(
+            "merge_profiles", dir=str(self.directory),
+            view=["hotel_review_service.hotel-detail"], top=5, stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn("hotel_review_service.hotel-detail: 2 requests", output)
+        self.assertNotIn("hotel-list", output)
+        self.assertIn("cumulative", output)
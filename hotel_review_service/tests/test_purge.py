@@ -0,0 +1,293 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service import (
+    purge,
+    reputation,
+    rollups,
+    sharding,
+    utils
+)
+from hotel_review_service.archive import archive_reviews_batch
+from hotel_review_service.models import (
+    ArchivedReview,
+    ArchivedUserReviewReaction,
+    Hotel,
+    HotelMonthlyRating,
+    HotelRollup,
+    Review,
+    UserReviewReaction
+)
+from hotel_review_service.pagination import (
+    estimated_count,
+    refresh_row_counts
+)
+from hotel_review_service.tests.sharded import (
+    ShardedTestCase,
+    single_database
+)
+
+
+class PurgeTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        # The rollback brings marked rows back, but not the cached ids.
+        self.addCleanup(utils.invalidate_deleted_ids)
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+        call_command("rebuild_rollups", stdout=StringIO())
+        rollups.rebuild_monthly_ratings()
+        refresh_row_counts()
+        self.hotel = Hotel.objects.get(id=1)
+        if not sharding.is_enabled():
+            # Archive part of the hotel's reviews, so both kinds are purged.
+            archive_reviews_batch(datetime.date(2023, 1, 5), batch_size=100)
+
+    def counters(self) -> tuple:
+        return (
+            set(
+                HotelRollup.objects.exclude(
+                    hotels_amount=0, reviews_amount=0, rating_sum=0
+                ).values_list(
+                    "hotel_class_id", "country", "city",
+                    "hotels_amount", "reviews_amount", "rating_sum",
+                )
+            ),
+            set(
+                HotelMonthlyRating.objects.exclude(reviews_amount=0)
+                .values_list("hotel_id", "month", "reviews_amount",
+                             "rating_sum")
+            ),
+            list(
+                get_user_model().all_objects.order_by("id")
+                .values_list("id", "reviews_amount", "reputation")
+            ),
+            set(
+                Hotel.all_objects.values_list(
+                    "id", "archived_reviews_amount", "archived_rating_sum"
+                )
+            ),
+            [
+                estimated_count(model)
+                for model in (Hotel, Review, UserReviewReaction)
+            ],
+        )
+
+    def assertCountersConsistent(self):
+        incremental = self.counters()
+        rollups.rebuild()
+        rollups.rebuild_monthly_ratings()
+        reputation.rebuild()
+        refresh_row_counts()
+        self.assertEqual(incremental, self.counters())
+
+    def test_delete_view_only_marks_the_hotel(self):
+        reviews = self.hotel.reviews.count()
+        response = self.client.post(
+            reverse("hotel_review_service:hotel-delete", args=[1])
+        )
+        self.assertRedirects(
+            response, reverse("hotel_review_service:hotel-list")
+        )
+        self.assertFalse(Hotel.objects.filter(id=1).exists())
+        self.assertIsNotNone(Hotel.all_objects.get(id=1).deleted_at)
+        self.assertEqual(self.hotel.reviews.count(), reviews)
+        self.assertCountersConsistent()
+
+    def test_marked_hotel_is_hidden(self):
+        purge.mark_hotel_deleted(self.hotel)
+        response = self.client.get(reverse("hotel_review_service:hotel-list"))
+        self.assertNotIn(self.hotel, response.context["hotel_list"])
+        response = self.client.get(
+            reverse("hotel_review_service:hotel-detail", args=[1])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(
+            HotelRollup.objects.filter(
+                city=self.hotel.placement.city, hotels_amount__gt=0
+            ).exists()
+        )
+
+    def test_reviews_of_marked_rows_are_hidden(self):
+        author = sharding.scatter(
+            Review.objects.exclude(hotel_id=1).exclude(author_id=1)
+        )[0].author
+        purge.mark_hotel_deleted(self.hotel)
+        purge.mark_user_deleted(author)
+        visible = sharding.scatter(
+            Review.objects.exclude(hotel_id=1).exclude(author_id=author.id)
+        )
+
+        response = self.client.get(
+            reverse("hotel_review_service:review-list")
+        )
+        self.assertEqual(response.context["paginator"].count, visible.count())
+        self.assertEqual(
+            list(response.context["review_list"]), list(visible[:5])
+        )
+        response = self.client.get(reverse("hotel_review_service:index"))
+        self.assertEqual(
+            response.context["num_reviews"],
+            visible.count() + ArchivedReview.objects.exclude(hotel_id=1)
+            .exclude(author_id=author.id).count(),
+        )
+
+        api_list = reverse("hotel_review_service:api-review-list")
+        self.assertEqual(
+            self.client.get(api_list, {"hotel": 1}).json()["results"], []
+        )
+        data = self.client.get(
+            api_list, {"fields": "hotel,author", "page_size": 1000}
+        ).json()
+        self.assertEqual(data["count"], visible.count())
+        self.assertNotIn(author.id, [row[1] for row in data["results"]])
+
+    @single_database
+    def test_reviews_of_marked_rows_are_joined_out(self):
+        purge.mark_hotel_deleted(self.hotel)
+        self.assertIsNone(utils.get_deleted_ids())
+        with CaptureQueriesContext(connections["default"]) as context:
+            self.client.get(reverse("hotel_review_service:review-list"))
+        self.assertFalse(
+            any("IS NOT NULL" in query["sql"]
+                for query in context.captured_queries)
+        )
+
+    def test_purge_hotel_in_batches(self):
+        purge.mark_hotel_deleted(self.hotel)
+        batches = []
+        for deleted in purge.purge_hotel(self.hotel, batch_size=1):
+            batches.append(deleted)
+            self.assertCountersConsistent()
+        self.assertTrue(all(
+            amount == 1 for batch in batches for amount in batch.values()
+        ))
+        self.assertEqual(batches[-1], {"hotel_review_service.Hotel": 1})
+        self.assertFalse(Hotel.all_objects.filter(id=1).exists())
+        shard = sharding.shard_for_hotel(1)
+        self.assertFalse(
+            Review.objects.using(shard).filter(hotel_id=1).exists()
+        )
+        self.assertFalse(ArchivedReview.objects.filter(hotel_id=1).exists())
+        self.assertFalse(
+            UserReviewReaction.objects.using(shard)
+            .filter(review__hotel_id=1).exists()
+        )
+
+    def test_reviews_are_deleted_by_id_batches(self):
+        reviews = self.hotel.reviews.count()
+        purge.mark_hotel_deleted(self.hotel)
+        connection = connections[sharding.shard_for_hotel(self.hotel.id)]
+        with CaptureQueriesContext(connection) as context:
+            list(purge.purge_hotel(self.hotel, batch_size=2))
+        deletes = [
+            query["sql"] for query in context.captured_queries
+            if query["sql"].startswith(
+                'DELETE FROM "hotel_review_service_review" WHERE "id" IN'
+            )
+        ]
+        self.assertEqual(len(deletes), -(-reviews // 2))
+
+    def test_purge_user(self):
+        user = self.hotel.reviews.first().author
+        user_id = user.id
+        purge.mark_user_deleted(user)
+        self.assertFalse(get_user_model().objects.filter(id=user_id).exists())
+        for _ in purge.purge_user(user, batch_size=2):
+            self.assertCountersConsistent()
+        self.assertFalse(
+            get_user_model().all_objects.filter(id=user_id).exists()
+        )
+        self.assertEqual(
+            sharding.scatter(Review.objects.filter(author_id=user_id)).count(),
+            0,
+        )
+        self.assertFalse(
+            ArchivedReview.objects.filter(author_id=user_id).exists()
+        )
+        self.assertFalse(
+            ArchivedUserReviewReaction.objects.filter(user_id=user_id).exists()
+        )
+
+    def test_review_delete_view(self):
+        review = sharding.scatter(
+            Review.objects.filter(userreviewreaction__isnull=False)
+        )[0]
+        self.client.post(
+            reverse("hotel_review_service:review-delete", args=[review.id])
+        )
+        self.assertFalse(
+            Review.objects.using(review._state.db).filter(id=review.id)
+            .exists()
+        )
+        self.assertCountersConsistent()
+
+    def test_name_of_marked_hotel_is_taken(self):
+        purge.mark_hotel_deleted(self.hotel)
+        response = self.client.post(
+            reverse("hotel_review_service:hotel-create"),
+            {
+                "name": self.hotel.name,
+                "hotel_class": self.hotel.hotel_class_id,
+                "country": "Ukraine",
+                "city": "Kyiv",
+                "address": "Street 1",
+            },
+        )
+        self.assertFormError(
+            response.context["form"], "name",
+            "A hotel with this name is being deleted, try again later.",
+        )
+
+    def test_username_of_marked_user_is_taken(self):
+        user = get_user_model().objects.get(id=2)
+        purge.mark_user_deleted(user)
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        response = self.client.post(
+            reverse("admin:hotel_review_service_user_add"),
+            {
+                "username": user.username,
+                "password1": "a-long-password-1",
+                "password2": "a-long-password-1",
+            },
+        )
+        self.assertFormError(
+            response.context["adminform"].form, "username",
+            "A user with this username is being deleted, try again later.",
+        )
+        with self.assertRaisesMessage(CommandError, "already taken"):
+            call_command(
+                "createsuperuser", username=user.username,
+                email="admin@example.com", interactive=False,
+                stdout=StringIO(),
+            )
+        self.assertFalse(
+            self.client.login(username=user.username, password="password")
+        )
+
+    def test_command(self):
+        purge.mark_hotel_deleted(self.hotel)
+        out = StringIO()
+        call_command("purge_deleted", batch_size=2, stdout=out)
+        self.assertIn("Purged 1 deleted hotels and users", out.getvalue())
+        self.assertIn(f"hotel {self.hotel.id}: ", out.getvalue())
+        self.assertFalse(Hotel.all_objects.filter(id=1).exists())
+        self.assertCountersConsistent()
+
+    def test_admin_delete_marks(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        response = self.client.post(
+            reverse("admin:hotel_review_service_hotel_delete", args=[1]),
+            {"post": "yes"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNotNone(Hotel.all_objects.get(id=1).deleted_at)
@@ -0,0 +1,59 @@
+from django.urls import reverse
+
+from hotel_review_service.tests.query_budget import QueryBudgetTestCase
+
+
+def url(name: str, *args) -> str:
+    return reverse(f"hotel_review_service:{name}", args=args)
+
+
+class ListViewBudgetTest(QueryBudgetTestCase):
+    def test_index(self):
+        self.assertQueryBudget(url("index"), max_rows=10)
+
+    def test_hotel_list(self):
+        self.assertQueryBudget(url("hotel-list"), max_rows=15)
+
+    def test_hotel_search(self):
+        self.assertQueryBudget(
+            url("hotel-list"), max_rows=15, data={"search": "hotel"}
+        )
+
+    def test_review_list(self):
+        self.assertQueryBudget(url("review-list"), max_rows=15)
+
+    def test_user_list(self):
+        self.assertQueryBudget(url("user-list"), max_rows=15)
+
+    def test_user_list_by_reputation(self):
+        self.assertQueryBudget(
+            url("user-list"), max_rows=15, data={"ordering": "reputation"}
+        )
+
+    def test_hotel_rollup_list(self):
+        self.assertQueryBudget(url("hotel-rollup-list"), max_rows=30)
+
+    def test_slow_query_list(self):
+        self.assertQueryBudget(url("slow-query-list"), max_rows=30)
+
+
+class DetailViewBudgetTest(QueryBudgetTestCase):
+    def test_hotel_detail(self):
+        hotel = self.dataset.hotels[0]
+        self.assertQueryBudget(url("hotel-detail", hotel.id), max_rows=15)
+
+    def test_review_detail(self):
+        review = self.dataset.reviews[0]
+        self.assertQueryBudget(url("review-detail", review.id), max_rows=10)
+
+    def test_user_detail(self):
+        user = self.dataset.users[1]
+        self.assertQueryBudget(url("user-detail", user.id), max_rows=15)
+
+    def test_hotel_compare(self):
+        ids = ",".join(str(hotel.id) for hotel in self.dataset.hotels[:3])
+        # Grouped by hotel and rating: at most 3 * 11 rows, however many
+        # reviews there are.
+        self.assertQueryBudget(
+            url("hotel-compare"), max_rows=40, data={"ids": ids}
+        )
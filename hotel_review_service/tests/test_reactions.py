@@ -0,0 +1,233 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from hotel_review_service import reputation, sharding
+from hotel_review_service.models import (
+    Hotel,
+    HotelClass,
+    Placement,
+    Review,
+    UserReviewReaction
+)
+from hotel_review_service.pagination import estimated_count, refresh_row_counts
+from hotel_review_service.reactions import apply_reactions, toggle_reaction
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+def count_reactions() -> int:
+    return sum(
+        UserReviewReaction.objects.using(database).count()
+        for database in sharding.review_databases()
+    )
+
+
+class ToggleReactionTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.review = sharding.scatter(
+            Review.objects.exclude(author=self.user)
+            .exclude(userreviewreaction__user=self.user)
+        )[0]
+        self.reactions = UserReviewReaction.objects.using(
+            self.review._state.db
+        )
+        refresh_row_counts()
+
+    def test_toggle_sequence(self):
+        states = [
+            toggle_reaction(self.user.id, self.review, reaction)
+            for reaction in ("L", "L", "D", "L", "D", "D")
+        ]
+        self.assertEqual(states, ["L", None, "D", "L", "D", None])
+
+        reaction = self.reactions.get(user=self.user, review=self.review)
+        self.assertIsNone(reaction.reaction)
+        self.assertEqual(reaction.previous_reaction, "D")
+        self.assertEqual(estimated_count(UserReviewReaction), count_reactions())
+
+    def test_counters_follow_toggles(self):
+        for reaction in ("L", "D", "D", "L"):
+            toggle_reaction(self.user.id, self.review, reaction)
+            stored = list(
+                get_user_model().objects.order_by("id")
+                .values_list("reputation", flat=True)
+            )
+            reputation.rebuild()
+            self.assertEqual(
+                stored,
+                list(get_user_model().objects.order_by("id")
+                     .values_list("reputation", flat=True)),
+            )
+
+    def test_single_statement_on_reaction_table(self):
+        connection = connections[self.review._state.db]
+        with CaptureQueriesContext(connection) as context:
+            toggle_reaction(self.user.id, self.review, "L")
+        reaction_queries = [
+            query["sql"] for query in context.captured_queries
+            if UserReviewReaction._meta.db_table in query["sql"]
+        ]
+        self.assertEqual(len(reaction_queries), 1)
+        self.assertIn("ON CONFLICT", reaction_queries[0])
+
+
+class ApplyReactionsTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        # On one shard: with REVIEW_SHARDS every shard gets its own upsert.
+        self.database = sharding.shard_for_hotel(1)
+        self.reviews = list(
+            Review.objects.using(self.database).exclude(author=self.user)
+            .order_by("id")[:3]
+        )
+        refresh_row_counts()
+
+    def test_repeats_toggle_in_order(self):
+        first, second, third = (review.id for review in self.reviews)
+        results = apply_reactions(self.user, [
+            (first, "like"), (second, "dislike"), (first, "like"),
+            (third, "like"), (first, "dislike"),
+        ])
+        self.assertEqual(
+            [result["reaction"] for result in results],
+            ["like", "dislike", None, "like", "dislike"],
+        )
+        stored = list(
+            get_user_model().objects.order_by("id")
+            .values_list("reputation", flat=True)
+        )
+        reputation.rebuild()
+        self.assertEqual(
+            stored,
+            list(get_user_model().objects.order_by("id")
+                 .values_list("reputation", flat=True)),
+        )
+        self.assertEqual(estimated_count(UserReviewReaction), count_reactions())
+
+    def test_one_upsert_per_round(self):
+        items = [(review.id, "like") for review in self.reviews]
+        with CaptureQueriesContext(connections[self.database]) as context:
+            apply_reactions(self.user, items + items[:1])
+        reaction_queries = [
+            query["sql"] for query in context.captured_queries
+            if UserReviewReaction._meta.db_table in query["sql"]
+        ]
+        self.assertEqual(len(reaction_queries), 2)
+        self.assertTrue(all(
+            "ON CONFLICT" in sql for sql in reaction_queries
+        ))
+
+
+class ToggleReactionStressTest(TransactionTestCase):
+    databases = "__all__"
+    THREADS = 8
+    TOGGLES = 25
+
+    def setUp(self):
+        author = get_user_model().objects.create_user("author", password="x")
+        self.review = Review.objects.create(
+            author=author,
+            hotel=Hotel.objects.create(
+                name="Stress Inn",
+                hotel_class=HotelClass.objects.create(name="Two Star"),
+                placement=Placement.objects.create(
+                    country="Ukraine", city="Lviv", address="1 Rynok Sq"
+                ),
+            ),
+            caption="Busy",
+            comment="Everyone clicks at once",
+            hotel_rating=8,
+        )
+        self.users = [
+            get_user_model().objects.create_user(f"clicker{number}")
+            for number in range(self.THREADS)
+        ]
+
+    def hammer(self, user_ids: list[int], toggle=None) -> list[int]:
+        """Toggle "like" from every thread; return toggles done per user."""
+        toggle = toggle or (
+            lambda user_id: toggle_reaction(user_id, self.review, "L")
+        )
+        done = {user_id: 0 for user_id in user_ids}
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker(user_id: int) -> None:
+            try:
+                barrier.wait()
+                for _ in range(self.TOGGLES):
+                    while True:
+                        try:
+                            toggle(user_id)
+                            break
+                        except OperationalError:
+                            # SQLite refuses a concurrent writer instead of
+                            # waiting; the failed statement changed nothing.
+                            time.sleep(0.001)
+                    with lock:
+                        done[user_id] += 1
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(user_id,))
+            for user_id in user_ids
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return done
+
+    def test_many_users_one_review(self):
+        done = self.hammer([user.id for user in self.users])
+
+        reactions = UserReviewReaction.objects.using(
+            self.review._state.db
+        ).filter(review=self.review)
+        self.assertEqual(reactions.count(), self.THREADS)
+        likes = sum(amount % 2 for amount in done.values())
+        self.assertEqual(reactions.filter(reaction="L").count(), likes)
+        self.review.author.refresh_from_db()
+        self.assertEqual(self.review.author.reputation, likes)
+
+    def test_one_user_many_threads(self):
+        user_id = self.users[0].id
+        done = self.hammer([user_id] * self.THREADS)
+
+        reaction = UserReviewReaction.objects.using(
+            self.review._state.db
+        ).get(user_id=user_id, review=self.review)
+        expected = "L" if done[user_id] % 2 else None
+        self.assertEqual(done[user_id], self.THREADS * self.TOGGLES)
+        self.assertEqual(reaction.reaction, expected)
+        self.review.author.refresh_from_db()
+        self.assertEqual(self.review.author.reputation, int(bool(expected)))
+
+    def test_one_user_many_batches(self):
+        user = self.users[0]
+        done = self.hammer(
+            [user.id] * self.THREADS,
+            lambda user_id: apply_reactions(user, [(self.review.id, "like")]),
+        )
+
+        reaction = UserReviewReaction.objects.using(
+            self.review._state.db
+        ).get(user=user, review=self.review)
+        self.assertEqual(done[user.id], self.THREADS * self.TOGGLES)
+        self.assertIsNone(reaction.reaction)
+        self.review.author.refresh_from_db()
+        self.assertEqual(self.review.author.reputation, 0)
@@ -0,0 +1,71 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from hotel_review_service.models import Hotel, Review, UserReviewReaction
+from hotel_review_service.reports import COLUMNS, iter_hotel_stats
+from hotel_review_service.tests.sharded import single_database
+
+
+@single_database
+class HotelStatsReportTest(TestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+
+    def get_stats(self) -> dict[int, dict]:
+        return {
+            row[0]: dict(zip(COLUMNS, row)) for row in iter_hotel_stats()
+        }
+
+    def test_stats_match_per_hotel_aggregates(self):
+        stats = self.get_stats()
+
+        self.assertEqual(len(stats), Hotel.objects.count())
+        for hotel in Hotel.objects.all():
+            reviews = Review.objects.filter(hotel=hotel)
+            row = stats[hotel.id]
+            self.assertEqual(row["reviews_amount"], reviews.count())
+            self.assertEqual(
+                row["likes_received"],
+                UserReviewReaction.objects.filter(
+                    review__hotel=hotel, reaction="L"
+                ).count(),
+            )
+            self.assertEqual(
+                sum(row[f"rating_{rating}"] for rating in range(11)),
+                reviews.count(),
+            )
+
+    def test_stats_unchanged_by_archival(self):
+        expected = self.get_stats()
+        call_command("archive_reviews", days=0, stdout=StringIO())
+        self.assertEqual(self.get_stats(), expected)
+
+    def test_report_queries_do_not_depend_on_hotel_amount(self):
+        with self.assertNumQueries(4):
+            list(iter_hotel_stats())
+
+    def test_csv_download(self):
+        response = self.client.get(reverse("hotel_review_service:hotel-report"))
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(
+            b"".join(response.streaming_content).decode().splitlines()
+        ))
+        self.assertEqual(tuple(rows[0]), COLUMNS)
+        self.assertEqual(len(rows), Hotel.objects.count() + 1)
+
+    def test_columnar_download(self):
+        response = self.client.get(
+            reverse("hotel_review_service:hotel-report") + "?format=columnar"
+        )
+        chunk = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(list(chunk), list(COLUMNS))
+        self.assertEqual(len(chunk["hotel_id"]), Hotel.objects.count())
@@ -0,0 +1,132 @@
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from hotel_review_service import reputation, rollups, sharding
+from hotel_review_service.archive import archive_reviews_batch
+from hotel_review_service.models import Review, UserReviewReaction
+from hotel_review_service.tests.sharded import (
+    ShardedTestCase,
+    single_database
+)
+
+
+class ReputationTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+        self.review = sharding.scatter(
+            Review.objects.exclude(author=self.user)
+        )[0]
+        self.author = self.review.author
+
+    def stored(self) -> list[tuple[int, int, int]]:
+        return list(
+            get_user_model().objects.order_by("id")
+            .values_list("id", "reviews_amount", "reputation")
+        )
+
+    def assertMatchesRebuild(self):
+        stored = self.stored()
+        reputation.rebuild()
+        self.assertEqual(stored, self.stored())
+
+    def rate(self, reaction: str) -> None:
+        self.client.post(
+            reverse("hotel_review_service:review-rate", args=[self.review.id]),
+            {"reaction": reaction},
+            HTTP_REFERER="/",
+        )
+
+    def test_fixture_counters_are_consistent(self):
+        self.assertMatchesRebuild()
+
+    def test_reaction_toggles(self):
+        UserReviewReaction.objects.using(self.review._state.db).filter(
+            user=self.user, review=self.review
+        ).delete()
+        start = get_user_model().objects.get(id=self.author.id).reputation
+
+        for reaction, expected in (
+            ("like", 1), ("like", 0), ("dislike", -1), ("like", 1)
+        ):
+            self.rate(reaction)
+            self.author.refresh_from_db()
+            self.assertEqual(self.author.reputation, start + expected)
+        self.assertMatchesRebuild()
+
+    def test_batch_reactions(self):
+        reviews = sharding.scatter(Review.objects.exclude(author=self.user))
+        self.client.post(
+            reverse("hotel_review_service:review-rate-batch"),
+            json.dumps({"reactions": [
+                {"review": review.id, "reaction": reaction}
+                for review in reviews
+                for reaction in ("dislike", "like")
+            ]}),
+            content_type="application/json",
+        )
+        self.assertMatchesRebuild()
+
+    def test_review_create_and_delete(self):
+        review = Review.objects.create(
+            author=self.user, hotel_id=1, caption="Counted",
+            comment="Once", hotel_rating=8,
+        )
+        UserReviewReaction.objects.create(
+            user=self.author, review=review, reaction="L"
+        )
+        self.assertMatchesRebuild()
+
+        review.delete()
+        self.assertMatchesRebuild()
+
+    def test_paused_reactions_are_not_counted(self):
+        stored = self.stored()
+        with rollups.paused():
+            reaction = UserReviewReaction.objects.using(
+                self.review._state.db
+            ).create(user=self.author, review=self.review, reaction="L")
+            reaction.reaction = "D"
+            reaction.save()
+            reaction.delete()
+        self.assertEqual(stored, self.stored())
+
+    @single_database
+    def test_archived_reviews_keep_counting(self):
+        stored = self.stored()
+        archive_reviews_batch(datetime.date(2023, 1, 5), batch_size=100)
+        self.assertEqual(stored, self.stored())
+        self.assertMatchesRebuild()
+
+
+class UserReputationListTest(ShardedTestCase):
+    USER_LIST_URL = reverse("hotel_review_service:user-list")
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.get(id=1))
+
+    def test_sort_by_reputation(self):
+        response = self.client.get(self.USER_LIST_URL, {"ordering": "reputation"})
+        self.assertEqual(
+            list(response.context["user_list"]),
+            list(get_user_model().objects.order_by("-reputation", "id")[:5]),
+        )
+
+    def test_search_sorted_by_reputation(self):
+        response = self.client.get(
+            self.USER_LIST_URL, {"ordering": "reputation", "search": "o"}
+        )
+        reputations = [user.reputation for user in response.context["user_list"]]
+        self.assertEqual(reputations, sorted(reputations, reverse=True))
+
+    @override_settings(TOP_REVIEWER_REPUTATION=4)
+    def test_top_reviewer_badge(self):
+        response = self.client.get(self.USER_LIST_URL, {"ordering": "reputation"})
+        self.assertContains(response, "Top reviewer", count=1)
@@ -0,0 +1,207 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service import rollups, sharding
+from hotel_review_service.models import (
+    Hotel,
+    HotelClass,
+    HotelMonthlyRating,
+    HotelRollup,
+    Placement,
+    Review
+)
+from hotel_review_service.tests.sharded import (
+    ShardedTestCase,
+    single_database
+)
+
+
+class HotelRollupTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+        call_command("rebuild_rollups", stdout=StringIO())
+
+    def snapshot(self) -> set[tuple]:
+        return set(
+            HotelRollup.objects.exclude(
+                hotels_amount=0, reviews_amount=0, rating_sum=0
+            ).values_list(
+                "hotel_class_id",
+                "country",
+                "city",
+                "hotels_amount",
+                "reviews_amount",
+                "rating_sum",
+            )
+        )
+
+    def assertRollupsConsistent(self):
+        incremental = self.snapshot()
+        rollups.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_rebuild_matches_reviews(self):
+        rollup = HotelRollup.objects.get(city="Kyiv")
+        hotel = Hotel.objects.get(placement__city="Kyiv")
+        reviews = hotel.reviews.all()
+        self.assertEqual(rollup.hotels_amount, 1)
+        self.assertEqual(rollup.reviews_amount, reviews.count())
+        self.assertEqual(
+            rollup.rating_sum, sum(r.hotel_rating for r in reviews)
+        )
+
+    def test_review_changes(self):
+        review = Review.objects.create(
+            author=self.user, hotel_id=1, caption="A", comment="B",
+            hotel_rating=3,
+        )
+        self.assertRollupsConsistent()
+        review.hotel_rating = 10
+        review.hotel_id = 2
+        review.save()
+        self.assertRollupsConsistent()
+        review.delete()
+        self.assertRollupsConsistent()
+
+    def test_hotel_changes(self):
+        hotel = Hotel.objects.create(
+            name="Hotel Rome",
+            hotel_class=HotelClass.objects.get(id=1),
+            placement=Placement.objects.create(
+                country="Italy", city="Rome", address="Via Roma 1"
+            ),
+        )
+        self.assertRollupsConsistent()
+
+        response = self.client.post(
+            reverse("hotel_review_service:hotel-update", args=[1]),
+            {
+                "name": "Hotel Kyiv",
+                "hotel_class": 2,
+                "country": "Italy",
+                "city": "Rome",
+                "address": "Via Roma 2",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Hotel.objects.get(id=1).reviews.exists())
+        self.assertRollupsConsistent()
+
+        hotel.delete()
+        Hotel.objects.get(id=1).delete()
+        self.assertRollupsConsistent()
+
+    def test_hotel_and_placement_saved_elsewhere(self):
+        hotel = Hotel.objects.select_related("placement").get(id=1)
+        hotel.placement.city = "Odesa"
+        hotel.placement.save()
+        self.assertRollupsConsistent()
+
+        hotel.hotel_class_id = 2
+        hotel.save()
+        self.assertRollupsConsistent()
+
+        hotel.placement = Placement.objects.create(
+            country="Italy", city="Rome", address="Via Roma 3"
+        )
+        hotel.save(update_fields=["placement"])
+        self.assertRollupsConsistent()
+
+    def test_admin_change_moves_hotel(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        hotel = Hotel.objects.get(id=1)
+        response = self.client.post(
+            reverse("admin:hotel_review_service_hotel_change", args=[1]),
+            {
+                "name": hotel.name,
+                "hotel_class": 2,
+                "placement": hotel.placement_id,
+                "archived_reviews_amount": hotel.archived_reviews_amount,
+                "archived_rating_sum": hotel.archived_rating_sum,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Hotel.objects.get(id=1).hotel_class_id, 2)
+        self.assertRollupsConsistent()
+
+    @single_database
+    def test_archiving_keeps_rollups(self):
+        before = self.snapshot()
+        call_command("archive_reviews", days=0, stdout=StringIO())
+        self.assertEqual(self.snapshot(), before)
+        self.assertRollupsConsistent()
+
+    def test_rollup_list_filter(self):
+        response = self.client.get(
+            reverse("hotel_review_service:hotel-rollup-list"),
+            {"hotel_class": 1, "country": "ukraine"},
+        )
+        self.assertEqual(response.status_code, 200)
+        rows = list(response.context["hotelrollup_list"])
+        self.assertEqual(
+            {row.city for row in rows},
+            set(Hotel.objects.filter(hotel_class_id=1)
+                .values_list("placement__city", flat=True)),
+        )
+        self.assertEqual(
+            response.context["totals"].hotels_amount,
+            Hotel.objects.filter(hotel_class_id=1).count(),
+        )
+
+
+class HotelMonthlyRatingTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+        call_command("rebuild_monthly_ratings", stdout=StringIO())
+
+    def snapshot(self) -> set[tuple]:
+        return set(
+            HotelMonthlyRating.objects.exclude(reviews_amount=0).values_list(
+                "hotel_id", "month", "reviews_amount", "rating_sum"
+            )
+        )
+
+    @single_database
+    def test_incremental_updates_match_rebuild(self):
+        review = Review.objects.create(
+            author=self.user, hotel_id=1, caption="A", comment="B",
+            hotel_rating=3,
+        )
+        review.hotel_rating = 7
+        review.save()
+        Review.objects.get(id=2).delete()
+        call_command("archive_reviews", days=0, stdout=StringIO())
+
+        incremental = self.snapshot()
+        rollups.rebuild_monthly_ratings()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_hotel_detail_renders_trend(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("hotel_review_service:hotel-detail", args=[1])
+            )
+        trend_queries = [
+            query for query in context.captured_queries
+            if 'FROM "hotel_review_service_hotelmonthlyrating"' in query["sql"]
+        ]
+        self.assertEqual(len(trend_queries), 1)
+        months = response.context["monthly_ratings"]
+        self.assertEqual(
+            sum(month.reviews_amount for month in months),
+            Review.objects.using(sharding.shard_for_hotel(1))
+            .filter(hotel_id=1).count(),
+        )
+        self.assertContains(response, "Rating trend")
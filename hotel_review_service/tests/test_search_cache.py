@@ -0,0 +1,101 @@
+from array import array
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service.models import Review
+from hotel_review_service.search_cache import (
+    SearchResultCache,
+    normalize_term,
+    search_cache
+)
+from hotel_review_service.tests.sharded import (
+    ShardedTestCase,
+    single_database
+)
+
+
+class SearchResultCacheTest(SimpleTestCase):
+    def test_normalize_term(self):
+        self.assertEqual(normalize_term("  Hotel   KYIV "), "hotel kyiv")
+
+    def test_lru_eviction_respects_memory_cap(self):
+        entry_size = SearchResultCache.entry_size(
+            ("hotel", 0, "a"), array("q", range(100))
+        )
+        lru = SearchResultCache(max_bytes=entry_size * 2, max_ids=1000)
+
+        lru.set(("hotel", 0, "a"), array("q", range(100)))
+        lru.set(("hotel", 0, "b"), array("q", range(100)))
+        lru.get(("hotel", 0, "a"))
+        lru.set(("hotel", 0, "c"), array("q", range(100)))
+
+        self.assertIsNotNone(lru.get(("hotel", 0, "a")))
+        self.assertIsNone(lru.get(("hotel", 0, "b")))
+        self.assertLessEqual(lru.size, lru.max_bytes)
+
+    def test_entries_expire(self):
+        lru = SearchResultCache(max_bytes=10 ** 6, max_ids=1000, timeout=0)
+        lru.set(("hotel", 0, "a"), array("q", range(10)))
+        self.assertIsNone(lru.get(("hotel", 0, "a")))
+        self.assertEqual((len(lru), lru.size), (0, 0))
+
+    def test_too_many_ids_are_not_cached(self):
+        lru = SearchResultCache(max_bytes=10 ** 6, max_ids=10)
+        lru.set(("hotel", 0, "a"), array("q", range(11)))
+        self.assertEqual(len(lru), 0)
+
+
+# Sharded review searches skip the cache.
+@single_database
+class CachedSearchViewTest(ShardedTestCase):
+    REVIEW_LIST_URL = reverse("hotel_review_service:review-list")
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        search_cache.clear()
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+
+    def search(self, term: str) -> tuple[list, list[str]]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.REVIEW_LIST_URL, {"search": term})
+        return (
+            list(response.context["review_list"]),
+            [query["sql"] for query in context.captured_queries
+             if "LIKE" in query["sql"]],
+        )
+
+    def test_repeated_search_hits_cache(self):
+        reviews, like_queries = self.search("Great")
+        self.assertEqual(len(like_queries), 1)
+
+        cached_reviews, like_queries = self.search("  great ")
+        self.assertEqual(like_queries, [])
+        self.assertEqual(cached_reviews, reviews)
+
+    def test_write_invalidates_cache(self):
+        reviews, _ = self.search("great")
+        Review.objects.create(
+            author=self.user, hotel_id=1, caption="Great again",
+            comment="Lovely", hotel_rating=9,
+        )
+        new_reviews, like_queries = self.search("great")
+        self.assertEqual(len(like_queries), 1)
+        self.assertEqual(len(new_reviews), min(len(reviews) + 1, 5))
+
+    def test_too_many_matches_fall_back_to_queryset(self):
+        reviews, _ = self.search("great")
+        self.assertGreater(len(reviews), 1)
+        search_cache.clear()
+        with mock.patch.object(search_cache, "max_ids", 1):
+            capped_reviews, like_queries = self.search("great")
+            self.assertEqual(capped_reviews, reviews)
+            self.assertEqual(len(search_cache), 0)
+            self.assertTrue(
+                all("LIMIT" in query for query in like_queries)
+            )
@@ -0,0 +1,234 @@
+import datetime
+import unittest
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service import purge, sharding, utils
+from hotel_review_service.models import (
+    Hotel,
+    HotelClass,
+    Placement,
+    Review,
+    UserReviewReaction
+)
+
+
+@override_settings(REVIEW_SHARDS=3)
+class ShardRoutingTest(SimpleTestCase):
+    def setUp(self):
+        self.router = sharding.ReviewShardRouter()
+
+    def test_hotels_map_to_shards(self):
+        self.assertEqual(
+            sharding.review_databases(), ["shard_0", "shard_1", "shard_2"]
+        )
+        self.assertEqual(sharding.shard_for_hotel(7), "shard_1")
+        self.assertEqual(sharding.shard_for_review(7), "shard_1")
+        self.assertEqual(
+            sharding.group_by_shard([3, 4, 6]),
+            {"shard_0": [3, 6], "shard_1": [4]},
+        )
+
+    def test_router(self):
+        self.assertEqual(self.router.db_for_read(Hotel), "default")
+        self.assertEqual(
+            self.router.db_for_write(Review, instance=Review(hotel_id=5)),
+            "shard_2",
+        )
+        self.assertEqual(
+            self.router.db_for_read(Review, instance=Hotel(id=4)), "shard_1"
+        )
+        self.assertEqual(
+            self.router.db_for_read(
+                UserReviewReaction, instance=UserReviewReaction(review_id=9)
+            ),
+            "shard_0",
+        )
+        self.assertIsNone(
+            self.router.db_for_read(Review, instance=get_user_model()(id=1))
+        )
+
+    @override_settings(REVIEW_SHARDS=0)
+    def test_disabled(self):
+        self.assertEqual(sharding.review_databases(), ["default"])
+        self.assertEqual(sharding.shard_for_hotel(7), "default")
+
+
+@unittest.skipUnless(
+    settings.REVIEW_SHARDS >= 2,
+    "run with REVIEW_SHARDS=2 or more to test several databases",
+)
+class ShardedReviewsTest(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.addCleanup(utils.invalidate_deleted_ids)
+        hotel_class = HotelClass.objects.create(name="Sharded")
+        self.hotels = [
+            Hotel.objects.create(
+                name=f"Hotel {i}",
+                hotel_class=hotel_class,
+                placement=Placement.objects.create(
+                    country="Ukraine", city="Kyiv", address=str(i)
+                ),
+            )
+            for i in range(settings.REVIEW_SHARDS)
+        ]
+        self.author, self.reader = (
+            get_user_model().objects.create_user(username=name)
+            for name in ("author", "reader")
+        )
+        self.client.force_login(self.reader)
+        self.reviews = []
+        for day, hotel in enumerate(self.hotels, start=1):
+            review = Review.objects.create(
+                author=self.author, hotel=hotel, caption=f"Day {day}",
+                comment=f"Stayed on day {day} of the trip", hotel_rating=7,
+            )
+            Review.objects.using(review._state.db).filter(
+                id=review.id
+            ).update(created_at=datetime.date(2024, 1, day))
+            self.reviews.append(review)
+
+    def queries_per_database(self, url: str) -> dict[str, int]:
+        contexts = {
+            database: CaptureQueriesContext(connections[database])
+            for database in settings.DATABASES
+        }
+        for context in contexts.values():
+            context.__enter__()
+        try:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        finally:
+            for context in contexts.values():
+                context.__exit__(None, None, None)
+        return {
+            database: len(context)
+            for database, context in contexts.items() if len(context)
+        }
+
+    def test_reviews_are_stored_on_their_hotel_shard(self):
+        for hotel, review in zip(self.hotels, self.reviews):
+            database = sharding.shard_for_hotel(hotel.id)
+            self.assertEqual(review._state.db, database)
+            self.assertEqual(sharding.shard_for_review(review.id), database)
+            self.assertTrue(
+                Review.objects.using(database).filter(id=review.id).exists()
+            )
+        self.assertFalse(Review.objects.using("default").exists())
+
+    def test_hotel_detail_reads_one_shard(self):
+        hotel = self.hotels[0]
+        queries = self.queries_per_database(
+            reverse("hotel_review_service:hotel-detail", args=[hotel.id])
+        )
+        self.assertEqual(
+            set(queries) - {"default"}, {sharding.shard_for_hotel(hotel.id)}
+        )
+
+    def test_review_list_merges_shards_newest_first(self):
+        response = self.client.get(reverse("hotel_review_service:review-list"))
+        self.assertEqual(
+            [review.caption for review in response.context["review_list"]],
+            [review.caption for review in reversed(self.reviews)],
+        )
+        self.assertEqual(
+            response.context["paginator"].count, len(self.reviews)
+        )
+
+    def test_api_review_list_merges_shards(self):
+        response = self.client.get(
+            reverse("hotel_review_service:api-review-list"),
+            {"fields": "caption"},
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [[review.caption] for review in reversed(self.reviews)],
+        )
+
+    def test_api_review_detail_reads_one_shard(self):
+        review = self.reviews[-1]
+        queries = self.queries_per_database(reverse(
+            "hotel_review_service:api-review-detail", args=[review.id]
+        ))
+        self.assertEqual(
+            set(queries) - {"default"}, {review._state.db}
+        )
+
+    def test_user_detail_gathers_every_shard(self):
+        response = self.client.get(
+            reverse("hotel_review_service:user-detail", args=[self.author.id])
+        )
+        self.assertEqual(
+            len(list(response.context["user_reviews"])), len(self.reviews)
+        )
+
+    def test_reaction_lands_on_review_shard(self):
+        review = self.reviews[-1]
+        self.client.post(
+            reverse("hotel_review_service:review-rate", args=[review.id]),
+            {"reaction": "like"},
+            HTTP_REFERER="/",
+        )
+        self.assertTrue(
+            UserReviewReaction.objects.using(review._state.db)
+            .filter(review_id=review.id, user=self.reader, reaction="L")
+            .exists()
+        )
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.reputation, 1)
+
+        response = self.client.get(
+            reverse("hotel_review_service:review-detail", args=[review.id])
+        )
+        self.assertEqual(response.context["review"].review_rating, 1)
+
+    def test_hotel_delete_removes_shard_reviews(self):
+        hotel_id = self.hotels[0].id
+        self.hotels[0].delete()
+        self.assertFalse(
+            Review.objects.using(sharding.shard_for_hotel(hotel_id))
+            .filter(hotel_id=hotel_id).exists()
+        )
+
+    def test_purge_hotel_from_its_shard(self):
+        hotel = self.hotels[0]
+        UserReviewReaction.objects.create(
+            user=self.reader, review=self.reviews[0], reaction="L"
+        )
+        purge.mark_hotel_deleted(hotel)
+        list(purge.purge_hotel(hotel, batch_size=1))
+        database = sharding.shard_for_hotel(self.reviews[0].hotel_id)
+        self.assertFalse(
+            Review.objects.using(database).filter(
+                id=self.reviews[0].id
+            ).exists()
+        )
+        self.assertFalse(
+            UserReviewReaction.objects.using(database).exists()
+        )
+        self.author.refresh_from_db()
+        self.assertEqual(
+            (self.author.reviews_amount, self.author.reputation),
+            (len(self.reviews) - 1, 0),
+        )
+
+    def test_deleted_ids_are_cached_until_the_next_mark(self):
+        self.assertEqual(utils.get_deleted_ids(), ([], []))
+        with self.assertNumQueries(0):
+            utils.get_deleted_ids()
+        purge.mark_hotel_deleted(self.hotels[0])
+        self.assertEqual(
+            utils.get_deleted_ids(), ([self.hotels[0].id], [])
+        )
+
+    def test_purge_user_from_every_shard(self):
+        purge.mark_user_deleted(self.author)
+        list(purge.purge_user(self.author, batch_size=1))
+        for database in sharding.review_databases():
+            self.assertFalse(Review.objects.using(database).exists())
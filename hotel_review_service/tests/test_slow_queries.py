@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotel_review_service import utils
+from hotel_review_service.models import SlowQuery
+from hotel_review_service.slow_queries import (
+    explain,
+    fingerprint,
+    normalize_sql
+)
+from hotel_review_service.tests.sharded import ShardedTestCase
+
+
+class NormalizeSqlTest(SimpleTestCase):
+    def test_literals_and_lists_are_replaced(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT *  FROM t WHERE name = 'O''Neil'\n"
+                "AND id IN (%s, %s, %s) AND rating > 5"
+            ),
+            "SELECT * FROM t WHERE name = ? AND id IN (?) AND rating > ?",
+        )
+
+    def test_similar_queries_share_fingerprint(self):
+        self.assertEqual(
+            fingerprint(normalize_sql("SELECT * FROM t WHERE id IN (1, 2)")),
+            fingerprint(normalize_sql("SELECT * FROM t WHERE id IN (%s)")),
+        )
+
+
+class ExplainTest(TestCase):
+    def test_writes_are_not_explained(self):
+        self.assertEqual(
+            explain(connection, "DELETE FROM hotel_review_service_hotel", ()),
+            "",
+        )
+
+    def test_select_plan(self):
+        plan = explain(
+            connection, "SELECT * FROM hotel_review_service_hotel", ()
+        )
+        self.assertIn("SCAN", plan)
+
+    def test_failure_is_rolled_back_to_a_savepoint(self):
+        with CaptureQueriesContext(connection) as context:
+            plan = explain(connection, "SELECT * FROM missing_table", ())
+        self.assertTrue(plan.startswith("EXPLAIN failed"))
+        self.assertTrue(any(
+            query["sql"].startswith("ROLLBACK TO SAVEPOINT")
+            for query in context.captured_queries
+        ))
+
+
+class SlowQueryMiddlewareTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        # 0 disables the log, so use a threshold every query exceeds.
+        self.settings = override_settings(SLOW_QUERY_THRESHOLD_MS=1e-6)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def test_queries_are_counted_per_view(self):
+        self.client.force_login(get_user_model().objects.get(id=2))
+        url = reverse("hotel_review_service:hotel-detail", args=[1])
+        with self.assertLogs(
+            "hotel_review_service.slow_queries", "WARNING"
+        ) as logs:
+            self.client.get(url)
+        for record in logs.records:
+            self.assertRegex(
+                record.getMessage(),
+                r"^Slow query \(\d+\.\d ms\) in "
+                r"hotel_review_service\.hotel-detail: ",
+            )
+        first = {
+            slow_query.fingerprint: slow_query.calls
+            for slow_query in SlowQuery.objects.all()
+        }
+        self.assertTrue(first)
+        self.assertEqual(
+            set(SlowQuery.objects.values_list("view", flat=True)),
+            {"hotel_review_service.hotel-detail"},
+        )
+
+        # With shards the first request cached the deleted ids.
+        utils.invalidate_deleted_ids()
+        with self.assertLogs("hotel_review_service.slow_queries", "WARNING"):
+            self.client.get(url)
+        for slow_query in SlowQuery.objects.filter(fingerprint__in=first):
+            self.assertEqual(
+                slow_query.calls, first[slow_query.fingerprint] * 2
+            )
+        self.assertTrue(
+            SlowQuery.objects.filter(sql__startswith="SELECT")
+            .exclude(plan="").exists()
+        )
+
+    def test_page_is_staff_only(self):
+        url = reverse("hotel_review_service:slow-query-list")
+        self.client.force_login(get_user_model().objects.get(id=2))
+        with self.assertLogs(
+            "hotel_review_service.slow_queries", "WARNING"
+        ) as logs:
+            self.assertEqual(self.client.get(url).status_code, 403)
+            self.client.force_login(get_user_model().objects.get(id=1))
+            response = self.client.get(url, {"ordering": "max"})
+        self.assertIn(
+            "in hotel_review_service.slow-query-list: SELECT COUNT(*)",
+            "\n".join(logs.output),
+        )
+        self.assertEqual(response.context["ordering"], "max")
+        max_times = [q.max_time for q in response.context["slowquery_list"]]
+        self.assertEqual(max_times, sorted(max_times, reverse=True))
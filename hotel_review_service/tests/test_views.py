@@ -1,12 +1,15 @@
 from django.contrib.auth import get_user_model
+from django.db import connections
 from django.db.models import Avg
-from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from hotel_review_service.models import Hotel, Review
+from hotel_review_service import sharding
+from hotel_review_service.models import Hotel, Review, UserReviewReaction
+from hotel_review_service.tests.sharded import ShardedTestCase
 
 
-class PrivateHotelListTest(TestCase):
+class PrivateHotelListTest(ShardedTestCase):
     HOTEL_LIST_URL = reverse("hotel_review_service:hotel-list")
     fixtures = ["initial_data.json"]
 
@@ -35,7 +38,7 @@ class PrivateHotelListTest(TestCase):
         )
 
 
-class PrivateUserListTest(TestCase):
+class PrivateUserListTest(ShardedTestCase):
     USER_LIST_URL = reverse("hotel_review_service:user-list")
     fixtures = ["initial_data.json"]
 
@@ -63,7 +66,7 @@ class PrivateUserListTest(TestCase):
             list(users)
         )
 
-class PrivateReviewListTest(TestCase):
+class PrivateReviewListTest(ShardedTestCase):
     REVIEW_LIST_URL = reverse("hotel_review_service:review-list")
     fixtures = ["initial_data.json"]
 
@@ -74,7 +77,7 @@ class PrivateReviewListTest(TestCase):
     def test_retrieve_reviews(self):
         response = self.client.get(self.REVIEW_LIST_URL)
         self.assertEqual(response.status_code, 200)
-        reviews = Review.objects.all()[:5]
+        reviews = sharding.scatter(Review.objects.all())[:5]
         self.assertEqual(
             list(response.context["review_list"]),
             list(reviews)
@@ -85,14 +88,16 @@ class PrivateReviewListTest(TestCase):
         criteria = "test"
         response = self.client.get(self.REVIEW_LIST_URL + f"?search={criteria}")
         self.assertEqual(response.status_code, 200)
-        reviews = Review.objects.filter(caption__icontains=criteria)
+        reviews = sharding.scatter(
+            Review.objects.filter(caption__icontains=criteria)
+        )
         self.assertEqual(
             list(response.context["review_list"]),
             list(reviews)
         )
 
 
-class PrivateUserDetailTest(TestCase):
+class PrivateUserDetailTest(ShardedTestCase):
     fixtures = ["initial_data.json"]
 
     def setUp(self):
@@ -106,11 +111,13 @@ class PrivateUserDetailTest(TestCase):
         self.assertTemplateUsed(response, "hotel_review_service/user_detail.html")
         self.assertEqual(response.context["user"].username, self.user.username)
         self.assertEqual(response.context["user"].id, self.user.id)
-        reviews_amount = Review.objects.filter(author=self.user).count()
+        reviews_amount = sharding.scatter(
+            Review.objects.filter(author=self.user)
+        ).count()
         self.assertEqual(response.context["user"].reviews_amount, reviews_amount)
 
 
-class PrivateHotelDetailTest(TestCase):
+class PrivateHotelDetailTest(ShardedTestCase):
     fixtures = ["initial_data.json"]
 
     def setUp(self):
@@ -129,14 +136,14 @@ class PrivateHotelDetailTest(TestCase):
         self.assertEqual(response.context["hotel"].placement.city, self.hotel.placement.city)
         self.assertEqual(response.context["hotel"].placement.address, self.hotel.placement.address)
 
-        average_rating = Review.objects.filter(hotel=self.hotel).aggregate(Avg("hotel_rating"))["hotel_rating__avg"]
+        average_rating = self.hotel.reviews.aggregate(Avg("hotel_rating"))["hotel_rating__avg"]
         self.assertEqual(response.context["hotel"].average_rating, average_rating)
 
-        hotel_reviews = list(Review.objects.filter(hotel=self.hotel))
+        hotel_reviews = list(self.hotel.reviews.all())
         self.assertEqual(list(response.context["hotel_reviews"]), hotel_reviews)
 
 
-class PrivateIndexTest(TestCase):
+class PrivateIndexTest(ShardedTestCase):
     INDEX_URL = reverse("hotel_review_service:index")
     fixtures = ["initial_data.json"]
 
@@ -151,8 +158,143 @@ class PrivateIndexTest(TestCase):
 
         num_users = get_user_model().objects.count()
         num_hotels = Hotel.objects.count()
-        num_reviews = Review.objects.count()
+        num_reviews = sharding.scatter(Review.objects.all()).count()
 
         self.assertEqual(response.context["num_users"], num_users)
         self.assertEqual(response.context["num_hotels"], num_hotels)
         self.assertEqual(response.context["num_reviews"], num_reviews)
+
+
+class PrivateReviewCreateTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+
+    def test_near_duplicate_review_is_flagged(self):
+        original = Review.objects.create(
+            author=self.user,
+            hotel_id=2,
+            caption="Original",
+            comment="Lovely view from the balcony and a quiet pool area.",
+            hotel_rating=9,
+        )
+        response = self.client.post(
+            reverse("hotel_review_service:review-create", args=[2]),
+            {
+                "caption": "Copy",
+                "comment": original.comment,
+                "hotel_rating": 9,
+            },
+            follow=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        review = Review.objects.using(sharding.shard_for_hotel(2)).get(
+            caption="Copy"
+        )
+        self.assertEqual(review.duplicate_of, original)
+        self.assertContains(response, "possible duplicate")
+
+
+class PrivateReviewRateBatchTest(ShardedTestCase):
+    REVIEW_RATE_BATCH_URL = reverse("hotel_review_service:review-rate-batch")
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+
+    def post_batch(self, reactions):
+        return self.client.post(
+            self.REVIEW_RATE_BATCH_URL,
+            {"reactions": reactions},
+            content_type="application/json",
+        )
+
+    def test_batch_toggles_reactions(self):
+        own_review = sharding.scatter(
+            Review.objects.filter(author=self.user)
+        )[0]
+        other_review = sharding.scatter(
+            Review.objects.exclude(author=self.user)
+        )[0]
+
+        response = self.post_batch([
+            {"review": other_review.id, "reaction": "like"},
+            {"review": own_review.id, "reaction": "like"},
+            {"review": 999999, "reaction": "like"},
+            {"review": other_review.id, "reaction": "dislike"},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["ok"] for result in results], [True, False, False, True]
+        )
+        self.assertEqual(results[3]["reaction"], "dislike")
+        self.assertEqual(
+            list(UserReviewReaction.objects.using(other_review._state.db)
+                 .filter(user=self.user, review=other_review)
+                 .values_list("reaction", flat=True)),
+            ["D"],
+        )
+
+        response = self.post_batch([
+            {"review": other_review.id, "reaction": "dislike"},
+        ])
+        self.assertIsNone(response.json()["results"][0]["reaction"])
+
+    def test_batch_rejects_malformed_payload(self):
+        response = self.post_batch([{"reaction": "like"}])
+        self.assertEqual(response.status_code, 400)
+
+
+class ReviewExcerptViewTest(ShardedTestCase):
+    fixtures = ["initial_data.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.get(id=1)
+        self.client.force_login(self.user)
+        self.review = Review.objects.create(
+            author=self.user, hotel_id=1, caption="Long",
+            comment="A very long stay. " * 30, hotel_rating=8,
+        )
+
+    def review_queries(self, url: str) -> list[str]:
+        # Every page below reads the shard of hotel 1.
+        connection = connections[sharding.shard_for_hotel(1)]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.response = response
+        return [
+            query["sql"] for query in context.captured_queries
+            if 'FROM "hotel_review_service_review"' in query["sql"]
+        ]
+
+    def test_list_pages_skip_the_comment(self):
+        for url in (
+            reverse("hotel_review_service:review-list"),
+            reverse("hotel_review_service:hotel-detail", args=[1]),
+            reverse("hotel_review_service:user-detail", args=[1]),
+        ):
+            with self.subTest(url=url):
+                queries = self.review_queries(url)
+                self.assertTrue(queries)
+                for sql in queries:
+                    self.assertNotIn('review"."comment"', sql)
+                    self.assertNotIn('review"."minhash"', sql)
+                self.assertContains(self.response, self.review.excerpt)
+                self.assertNotContains(self.response, self.review.comment)
+                self.assertContains(self.response, "Read more")
+
+    def test_detail_page_shows_the_full_comment(self):
+        url = reverse(
+            "hotel_review_service:review-detail", args=[self.review.id]
+        )
+        queries = self.review_queries(url)
+        self.assertTrue(
+            any('review"."comment"' in sql for sql in queries)
+        )
+        self.assertContains(self.response, self.review.comment.strip())
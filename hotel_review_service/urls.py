@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from hotel_review_service.views import (
@@ -13,24 +14,53 @@ from hotel_review_service.views import (
     HotelUpdateView,
     HotelDeleteView,
     HotelCreateView,
+    HotelRollupListView,
+    SlowQueryListView,
+    api_detail,
+    api_list,
     index,
-    review_rate
+    review_rate,
+    review_rate_batch,
+    hotel_stats_report,
+    hotel_autocomplete,
+    hotel_compare,
+    hotel_nearby,
+    hotel_events,
+    hotel_detail_async,
+    hotel_list_async,
+    review_list_async,
+    user_detail_async
 )
 
 
+if settings.ASYNC_READ_VIEWS:
+    hotel_list = hotel_list_async
+    hotel_detail = hotel_detail_async
+    review_list = review_list_async
+    user_detail = user_detail_async
+else:
+    hotel_list = HotelListView.as_view()
+    hotel_detail = HotelDetailView.as_view()
+    review_list = ReviewListView.as_view()
+    user_detail = UserDetailView.as_view()
+
+
 urlpatterns = [
     path("",
          index,
          name="index"),
+    path("slow-queries/",
+         SlowQueryListView.as_view(),
+         name="slow-query-list"),
     path("users/",
          UserListView.as_view(),
          name="user-list"),
     path("users/<int:pk>/",
-         UserDetailView.as_view(),
+         user_detail,
          name="user-detail"),
 
     path("reviews/",
-         ReviewListView.as_view(),
+         review_list,
          name="review-list"),
     path("reviews/<int:pk>/",
          ReviewDetailView.as_view(),
@@ -48,13 +78,34 @@ urlpatterns = [
     path("reviews/<int:pk>/rate",
          review_rate,
          name="review-rate"),
+    path("reviews/rate/batch",
+         review_rate_batch,
+         name="review-rate-batch"),
 
     path("hotels/",
-         HotelListView.as_view(),
+         hotel_list,
          name="hotel-list"),
     path("hotels/<int:pk>/",
-         HotelDetailView.as_view(),
+         hotel_detail,
          name="hotel-detail"),
+    path("hotels/<int:pk>/events/",
+         hotel_events,
+         name="hotel-events"),
+    path("hotels/autocomplete/",
+         hotel_autocomplete,
+         name="hotel-autocomplete"),
+    path("hotels/compare/",
+         hotel_compare,
+         name="hotel-compare"),
+    path("hotels/nearby/",
+         hotel_nearby,
+         name="hotel-nearby"),
+    path("hotels/report/",
+         hotel_stats_report,
+         name="hotel-report"),
+    path("hotels/rollups/",
+         HotelRollupListView.as_view(),
+         name="hotel-rollup-list"),
     path("hotels/create/",
          HotelCreateView.as_view(),
          name="hotel-create"),
@@ -64,6 +115,31 @@ urlpatterns = [
     path("hotels/<int:pk>/delete",
          HotelDeleteView.as_view(),
          name="hotel-delete"),
+
+    path("api/hotels/",
+         api_list,
+         {"resource": "hotel"},
+         name="api-hotel-list"),
+    path("api/hotels/<int:pk>/",
+         api_detail,
+         {"resource": "hotel"},
+         name="api-hotel-detail"),
+    path("api/reviews/",
+         api_list,
+         {"resource": "review"},
+         name="api-review-list"),
+    path("api/reviews/<int:pk>/",
+         api_detail,
+         {"resource": "review"},
+         name="api-review-detail"),
+    path("api/users/",
+         api_list,
+         {"resource": "user"},
+         name="api-user-list"),
+    path("api/users/<int:pk>/",
+         api_detail,
+         {"resource": "user"},
+         name="api-user-detail"),
 ]
 
 app_name = "hotel_review_service"
@@ -1,17 +1,231 @@
+from collections.abc import Iterable
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from django.db.models import (
     Manager,
     QuerySet,
     Count,
-    Q
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum
 )
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.urls import Resolver404, resolve
 
+from hotel_review_service import minhash, sharding
+from hotel_review_service.models import (
+    ArchivedReview,
+    Hotel,
+    Review,
+    ReviewBucket,
+    User,
+    UserReviewReaction
+)
 
-def get_reviews_with_calculated_fields(reviews: Manager) -> QuerySet:
-    return (
-        reviews.select_related("hotel", "author")
-        .prefetch_related("reacted_by").annotate(
+
+# Ids of the hotels and of the users marked deleted.
+DeletedIds = tuple[list[int], list[int]]
+
+DELETED_IDS_KEY = "hotel_review_service:deleted-ids"
+# Marking invalidates the ids in Django's cache. With the per-process
+# default only that worker drops them, the others within this many seconds.
+DELETED_IDS_TIMEOUT = 60
+
+
+def _deleted(model: type[Hotel] | type[User]) -> QuerySet:
+    return model.all_objects.filter(deleted_at__isnull=False).values_list(
+        "id", flat=True
+    )
+
+
+def get_deleted_ids() -> DeletedIds | None:
+    """
+    The ids exclude_deleted() needs with REVIEW_SHARDS, cached until the
+    next mark. None without shards, where it joins instead.
+    """
+    if not sharding.is_enabled():
+        return None
+    deleted = cache.get(DELETED_IDS_KEY)
+    if deleted is None:
+        deleted = list(_deleted(Hotel)), list(_deleted(User))
+        cache.set(DELETED_IDS_KEY, deleted, DELETED_IDS_TIMEOUT)
+    return deleted
+
+
+async def aget_deleted_ids() -> DeletedIds | None:
+    if not sharding.is_enabled():
+        return None
+    deleted = await cache.aget(DELETED_IDS_KEY)
+    if deleted is None:
+        deleted = (
+            [pk async for pk in _deleted(Hotel)],
+            [pk async for pk in _deleted(User)],
+        )
+        await cache.aset(DELETED_IDS_KEY, deleted, DELETED_IDS_TIMEOUT)
+    return deleted
+
+
+def invalidate_deleted_ids() -> None:
+    cache.delete(DELETED_IDS_KEY)
+
+
+def exclude_deleted(
+    reviews: Manager, deleted: DeletedIds | None = None
+) -> QuerySet:
+    """
+    Hide reviews of hotels and authors marked deleted: they stay until
+    purge_deleted removes them. With REVIEW_SHARDS the hotels and users are
+    in another database, so the reviews are filtered by their ids.
+    """
+    deleted = deleted or get_deleted_ids()
+    if deleted is None:
+        return reviews.filter(
+            hotel__deleted_at__isnull=True, author__deleted_at__isnull=True
+        )
+    hotel_ids, author_ids = deleted
+    reviews = reviews.all()
+    if hotel_ids:
+        reviews = reviews.exclude(hotel_id__in=hotel_ids)
+    if author_ids:
+        reviews = reviews.exclude(author_id__in=author_ids)
+    return reviews
+
+
+def get_reviews_with_calculated_fields(
+    reviews: Manager,
+    viewer: User | None = None,
+    deleted: DeletedIds | None = None,
+) -> QuerySet:
+    """
+    Reviews with like and dislike counts and, when ``viewer`` is logged in,
+    their own reaction as ``viewer_reaction``. Async callers pass
+    ``deleted`` from aget_deleted_ids().
+    """
+    reviews = exclude_deleted(reviews, deleted)
+    if sharding.is_enabled():
+        # Hotels and users live in another database: no joins.
+        reviews = reviews.prefetch_related("hotel__hotel_class", "author")
+    else:
+        reviews = reviews.select_related("hotel__hotel_class", "author")
+    queryset = (
+        reviews.annotate(
             like_amount=Count("userreviewreaction",
                               filter=Q(userreviewreaction__reaction="L")),
             dislike_amount=Count("userreviewreaction",
                                  filter=Q(userreviewreaction__reaction="D"))
         )).order_by("-created_at")
+    if viewer is not None and viewer.is_authenticated:
+        queryset = queryset.annotate(
+            viewer_reaction=Subquery(
+                UserReviewReaction.objects.filter(
+                    review=OuterRef("pk"), user=viewer.pk
+                ).values("reaction")[:1]
+            )
+        )
+    return queryset
+
+
+def get_review_previews(
+    reviews: Manager,
+    viewer: User | None = None,
+    deleted: DeletedIds | None = None,
+) -> QuerySet:
+    """Reviews for list pages: the stored excerpt instead of the comment."""
+    return get_reviews_with_calculated_fields(
+        reviews, viewer, deleted
+    ).defer("comment", "minhash")
+
+
+def get_archived_reviews_with_calculated_fields() -> QuerySet:
+    return (
+        ArchivedReview.objects.select_related("hotel", "author").annotate(
+            like_amount=Count("reactions",
+                              filter=Q(reactions__reaction="L")),
+            dislike_amount=Count("reactions",
+                                 filter=Q(reactions__reaction="D"))
+        )
+    )
+
+
+def hotel_average_rating() -> Cast:
+    """Average over live reviews plus the archived totals kept on Hotel."""
+    if sharding.is_enabled():
+        # Reviews are on the shards; the monthly buckets cover live and
+        # archived reviews alike.
+        return (
+            Cast(Sum("monthly_ratings__rating_sum"), FloatField())
+            / NullIf(Sum("monthly_ratings__reviews_amount"), 0)
+        )
+    rating_sum = (
+        Coalesce(Sum("reviews__hotel_rating"), 0)
+        + F("archived_rating_sum")
+    )
+    reviews_amount = Count("reviews") + F("archived_reviews_amount")
+    return (
+        Cast(rating_sum, FloatField())
+        / NullIf(reviews_amount, 0)
+    )
+
+
+def get_review_buckets(review: Review) -> list[ReviewBucket]:
+    if review.signature is None:
+        return []
+    return [
+        ReviewBucket(review_id=review.id, band=band, key=key)
+        for band, key in enumerate(minhash.band_keys(review.signature))
+    ]
+
+
+def index_review_buckets(review: Review) -> None:
+    buckets = ReviewBucket.objects.using(review._state.db)
+    buckets.filter(review_id=review.id).delete()
+    buckets.bulk_create(get_review_buckets(review))
+
+
+def find_near_duplicates(
+    review: Review,
+    reviews: QuerySet,
+    threshold: float = minhash.DUPLICATE_THRESHOLD,
+) -> list[tuple[Review, float]]:
+    if review.signature is None:
+        return []
+
+    same_bucket = Q()
+    for band, key in enumerate(minhash.band_keys(review.signature)):
+        same_bucket |= Q(band=band, key=key)
+    candidate_ids = (
+        ReviewBucket.objects.using(reviews.db).filter(same_bucket)
+        .exclude(review_id=review.id)
+        .values("review_id")
+    )
+
+    matches = []
+    for candidate in reviews.filter(id__in=candidate_ids).only("id", "minhash"):
+        score = minhash.similarity(review.signature, candidate.signature)
+        if score >= threshold:
+            matches.append((candidate, score))
+    return sorted(matches, key=lambda match: match[1], reverse=True)
+
+
+def get_url_name(request) -> str:
+    """Stable "app.url-name" label for the view that handles ``request``."""
+    match = request.resolver_match
+    if match is None:
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return "unresolved"
+    if match.url_name is None:
+        return match._func_path
+    return ".".join(filter(None, [match.app_name, match.url_name]))
+
+
+async def alist(object_list: Iterable) -> list:
+    """Evaluate a queryset with the async ORM, anything else in a thread."""
+    if isinstance(object_list, QuerySet):
+        return [obj async for obj in object_list]
+    return await sync_to_async(list)(object_list)
@@ -1,39 +1,92 @@
+import asyncio
+import json
+from functools import wraps
 from typing import Any
 
+from asgiref.sync import sync_to_async
+from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.views import redirect_to_login
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import InvalidPage
+from django.db import connection, transaction
 from django.db.models import (
-    Avg,
-    Count,
     Q,
-    QuerySet
+    QuerySet,
+    Sum
 )
 from django.http import (
+    Http404,
     HttpResponse,
-    HttpResponseRedirect
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse
 )
 from django.shortcuts import (
     render,
+    aget_object_or_404,
     get_object_or_404,
     redirect
 )
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.views import generic
-
+from django.views.decorators.http import require_POST
+
+from hotel_review_service import (
+    api,
+    events,
+    purge,
+    reactions,
+    rollups,
+    sharding
+)
+from hotel_review_service.autocomplete import autocomplete_index
+from hotel_review_service.search_cache import (
+    HydratedIdList,
+    get_cached_ids,
+    normalize_term
+)
 from hotel_review_service.forms import (
+    ApiQueryForm,
     HotelSearchForm,
     HotelForm,
+    HotelNearbyForm,
+    HotelRollupSearchForm,
     ReviewSearchForm,
     UserSearchForm,
     ReviewForm,
 )
 from hotel_review_service.models import (
+    ArchivedReview,
     Hotel,
+    HotelRollup,
     Review,
-    Placement
+    Placement,
+    SlowQuery
+)
+from hotel_review_service.nearby import nearby_hotels
+from hotel_review_service.pagination import EstimatedCountPaginator
+from hotel_review_service.reports import (
+    MAX_COMPARED_HOTELS,
+    RATINGS,
+    RECENT_DAYS,
+    REPORT_FORMATS,
+    compare_hotels,
+    iter_hotel_stats
+)
+from hotel_review_service.utils import (
+    DeletedIds,
+    aget_deleted_ids,
+    exclude_deleted,
+    get_archived_reviews_with_calculated_fields,
+    get_deleted_ids,
+    get_review_previews,
+    get_reviews_with_calculated_fields,
+    find_near_duplicates,
+    hotel_average_rating
 )
-from hotel_review_service.utils import get_reviews_with_calculated_fields
 
 
 @login_required
@@ -42,7 +95,14 @@ def index(request):
 
     num_users = get_user_model().objects.count()
     num_hotels = Hotel.objects.count()
-    num_reviews = Review.objects.count()
+    deleted = get_deleted_ids()
+    num_reviews = sum(
+        exclude_deleted(reviews, deleted).count()
+        for reviews in [ArchivedReview.objects] + [
+            Review.objects.using(database)
+            for database in sharding.review_databases()
+        ]
+    )
 
     context = {
         "num_users": num_users,
@@ -56,6 +116,7 @@ def index(request):
 class HotelListView(LoginRequiredMixin, generic.ListView):
     model = Hotel
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
 
     def get_context_data(self, *, object_list=None, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -63,33 +124,93 @@ class HotelListView(LoginRequiredMixin, generic.ListView):
         context["search_form"] = HotelSearchForm(
             initial={"search": search}
         )
+        context["autocomplete_url"] = reverse(
+            "hotel_review_service:hotel-autocomplete"
+        )
         return context
 
-    def get_queryset(self) -> QuerySet:
-        queryset = (
-            Hotel.objects.select_related("placement", "hotel_class")
-            .prefetch_related("reviews")
-            .annotate(average_rating=Avg("reviews__hotel_rating"))
-            .order_by("name")
+    def get_queryset(self) -> QuerySet | HydratedIdList:
+        return get_hotel_list(
+            get_search_term(HotelSearchForm(self.request.GET))
         )
-        form = HotelSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["search"])
-        return queryset
+
+
+def get_search_term(form: HotelSearchForm | ReviewSearchForm) -> str:
+    if form.is_valid():
+        return normalize_term(form.cleaned_data["search"])
+    return ""
+
+
+# The hotel and review lists, shared by the sync and async views. Only a
+# search queries the database here, for the cached ids.
+
+def get_hotel_list(search: str) -> QuerySet | HydratedIdList:
+    queryset = (
+        Hotel.objects.select_related("placement", "hotel_class")
+        .annotate(average_rating=hotel_average_rating())
+        .order_by("name")
+    )
+    if search:
+        ids = get_cached_ids(
+            "hotel",
+            search,
+            Hotel.objects.filter(name__icontains=search)
+            .order_by("name", "id")
+        )
+        if ids is None:
+            return queryset.filter(name__icontains=search).order_by(
+                "name", "id"
+            )
+        return HydratedIdList(ids, queryset)
+    return queryset
+
+
+def get_review_list(
+    viewer, search: str, deleted: DeletedIds | None = None
+) -> QuerySet | HydratedIdList | sharding.ShardedList:
+    deleted = deleted or get_deleted_ids()
+    queryset = get_review_previews(Review.objects, viewer, deleted)
+    if search and sharding.is_enabled():
+        return sharding.scatter(
+            queryset.filter(Q(caption__icontains=search)
+                            | Q(comment__icontains=search))
+        )
+    if search:
+        ids = get_cached_ids(
+            "review",
+            search,
+            exclude_deleted(Review.objects, deleted)
+            .filter(Q(caption__icontains=search)
+                    | Q(comment__icontains=search))
+            .order_by("-created_at", "-id")
+        )
+        if ids is None:
+            return queryset.filter(
+                Q(caption__icontains=search) | Q(comment__icontains=search)
+            ).order_by("-created_at", "-id")
+        return HydratedIdList(ids, queryset)
+    return sharding.scatter(queryset)
 
 
 class HotelDetailView(LoginRequiredMixin, generic.DetailView):
     model = Hotel
     queryset = (
         Hotel.objects.select_related("placement", "hotel_class")
-        .prefetch_related("reviews")
-        .annotate(average_rating=Avg("reviews__hotel_rating"))
+        .annotate(average_rating=hotel_average_rating())
     )
+    paginate_reviews_by = 10
 
     def get_context_data(self, *, object_list=None, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["hotel_reviews"] = (
-            get_reviews_with_calculated_fields(context["hotel"].reviews)
+        # Routed to the hotel's shard.
+        context.update(paginate(
+            self.request,
+            get_review_previews(context["hotel"].reviews, self.request.user),
+            self.paginate_reviews_by,
+        ))
+        context["hotel_reviews"] = context["object_list"]
+        context["monthly_ratings"] = (
+            rollups.get_monthly_ratings(context["hotel"].id)
         )
         return context
 
@@ -105,9 +226,13 @@ class HotelCreateView(LoginRequiredMixin, generic.CreateView):
         country = form.cleaned_data["country"]
         city = form.cleaned_data["city"]
         address = form.cleaned_data["address"]
-        placement = Placement.objects.create(country=country,
-                                             city=city,
-                                             address=address)
+        placement = Placement.objects.create(
+            country=country,
+            city=city,
+            address=address,
+            latitude=form.cleaned_data["latitude"],
+            longitude=form.cleaned_data["longitude"],
+        )
 
         hotel.placement = placement
         hotel.save()
@@ -123,17 +248,17 @@ class HotelUpdateView(LoginRequiredMixin, generic.UpdateView):
     def form_valid(self, form) -> HttpResponseRedirect:
         hotel = form.save(commit=False)
 
-        country = form.cleaned_data["country"]
-        city = form.cleaned_data["city"]
-        address = form.cleaned_data["address"]
-        placement = Placement.objects.create(country=country,
-                                             city=city,
-                                             address=address)
-
-        hotel.placement.delete()
+        placement = hotel.placement
+        placement.country = form.cleaned_data["country"]
+        placement.city = form.cleaned_data["city"]
+        placement.address = form.cleaned_data["address"]
+        placement.latitude = form.cleaned_data["latitude"]
+        placement.longitude = form.cleaned_data["longitude"]
 
-        hotel.placement = placement
-        hotel.save()
+        # The rollups follow in the Hotel and Placement save signals.
+        with transaction.atomic():
+            placement.save()
+            hotel.save()
 
         return super().form_valid(form)
 
@@ -143,11 +268,251 @@ class HotelDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("hotel_review_service:hotel-list")
     template_name = "hotel_review_service/hotel_confirm_delete.html"
 
+    def form_valid(self, form) -> HttpResponseRedirect:
+        # The reviews go later, in batches: see the purge_deleted command.
+        purge.mark_hotel_deleted(self.object)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+@login_required
+def hotel_autocomplete(request):
+    try:
+        limit = min(int(request.GET.get("limit", 10)), 50)
+    except ValueError:
+        limit = 10
+    return JsonResponse({
+        "results": autocomplete_index.search(request.GET.get("q", ""), limit)
+    })
+
+
+@login_required
+def hotel_compare(request):
+    wants_json = request.GET.get("format") == "json"
+    try:
+        hotel_ids = list(dict.fromkeys(
+            int(value)
+            for values in request.GET.getlist("ids")
+            for value in values.split(",")
+            if value.strip()
+        ))
+    except ValueError:
+        hotel_ids = []
+    if not 2 <= len(hotel_ids) <= MAX_COMPARED_HOTELS:
+        error = f"Choose 2 to {MAX_COMPARED_HOTELS} hotels to compare"
+        if wants_json:
+            return JsonResponse({"error": error}, status=400)
+        messages.warning(request, error)
+        return redirect("hotel_review_service:hotel-list")
+
+    hotels = compare_hotels(hotel_ids)
+    if wants_json:
+        return JsonResponse({"hotels": hotels})
+    context = {
+        "hotels": hotels,
+        "rating_rows": [
+            (rating, [hotel["ratings"][rating] for hotel in hotels])
+            for rating in reversed(RATINGS)
+        ],
+        "recent_rows": [
+            (days, [hotel["recent_reviews"][days] for hotel in hotels])
+            for days in RECENT_DAYS
+        ],
+    }
+    return render(
+        request, "hotel_review_service/hotel_compare.html", context=context
+    )
+
+
+@login_required
+def hotel_nearby(request):
+    wants_json = request.GET.get("format") == "json"
+    form = HotelNearbyForm(request.GET or None)
+    if not form.is_valid():
+        if wants_json:
+            return JsonResponse({"errors": form.errors}, status=400)
+        return render(
+            request, "hotel_review_service/hotel_nearby.html", {"form": form}
+        )
+
+    results = nearby_hotels(
+        form.cleaned_data["latitude"],
+        form.cleaned_data["longitude"],
+        radius_km=form.cleaned_data["radius"],
+        limit=form.cleaned_data["limit"] or 10,
+    )
+    if wants_json:
+        return JsonResponse({"hotels": [
+            {
+                "id": result.hotel.id,
+                "name": result.hotel.name,
+                "hotel_class": result.hotel.hotel_class.name,
+                "country": result.hotel.placement.country,
+                "city": result.hotel.placement.city,
+                "address": result.hotel.placement.address,
+                "latitude": result.hotel.placement.latitude,
+                "longitude": result.hotel.placement.longitude,
+                "distance_km": result.distance_km,
+            }
+            for result in results
+        ]})
+    context = {"form": form, "results": results}
+    return render(
+        request, "hotel_review_service/hotel_nearby.html", context=context
+    )
+
+
+def api_login_required(view):
+    """login_required for the API: a JSON 401 instead of the login page."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {"errors": {"__all__": ["Authentication required."]}},
+                status=401,
+            )
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@api_login_required
+def api_list(request, resource: str):
+    resource = api.RESOURCES[resource]
+    form = ApiQueryForm(request.GET, resource=resource)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    try:
+        payload = api.list_page(
+            resource,
+            api.filter_list(resource, form.get_filters()),
+            form.cleaned_data["fields"],
+            form.cleaned_data["page"],
+            form.cleaned_data["page_size"],
+        )
+    except InvalidPage as error:
+        return JsonResponse({"errors": {"page": [str(error)]}}, status=404)
+    return api.json_response(payload)
+
+
+@api_login_required
+def api_detail(request, resource: str, pk: int):
+    resource = api.RESOURCES[resource]
+    form = ApiQueryForm(request.GET, resource=resource, detail=True)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    payload = api.detail(resource, pk, form.cleaned_data["fields"])
+    if payload is None:
+        return JsonResponse({"errors": {"id": [
+            f"No {resource.model._meta.verbose_name} with this id."
+        ]}}, status=404)
+    return api.json_response(payload)
+
+
+def release_connection() -> None:
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+def async_login_required(view):
+    """login_required for async views, which Django 5.0 only wraps sync."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        # Templates read request.user: resolve it here rather than in a
+        # lazy database lookup while rendering.
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@async_login_required
+async def hotel_events(request, pk: int):
+    if not await Hotel.objects.filter(id=pk).aexists():
+        raise Http404
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be pinned for the lifetime of the stream;
+        # 204 tells EventSource not to reconnect.
+        return HttpResponse(status=204)
+    # Idle streams must not hold database connections.
+    await sync_to_async(release_connection)()
+
+    response = StreamingHttpResponse(
+        events.stream(events.hotel_channel(pk)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def hotel_stats_report(request):
+    report_format = request.GET.get("format", "csv")
+    if report_format not in REPORT_FORMATS:
+        return HttpResponse(status=400)
+    render_report, content_type, extension = REPORT_FORMATS[report_format]
+    if sharding.is_enabled():
+        return HttpResponse(
+            "The report does not support REVIEW_SHARDS yet", status=501
+        )
+
+    response = StreamingHttpResponse(
+        render_report(iter_hotel_stats()), content_type=content_type
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="hotel_stats.{extension}"'
+    )
+    return response
+
+
+class HotelRollupListView(LoginRequiredMixin, generic.ListView):
+    model = HotelRollup
+    paginate_by = 20
+
+    def get_context_data(self, *, object_list=None, **kwargs) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["search_form"] = HotelRollupSearchForm(self.request.GET)
+        totals = self.get_queryset().aggregate(
+            hotels_amount=Sum("hotels_amount"),
+            reviews_amount=Sum("reviews_amount"),
+            rating_sum=Sum("rating_sum"),
+        )
+        context["totals"] = HotelRollup(
+            **{key: value or 0 for key, value in totals.items()}
+        )
+        return context
+
+    def get_queryset(self) -> QuerySet:
+        queryset = HotelRollup.objects.select_related("hotel_class").filter(
+            hotels_amount__gt=0
+        )
+        form = HotelRollupSearchForm(self.request.GET)
+        if form.is_valid():
+            if form.cleaned_data["hotel_class"]:
+                queryset = queryset.filter(
+                    hotel_class=form.cleaned_data["hotel_class"]
+                )
+            if form.cleaned_data["country"]:
+                queryset = queryset.filter(
+                    country__iexact=form.cleaned_data["country"]
+                )
+            if form.cleaned_data["city"]:
+                queryset = queryset.filter(
+                    city__iexact=form.cleaned_data["city"]
+                )
+        return queryset
+
 
 class ReviewListView(LoginRequiredMixin, generic.ListView):
     model = Review
 
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
 
     def get_context_data(self, *, object_list=None, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -157,21 +522,41 @@ class ReviewListView(LoginRequiredMixin, generic.ListView):
         )
         return context
 
+    def get_queryset(self) -> QuerySet | HydratedIdList:
+        return get_review_list(
+            self.request.user,
+            get_search_term(ReviewSearchForm(self.request.GET)),
+        )
+
+
+class ReviewShardMixin:
+    """Looks the review up on the shard its id points to."""
+
     def get_queryset(self) -> QuerySet:
-        queryset = (
-            get_reviews_with_calculated_fields(Review.objects)
+        return super().get_queryset().using(
+            sharding.shard_for_review(self.kwargs["pk"])
         )
-        form = ReviewSearchForm(self.request.GET)
-        if form.is_valid():
-            search = form.cleaned_data["search"]
-            return queryset.filter(Q(caption__icontains=search)
-                                   | Q(comment__icontains=search))
-        return queryset
 
 
 class ReviewDetailView(LoginRequiredMixin, generic.DetailView):
     model = Review
-    queryset = Review.objects.select_related("user", "hotel")
+    context_object_name = "review"
+    template_name = "hotel_review_service/review_detail.html"
+
+    def get_queryset(self) -> QuerySet:
+        return get_reviews_with_calculated_fields(
+            Review.objects.using(sharding.shard_for_review(self.kwargs["pk"])),
+            self.request.user,
+        )
+
+    def get_object(self, queryset=None) -> Review | ArchivedReview:
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return get_object_or_404(
+                get_archived_reviews_with_calculated_fields(),
+                pk=self.kwargs["pk"]
+            )
 
 
 class ReviewCreateView(LoginRequiredMixin, generic.CreateView):
@@ -186,47 +571,138 @@ class ReviewCreateView(LoginRequiredMixin, generic.CreateView):
         review.hotel = get_object_or_404(Hotel, id=self.kwargs["pk"])
 
         review.save()
+        self.flag_near_duplicates(review)
 
         return super().form_valid(form)
 
+    def flag_near_duplicates(self, review: Review) -> None:
+        # With REVIEW_SHARDS only the hotel's shard is searched.
+        reviews = Review.objects.using(review._state.db)
+        duplicates = find_near_duplicates(
+            review,
+            reviews.filter(Q(author=review.author) | Q(hotel=review.hotel))
+        )
+        if not duplicates:
+            return
+        original, score = duplicates[0]
+        review.duplicate_of = original
+        reviews.filter(id=review.id).update(duplicate_of=original)
+        messages.warning(
+            self.request,
+            f"Your review is {score:.0%} similar to an existing review "
+            f"and was flagged as a possible duplicate."
+        )
+
 
-class ReviewUpdateView(LoginRequiredMixin, generic.UpdateView):
+class ReviewUpdateView(
+    LoginRequiredMixin, ReviewShardMixin, generic.UpdateView
+):
     model = Review
     fields = ["caption", "comment", "hotel_rating"]
     success_url = reverse_lazy("hotel_review_service:review-list")
 
 
-class ReviewDeleteView(LoginRequiredMixin, generic.DeleteView):
+class ReviewDeleteView(
+    LoginRequiredMixin, ReviewShardMixin, generic.DeleteView
+):
     model = Review
     success_url = reverse_lazy("hotel_review_service:review-list")
 
     template_name = "hotel_review_service/review_confirm_delete.html"
 
+    def form_valid(self, form) -> HttpResponseRedirect:
+        purge.delete_review(self.object)
+        return HttpResponseRedirect(self.get_success_url())
+
 
+@login_required
 def review_rate(request, pk: int):
-    review = get_object_or_404(Review, id=pk)
+    review = get_object_or_404(
+        Review.objects.using(sharding.shard_for_review(pk))
+        .only("id", "author_id"),
+        id=pk,
+    )
     if request.method == "POST":
-        if review.author == request.user:
+        if review.author_id == request.user.id:
+            return HttpResponse(status=400)
+        reaction = reactions.REACTIONS.get(request.POST.get("reaction"))
+        if reaction is None:
             return HttpResponse(status=400)
-        reaction = request.POST.get("reaction")
-        if reaction == "like":
-            reaction = "L"
-        elif reaction == "dislike":
-            reaction = "D"
-        user_review_reaction, *_ = (review.userreviewreaction_set
-                                    .get_or_create(user=request.user))
-        if user_review_reaction.reaction == reaction:
-            user_review_reaction.reaction = None
-        else:
-            user_review_reaction.reaction = reaction
-        user_review_reaction.save()
+        reactions.toggle_reaction(request.user.id, review, reaction)
 
     return redirect(request.META["HTTP_REFERER"])
 
 
+@login_required
+@require_POST
+def review_rate_batch(request):
+    try:
+        items = [
+            (int(item["review"]), item["reaction"])
+            for item in json.loads(request.body)["reactions"]
+        ]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse(
+            {"error": 'Expected {"reactions": [{"review": id, '
+                      '"reaction": "like" | "dislike"}, ...]}'},
+            status=400,
+        )
+    if len(items) > reactions.MAX_BATCH_SIZE:
+        return JsonResponse(
+            {"error": f"At most {reactions.MAX_BATCH_SIZE} reactions "
+                      f"per batch"},
+            status=400,
+        )
+    return JsonResponse(
+        {"results": reactions.apply_reactions(request.user, items)}
+    )
+
+
+class SlowQueryListView(
+    LoginRequiredMixin, UserPassesTestMixin, generic.ListView
+):
+    model = SlowQuery
+    paginate_by = 20
+    orderings = {
+        "total": ("-total_time", "id"),
+        "max": ("-max_time", "id"),
+        "calls": ("-calls", "id"),
+        "recent": ("-last_seen", "id"),
+    }
+
+    def test_func(self) -> bool:
+        return self.request.user.is_staff
+
+    def get_ordering_name(self) -> str:
+        name = self.request.GET.get("ordering")
+        return name if name in self.orderings else "total"
+
+    def get_ordering(self) -> tuple[str, ...]:
+        return self.orderings[self.get_ordering_name()]
+
+    def get_context_data(self, *, object_list=None, **kwargs) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["ordering"] = self.get_ordering_name()
+        context["orderings"] = list(self.orderings)
+        return context
+
+
 class UserListView(LoginRequiredMixin, generic.ListView):
     model = get_user_model()
     paginate_by = 5
+    paginator_class = EstimatedCountPaginator
+    orderings = {
+        "name": ("first_name", "last_name", "id"),
+        # Served by user_reputation_idx.
+        "reputation": ("-reputation", "id"),
+    }
+
+    def get_ordering_name(self) -> str:
+        name = self.request.GET.get("ordering")
+        return name if name in self.orderings else "name"
+
+    def get_ordering(self) -> tuple[str, ...]:
+        return self.orderings[self.get_ordering_name()]
 
     def get_context_data(self, *, object_list=None, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -234,37 +710,83 @@ class UserListView(LoginRequiredMixin, generic.ListView):
         context["search_form"] = UserSearchForm(
             initial={"search": search}
         )
+        context["ordering"] = self.get_ordering_name()
         return context
 
     def get_queryset(self) -> QuerySet:
-        queryset = (
-            get_user_model().objects.prefetch_related("reviews")
-            .annotate(reviews_amount=Count("reviews"))
-            .order_by("first_name", "last_name")
-        )
+        ordering = self.get_ordering()
+        queryset = get_user_model().objects.order_by(*ordering)
         form = UserSearchForm(self.request.GET)
         if form.is_valid():
-            search = form.cleaned_data["search"]
-            return queryset.filter(Q(first_name__icontains=search)
-                                   | Q(last_name__icontains=search))
+            search = normalize_term(form.cleaned_data["search"])
+            if search:
+                matching = get_user_model().objects.filter(
+                    Q(first_name__icontains=search)
+                    | Q(last_name__icontains=search)
+                )
+                if self.get_ordering_name() != "name":
+                    # Reputation changes without a User save, which is what
+                    # invalidates the cached ids, so don't cache this order.
+                    return matching.order_by(*ordering)
+                ids = get_cached_ids(
+                    "user", search, matching.order_by(*ordering)
+                )
+                if ids is None:
+                    return matching.order_by(*ordering)
+                return HydratedIdList(ids, queryset)
         return queryset
 
 
 class UserDetailView(LoginRequiredMixin, generic.DetailView):
     model = get_user_model()
-    queryset = (
-        get_user_model().objects.prefetch_related("reviews")
-        .annotate(reviews_amount=Count("*"))
-    )
+    paginate_reviews_by = 10
 
     def get_context_data(self, *, object_list=None, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["user_reviews"] = (
-            get_reviews_with_calculated_fields(context["object"].reviews)
-        )
+        context.update(paginate(
+            self.request,
+            sharding.scatter(get_review_previews(
+                Review.objects.filter(author=context["object"]),
+                self.request.user,
+            )),
+            self.paginate_reviews_by,
+        ))
+        context["user_reviews"] = context["object_list"]
         return context
 
 
+def paginate(request, object_list, per_page: int) -> dict[str, Any]:
+    """
+    ListView's pagination context, for lists that are not the page's
+    object.
+    """
+    paginator = EstimatedCountPaginator(object_list, per_page)
+    page_number = request.GET.get("page") or 1
+    try:
+        if page_number == "last":
+            page_number = paginator.num_pages
+        page = paginator.page(int(page_number))
+    except (ValueError, InvalidPage) as error:
+        raise page_not_found(page_number, error) from error
+    return get_pagination_context(page)
+
+
+def page_not_found(page_number, error: Exception) -> Http404:
+    """The 404 ListView gives for a bad ?page=."""
+    if isinstance(error, InvalidPage):
+        return Http404(f"Invalid page ({page_number}): {error}")
+    return Http404("Page is not “last”, nor can it be converted to an int.")
+
+
+def get_pagination_context(page) -> dict[str, Any]:
+    return {
+        "paginator": page.paginator,
+        "page_obj": page,
+        "is_paginated": page.has_other_pages(),
+        "object_list": page.object_list,
+    }
+
+
 class UserCreateView(LoginRequiredMixin, generic.CreateView):
     model = Hotel
     fields = "__all__"
@@ -280,3 +802,108 @@ class UserUpdateView(LoginRequiredMixin, generic.UpdateView):
 class UserDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = Hotel
     success_url = reverse_lazy("hotel_review_service:user-list")
+
+
+# Async versions of the main read pages, routed instead of the class-based
+# views above when ASYNC_READ_VIEWS is set. They render the same templates
+# with the same context.
+
+async def apaginate(
+    request, object_list, per_page: int
+) -> dict[str, Any]:
+    """ListView's pagination context, with the count and rows concurrent."""
+    paginator = EstimatedCountPaginator(object_list, per_page)
+    page_number = request.GET.get("page") or 1
+    try:
+        if page_number == "last":
+            await paginator.acount()
+            page_number = paginator.num_pages
+        page = await paginator.apage(int(page_number))
+    except (ValueError, InvalidPage) as error:
+        raise page_not_found(page_number, error) from error
+    return get_pagination_context(page)
+
+
+@async_login_required
+async def hotel_list_async(request):
+    search = get_search_term(HotelSearchForm(request.GET))
+    if search:
+        object_list = await sync_to_async(get_hotel_list)(search)
+    else:
+        object_list = get_hotel_list(search)
+
+    context = await apaginate(request, object_list, HotelListView.paginate_by)
+    context["hotel_list"] = context["object_list"]
+    context["search_form"] = HotelSearchForm(
+        initial={"search": request.GET.get("search", "")}
+    )
+    context["autocomplete_url"] = reverse(
+        "hotel_review_service:hotel-autocomplete"
+    )
+    return render(request, "hotel_review_service/hotel_list.html", context)
+
+
+@async_login_required
+async def hotel_detail_async(request, pk: int):
+    deleted = await aget_deleted_ids()
+    # The reviews and the trend only need the id: no need to wait for the
+    # hotel row before asking for them.
+    hotel, context, monthly_ratings = await asyncio.gather(
+        aget_object_or_404(HotelDetailView.queryset, pk=pk),
+        apaginate(
+            request,
+            get_review_previews(
+                Review.objects.using(sharding.shard_for_hotel(pk))
+                .filter(hotel_id=pk),
+                request.user,
+                deleted,
+            ),
+            HotelDetailView.paginate_reviews_by,
+        ),
+        rollups.aget_monthly_ratings(pk),
+    )
+    context.update({
+        "object": hotel,
+        "hotel": hotel,
+        "hotel_reviews": context["object_list"],
+        "monthly_ratings": monthly_ratings,
+    })
+    return render(request, "hotel_review_service/hotel_detail.html", context)
+
+
+@async_login_required
+async def review_list_async(request):
+    search = get_search_term(ReviewSearchForm(request.GET))
+    deleted = await aget_deleted_ids()
+    if search:
+        object_list = await sync_to_async(get_review_list)(
+            request.user, search, deleted
+        )
+    else:
+        object_list = get_review_list(request.user, search, deleted)
+
+    context = await apaginate(request, object_list, ReviewListView.paginate_by)
+    context["review_list"] = context["object_list"]
+    context["search_form"] = ReviewSearchForm(
+        initial={"search": request.GET.get("search", "")}
+    )
+    return render(request, "hotel_review_service/review_list.html", context)
+
+
+@async_login_required
+async def user_detail_async(request, pk: int):
+    deleted = await aget_deleted_ids()
+    user, context = await asyncio.gather(
+        aget_object_or_404(get_user_model(), pk=pk),
+        apaginate(
+            request,
+            sharding.scatter(get_review_previews(
+                Review.objects.filter(author_id=pk), request.user, deleted
+            )),
+            UserDetailView.paginate_reviews_by,
+        ),
+    )
+    context.update(
+        {"object": user, "user": user, "user_reviews": context["object_list"]}
+    )
+    return render(request, "hotel_review_service/user_detail.html", context)
@@ -0,0 +1,34 @@
+document.addEventListener("DOMContentLoaded", function() {
+    const list = document.querySelector('[data-events-url]');
+    if (!list || !window.EventSource) {
+        return;
+    }
+    const source = new EventSource(list.getAttribute('data-events-url'));
+
+    source.addEventListener('review', function(event) {
+        const review = JSON.parse(event.data);
+        const item = document.createElement('li');
+        item.className = 'list-group-item bg-transparent';
+        const card = document.createElement('div');
+        card.className = 'bg-light p-3 mb-4 rounded shadow-sm';
+        [
+            ['text-dark', review.hotel_rating + '/10'],
+            ['text-muted mb-2', review.author],
+            ['font-weight-bold mb-2', review.caption],
+            ['mb-2', review.comment],
+        ].forEach(([className, text]) => {
+            const line = document.createElement('div');
+            line.className = className;
+            line.textContent = text;
+            card.appendChild(line);
+        });
+        item.appendChild(card);
+        list.prepend(item);
+    });
+
+    source.addEventListener('reaction', function(event) {
+        const data = JSON.parse(event.data);
+        document.querySelectorAll('[data-review-rating="' + data.review + '"]')
+            .forEach(span => { span.textContent = data.rating; });
+    });
+});
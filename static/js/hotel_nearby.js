@@ -0,0 +1,14 @@
+document.addEventListener("DOMContentLoaded", function() {
+    const button = document.querySelector('[data-locate-me]');
+    if (!button || !navigator.geolocation) {
+        return;
+    }
+    button.addEventListener('click', function() {
+        navigator.geolocation.getCurrentPosition(function(position) {
+            const form = button.form;
+            form.elements.latitude.value = position.coords.latitude.toFixed(6);
+            form.elements.longitude.value = position.coords.longitude.toFixed(6);
+            form.submit();
+        });
+    });
+});
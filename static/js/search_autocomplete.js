@@ -0,0 +1,28 @@
+document.addEventListener("DOMContentLoaded", function() {
+    const inputs = document.querySelectorAll('input[data-autocomplete-url]');
+    inputs.forEach(input => {
+        const list = document.getElementById(input.getAttribute('list'));
+        const url = input.getAttribute('data-autocomplete-url');
+        let timer = null;
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const term = input.value.trim();
+            if (term.length < 2) {
+                list.replaceChildren();
+                return;
+            }
+            timer = setTimeout(function() {
+                fetch(url + '?' + new URLSearchParams({q: term}))
+                    .then(response => response.json())
+                    .then(data => {
+                        list.replaceChildren(...data.results.map(hotel => {
+                            const option = document.createElement('option');
+                            option.value = hotel.name;
+                            option.label = hotel.city;
+                            return option;
+                        }));
+                    });
+            }, 150);
+        });
+    });
+});